@@ -1,6 +1,5 @@
 from pathlib import Path
 
 DLL_ROOT = Path(__file__).parent / "dll"
-print(DLL_ROOT)
 
 ENCODE = "utf-8"
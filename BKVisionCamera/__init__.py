@@ -1,7 +1,23 @@
+import asyncio
+
 from .base import SingCameraAll
 from .base.property import BaseProperty, CaptureModel
-from .areascancamera.hikvision import HikCamera
-from .d3cancamera.SICK.sick_camera import SickCamera
+from .base.camera_group import CameraGroup, FrameSet
+
+# 厂商插件按名称登记, 创建相机时才导入对应的 SDK, 只用海康的进程不会加载 GenTL
+_models = SingCameraAll()
+_models.registerPlugin(["hikvision", "海康"], "BKVisionCamera.areascancamera.hikvision.hik_camera")
+_models.registerPlugin(["dahua", "大华"], "BKVisionCamera.areascancamera.dahuavision.dahua_camera")
+_models.registerPlugin(["sick", "西克"], "BKVisionCamera.d3cancamera.SICK.sick_camera")
+
+_LAZY_MODELS = {"HikCamera": "hikvision", "DahuaCamera": "dahua", "SickCamera": "sick"}
+
+
+def __getattr__(name):
+    # from BKVisionCamera import HikCamera 时才导入对应插件
+    if name in _LAZY_MODELS:
+        return SingCameraAll().resolve(_LAZY_MODELS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def crate_capter(property_) -> CaptureModel:
@@ -10,12 +26,38 @@ def crate_capter(property_) -> CaptureModel:
     return capter.create(property_)
 
 
-def get_camera_list():
+def get_camera_list(timeout=5.0):
+    """
+    并发枚举所有厂商的相机, 返回 {MAC/序列号: CameraInfo}
+    """
     capters = SingCameraAll()
-    return capters.get_camera_list()
+    return capters.get_camera_list(timeout)
 
 
 def createProperty(yaml_path):
     if isinstance(yaml_path, str):
         return BaseProperty(yaml_path)
     return yaml_path
+
+
+async def crate_capter_async(property_) -> CaptureModel:
+    """
+    创建相机时会枚举设备, 在线程池中执行
+    """
+    return await asyncio.get_event_loop().run_in_executor(None, crate_capter, property_)
+
+
+async def get_camera_list_async(timeout=5.0):
+    return await asyncio.get_event_loop().run_in_executor(None, get_camera_list, timeout)
+
+
+async def open_capters(*properties):
+    """
+    并发创建并打开多台相机, 返回的相机需要调用 release() 或 releaseAsync()
+    """
+
+    async def open_(property_):
+        capter = await crate_capter_async(property_)
+        return await capter.__aenter__()
+
+    return await asyncio.gather(*[open_(property_) for property_ in properties])
@@ -1,5 +1,6 @@
-from .MVSDK import *
+from BKVisionCamera.areascancamera.dahuavision.imv_sdk import ImvSdk
 from BKVisionCamera.base import register
+from BKVisionCamera.base.property import GrabTimeoutError
 from BKVisionCamera.base.property.capture import CaptureModel
 
 
@@ -7,24 +8,49 @@ from BKVisionCamera.base.property.capture import CaptureModel
 class DahuaCamera(CaptureModel):
     names = ["dahua", "大华"]
 
+    sdk: ImvSdk
+
     def init(self):
         self.sdk.init()
 
     def open(self):
         self.sdk.open()
+        if self.property.multiThread:
+            self.startGrabThread()
 
     def release(self):
+        self.stopGrabThread()
         self.sdk.release()
 
-    def getFrame(self):
-        return self.sdk.getFrame()
+    def grab(self, timeout=None):
+        """
+        超时返回 None, 其他错误(如断线)抛出, 后台采集线程据此发现断线
+        Args:
+            timeout: 等待的秒数, None 使用 SDK 默认的 1000ms
+        """
+        try:
+            if timeout is None:
+                return self.sdk.getFrame()
+            return self.sdk.getFrame(int(timeout * 1000))
+        except GrabTimeoutError:
+            return None
+
+    def leaseFrame(self, timeout=1000, safe=False):
+        """
+        租用SDK内部缓存中的一帧, 不做内存拷贝, 参见 ImvSdk.leaseFrame
+        """
+        return self.sdk.leaseFrame(timeout, safe)
 
     def __init__(self, property_):
         super().__init__(property_)
-        self.sdk: MvSdk
+        self.sdk: ImvSdk
+
+    @classmethod
+    def getSdkClass(cls):
+        return ImvSdk
 
     def load(self):
-        return MvSdk(self.property)
+        return ImvSdk(self.property)
 
     def __enter__(self):
         # 初始化或打开相机等操作
@@ -34,4 +60,4 @@ class DahuaCamera(CaptureModel):
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         # 清理资源，例如关闭相机
-        self.release()
\ No newline at end of file
+        self.release()
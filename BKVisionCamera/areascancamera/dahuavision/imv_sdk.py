@@ -1,99 +1,582 @@
 import ctypes
-import socket
-import struct
-from ctypes import POINTER, cast, c_ubyte, byref, sizeof, create_string_buffer
+import time
+from ctypes import POINTER, c_void_p, c_char_p, c_int64, c_uint, c_double, c_bool
 from typing import List
 
 import cv2
 import numpy as np
 from BKVisionCamera import BaseProperty
 from BKVisionCamera.areascancamera.dahuavision.MVSDK.IMVApi import MvCamera
-from BKVisionCamera.areascancamera.dahuavision.MVSDK.IMVDefines import IMV_DeviceList, IMV_EInterfaceType, IMV_OK
+from BKVisionCamera.areascancamera.dahuavision.MVSDK.IMVDefines import IMV_DeviceList, IMV_EInterfaceType, IMV_OK, \
+    IMV_StreamStatisticsInfo, IMV_GigEStreamStatsInfo, IMV_U3VStreamStatsInfo, typeGigeCamera, typeU3vCamera, \
+    IMV_Frame, IMV_ECreateHandleMode, IMV_EGrabStrategy, IMV_SConnectArg, IMV_EVType, IMV_EFeatureType, \
+    IMV_ErrorList, IMV_String
 
-from BKVisionCamera.base.property import CameraSdkInterface, CameraInfo
+from BKVisionCamera.base.property import CameraSdkInterface, CameraInfo, GrabTimeoutError, FrameInfo
+from BKVisionCamera.base.property.discovery import discoveryCache
+from BKVisionCamera.base.property.acquisition import GRAB_STRATEGY_LATEST, GRAB_STRATEGY_UPCOMING
+from BKVisionCamera.base.property.frame_lease import FrameLease
+from BKVisionCamera.base.property.frame_ring import FrameRing, DROP_OLDEST, DROP_NEWEST
+from BKVisionCamera.utils.buffer_pool import BufferPool
+from BKVisionCamera.utils.feature_file import loadFeatureFile, toBool
+from BKVisionCamera.utils.pixel_format import PixelDecoder, rawView
+
+try:
+    from ctypes import WINFUNCTYPE as FUNCTYPE
+except ImportError:
+    from ctypes import CFUNCTYPE as FUNCTYPE
+
+# IMV_AttachGrabbing 的回调类型
+IMV_FrameCallBack = FUNCTYPE(None, POINTER(IMV_Frame), c_void_p)
+# IMV_SubscribeConnectArg 的回调类型
+IMV_ConnectCallBack = FUNCTYPE(None, POINTER(IMV_SConnectArg), c_void_p)
+
+GRAB_MODE_POLL = "poll"  # 主动调用 IMV_GetFrame 取流
+GRAB_MODE_CALLBACK = "callback"  # IMV_AttachGrabbing 回调推送图像
+
+
+class ImvFrameLease(FrameLease):
+    """
+    基于 IMV_GetFrame / IMV_ReleaseFrame 的图像租约, 直接访问SDK内部缓存
+    视图按 pixelFormat 的 dtype 和形状构造, Packed 和 Bayer 等需要解码的格式不支持租用
+    """
+
+    def __init__(self, sdk, timeout=1000, safe=False):
+        super().__init__(safe)
+        self.sdk = sdk
+        self.timeout = timeout
+        self.frame_ = IMV_Frame()
+
+    @property
+    def frameInfo(self):
+        return ImvSdk.createFrameInfo(self.frame_.frameInfo)
+
+    def _acquire_(self):
+        ImvSdk.checkGetFrame(self.sdk, self.sdk.IMV_GetFrame(self.frame_, self.timeout))
+        stFrameInfo = self.frame_.frameInfo
+        try:
+            return rawView(self.frame_.pData, stFrameInfo.pixelFormat, stFrameInfo.width, stFrameInfo.height)
+        except Exception:
+            self._free_()
+            raise
+
+    def _free_(self):
+        ret = self.sdk.IMV_ReleaseFrame(self.frame_)
+        if ret != IMV_OK:
+            print(f"释放图像缓存失败 {ret}")
 
 
 class ImvSdk(CameraSdkInterface):
+    cameraConfigNodes = {"gain": "GainRaw"}
 
     @staticmethod
-    def createCamera(cameraInfo):
-        pass
+    def createCamera(pDeviceInfo):
+        def toStr(data):
+            return bytes(data).split(b"\0")[0].decode('utf-8', 'ignore')
+
+        cameraInfo = CameraInfo(pDeviceInfo)
+        gigeInfo = pDeviceInfo.DeviceSpecificInfo.gigeDeviceInfo
+        cameraInfo.nCameraType = pDeviceInfo.nCameraType
+        cameraInfo.cameraKey = toStr(pDeviceInfo.cameraKey)
+        cameraInfo.cameraName = toStr(pDeviceInfo.cameraName)
+        cameraInfo.serialNumber = toStr(pDeviceInfo.serialNumber)
+        cameraInfo.sn = cameraInfo.serialNumber
+        cameraInfo.vendorName = toStr(pDeviceInfo.vendorName)
+        cameraInfo.modelName = toStr(pDeviceInfo.modelName)
+        cameraInfo.deviceVersion = toStr(pDeviceInfo.deviceVersion)
+        cameraInfo.nInterfaceType = pDeviceInfo.nInterfaceType
+        cameraInfo.interfaceName = toStr(pDeviceInfo.interfaceName)
+        if pDeviceInfo.nCameraType == typeGigeCamera:
+            cameraInfo.ip = toStr(gigeInfo.ipAddress)
+            cameraInfo.mac = toStr(gigeInfo.macAddress)
+            cameraInfo.subNetMask = toStr(gigeInfo.subnetMask)
+            cameraInfo.defultGateWay = toStr(gigeInfo.defaultGateWay)
+        return cameraInfo
 
     @staticmethod
-    def getDeviceList() -> List[CameraInfo]:
-        sdk_ = MvCamera()
+    def _enumDevices_():
         deviceList = IMV_DeviceList()
-        nRet = sdk_.IMV_EnumDevices(deviceList,IMV_EInterfaceType.interfaceTypeAll)
-        if nRet != IMV_OK :
+        nRet = MvCamera.IMV_EnumDevices(deviceList, IMV_EInterfaceType.interfaceTypeAll)
+        if nRet != IMV_OK:
             print("enum devices fail! ret[0x%x]" % nRet)
+            return None
+        return deviceList
+
+    @staticmethod
+    def getDeviceList() -> List[CameraInfo]:
+        deviceList = ImvSdk._enumDevices_()
+        if deviceList is None:
             return []
-        cameraInfoList = []
-
-        def toStr(data, count=32):
-            buffer = create_string_buffer(32)
-
-            # 将字节数组复制到字符串缓冲区
-            ctypes.memmove(buffer, data, count)
-
-            # 将字节数据转换为字符串
-            string_data = buffer.value.decode('utf-8')
-            return string_data
-
-        def nto(addr):
-            return socket.inet_ntoa(struct.pack('>L', addr))
-
-        for i in range(deviceList.nDevNum):
-            pDeviceInfo = deviceList.pDevInfo[i]
-            cameraInfo = CameraInfo(pDeviceInfo)
-
-            # ('nCameraType', c_int),
-            # ('nCameraReserved', c_int * 5),
-            # ('cameraKey', c_char * MAX_STRING_LENTH),
-            # ('cameraName', c_char * MAX_STRING_LENTH),
-            # ('serialNumber', c_char * MAX_STRING_LENTH),
-            # ('vendorName', c_char * MAX_STRING_LENTH),
-            # ('modelName', c_char * MAX_STRING_LENTH),
-            # ('manufactureInfo', c_char * MAX_STRING_LENTH),
-            # ('deviceVersion', c_char * MAX_STRING_LENTH),
-            # ('cameraReserved', c_char * MAX_STRING_LENTH * 5),
-            # ('DeviceSpecificInfo', DeviceSpecificInfo),
-            # ('nInterfaceType', c_int),
-            # ('nInterfaceReserved', c_int * 5),
-            # ('interfaceName', c_char * MAX_STRING_LENTH),
-            # ('interfaceReserved', c_char * MAX_STRING_LENTH * 5),
-            # ('InterfaceInfo', InterfaceInfo),
-            cameraInfo.nCameraType = nto(pDeviceInfo.nCameraType)
-            cameraInfo.cameraKey = toStr(pDeviceInfo.cameraKey)
-            cameraInfo.cameraName = toStr(pDeviceInfo.cameraName)
-            cameraInfo.serialNumber = toStr(pDeviceInfo.serialNumber)
-            cameraInfo.vendorName = toStr(pDeviceInfo.vendorName)
-            cameraInfo.modelName = toStr(pDeviceInfo.modelName)
-            cameraInfo.deviceVersion = toStr(pDeviceInfo.deviceVersion)
-            cameraInfo.nInterfaceType = nto(pDeviceInfo.nInterfaceType)
-            cameraInfo.interfaceName = toStr(pDeviceInfo.interfaceName)
-
-            cameraInfoList.append(cameraInfo)
+        return [ImvSdk.createCamera(deviceList.pDevInfo[i]) for i in range(deviceList.nDevNum)]
+
+    @staticmethod
+    def getDeviceListByIp(ip) -> List[CameraInfo]:
+        """
+        单播枚举指定 IP 的 GigE 相机, 不发送广播
+        """
+        deviceList = IMV_DeviceList()
+        nRet = MvCamera.IMV_EnumDevicesByUnicast(deviceList, ip)
+        if nRet != IMV_OK:
+            print("enum devices by unicast fail! ret[0x%x]" % nRet)
+            return []
+        return [ImvSdk.createCamera(deviceList.pDevInfo[i]) for i in range(deviceList.nDevNum)]
+
+    @classmethod
+    def discover(cls, property_=None, refresh=False) -> List[CameraInfo]:
+        """
+        按 IP 选择相机时使用单播枚举, 每个 IP 单独缓存
+        """
+        if property_ is not None and property_.selectType == "ip" and property_.ip:
+            return discoveryCache.get(f"{cls.__name__}:{property_.ip}",
+                                      lambda: cls.getDeviceListByIp(property_.ip), refresh)
+        return super().discover(property_, refresh)
 
     def __init__(self, property_: BaseProperty = None, camera_info: CameraInfo = None):
         super().__init__(property_, camera_info)
         self.sdk = MvCamera()
+        self.bufferPool = None
+        self.frameRing = None
+        self.pixelDecoder = PixelDecoder()
+        self._frameCallBack = None
+        self._connectCallBack = None
+        self.connected = False
+        self.lastFrameInfo = None
+        self.cameraType = None
+        self.transportSettings = {}
+        self.configReport = None
+        self.paramReport = None
 
     def init(self):
-        pass
+        # 按 cameraKey 创建句柄, 不依赖最近一次枚举的设备顺序, 相机已在枚举缓存中, 无需重新枚举
+        self.cameraType = self.camera_info.nCameraType
+        ret = self.sdk.IMV_CreateHandle(IMV_ECreateHandleMode.modeByCameraKey,
+                                        c_char_p(self.camera_info.cameraKey.encode('ascii')))
+        if ret != IMV_OK:
+            raise Exception("创建句柄失败")
+        return ret
+
+    def open(self):
+        ret = self.sdk.IMV_Open()
+        if ret != IMV_OK:
+            raise Exception("打开设备失败")
+        self.connected = True
+        self.subscribeConnectArg()
+        self.applySnapshot()
+        self.applyCameraConfig()
+        self.applyTransport()
+        self.allocBufferPool()
+        self.applyAcquisition()
+        if self.grabMode == GRAB_MODE_CALLBACK:
+            # 回调必须在开始取流之前注册
+            self.attachGrabbing()
+        self.startGrabbing()
+
+    @property
+    def grabMode(self):
+        if self.property is None:
+            return GRAB_MODE_POLL
+        return self.property.grabMode
+
+    def allocBufferPool(self):
+        # 按 PayloadSize 预分配取流内存, 取流过程中不再查询图像尺寸也不再分配
+        self.bufferPool = BufferPool(self.payloadSize, self.bufferPoolCount)
+
+    def applyAcquisition(self):
+        """
+        按 acquisition 配置设置 SDK 缓存帧数, 取流策略在 startGrabbing 时传入
+        大华 SDK 没有输出队列长度, latest 策略只保留最新一帧
+        """
+        if self.acquisition.bufferCount:
+            if self.sdk.IMV_SetBufferCount(self.acquisition.bufferCount) != IMV_OK:
+                raise Exception("设置SDK缓存帧数失败")
+
+    def subscribeConnectArg(self):
+        """
+        订阅设备连接事件, 断线时立即通知 ConnectionSupervisor
+        """
+        # 保存回调对象的引用, 防止被回收后 SDK 调用野指针
+        self._connectCallBack = IMV_ConnectCallBack(self._onConnect_)
+        if self.sdk.IMV_SubscribeConnectArg(self._connectCallBack, None) != IMV_OK:
+            self._connectCallBack = None
+            raise Exception("订阅连接事件失败")
+
+    def _onConnect_(self, pConnectArg, pUser):
+        self.connected = pConnectArg.contents.event == IMV_EVType.onLine
+        if not self.connected:
+            self._disconnected_()
+
+    def isConnected(self):
+        return self.connected
+
+    def reset(self):
+        # 设备断开后停止取流和关闭设备都可能失败, 逐步执行, 保证句柄被销毁
+        for step in (self.stopGrabbing, self.sdk.IMV_Close, self.sdk.IMV_DestroyHandle):
+            try:
+                step()
+            except Exception as e:
+                print(f"释放相机失败 ({e})")
+        self.connected = False
+
+    def applyTransport(self):
+        """
+        按 transport 配置设置 GigE 包长 包间延时 包超时和丢包上限, 必须在开始取流之前调用
+        大华 SDK 没有探测最佳包长的接口, auto 保持相机当前包长; 重发由 SDK 管理, 只能限制单次重发包数
+        """
+        self.transportSettings = {}
+        if self.cameraType != typeGigeCamera:
+            return self.transportSettings
+        transport = self.transport
+        if not transport.autoPacketSize and transport.packetSize is not None:
+            self._check_(self.sdk.IMV_SetIntFeatureValue("GevSCPSPacketSize", c_int64(transport.packetSize)),
+                         "GevSCPSPacketSize")
+        if transport.packetDelay is not None:
+            self._check_(self.sdk.IMV_SetIntFeatureValue("GevSCPD", c_int64(transport.packetDelay)), "GevSCPD")
+        if transport.resend is not None and not transport.resend:
+            self._check_(self.sdk.IMV_GIGE_SetSingleResendMaxPacketNum(0), "SingleResendMaxPacketNum")
+        if transport.packetTimeout is not None:
+            self._check_(self.sdk.IMV_GIGE_SetInterPacketTimeout(transport.packetTimeout), "InterPacketTimeout")
+        if transport.maxLostPacket is not None:
+            self._check_(self.sdk.IMV_GIGE_SetMaxLostPacketNum(transport.maxLostPacket), "MaxLostPacketNum")
+        self.transportSettings = {
+            "packetSize": self._getInt_("GevSCPSPacketSize"),
+            "packetDelay": self._getInt_("GevSCPD"),
+            "resend": None if transport.resend is None else bool(transport.resend),
+            "packetTimeout": transport.packetTimeout,
+            "maxLostPacket": transport.maxLostPacket,
+        }
+        return self.transportSettings
+
+    @property
+    def grabStrategy(self):
+        strategy = self.acquisition.strategy
+        if strategy == GRAB_STRATEGY_LATEST:
+            return IMV_EGrabStrategy.grabStrartegyLatestImage
+        if strategy == GRAB_STRATEGY_UPCOMING:
+            return IMV_EGrabStrategy.grabStrartegyUpcomingImage
+        return IMV_EGrabStrategy.grabStrartegySequential
+
+    def attachGrabbing(self):
+        """
+        注册图像回调, 图像由 SDK 线程推送到 frameRing, getFrame 直接从缓存读取
+        """
+        # 回调线程不能阻塞, block 策略按 oldest 处理
+        if self.property is not None and self.property.dropPolicy == DROP_NEWEST:
+            dropPolicy = DROP_NEWEST
+        else:
+            dropPolicy = DROP_OLDEST
+        ringSize = self.property.ringSize if self.property is not None else 8
+        self.frameRing = FrameRing(ringSize, dropPolicy)
+        # 保存回调对象的引用, 防止被回收后 SDK 调用野指针
+        self._frameCallBack = IMV_FrameCallBack(self._onFrame_)
+        ret = self.sdk.IMV_AttachGrabbing(self._frameCallBack, None)
+        if ret != IMV_OK:
+            self.frameRing = None
+            self._frameCallBack = None
+            raise Exception("注册图像回调失败")
+
+    def _onFrame_(self, pFrame, pUser):
+        # 在 SDK 取流线程中执行, 只做一次内存拷贝后入队, 回调返回后 SDK 自动回收该帧
+        frame_ = pFrame.contents
+        buffer = self._callbackBuffer_()
+        if buffer is not None:
+            self.frameRing.put(self._copyFrame_(frame_, buffer))
+
+    def _callbackBuffer_(self):
+        # 回调线程不能阻塞, 内存池用完时按丢帧策略丢弃最旧的一帧腾出内存, 否则丢弃新到的一帧
+        buffer = self.bufferPool.acquire()
+        if buffer is None:
+            frame = self.frameRing.discard()
+            if frame is not None:
+                frame.release()
+                buffer = self.bufferPool.acquire()
+        return buffer
+
+    def _copyFrame_(self, frame_, buffer):
+        stFrameInfo = frame_.frameInfo
+        size = min(stFrameInfo.size, self.bufferPool.size)
+        ctypes.memmove(buffer, frame_.pData, size)
+        frame = self.bufferPool.wrap(buffer, (size,))
+        frame.info = ImvSdk.createFrameInfo(stFrameInfo)
+        return frame
+
+    @staticmethod
+    def createFrameInfo(stFrameInfo) -> FrameInfo:
+        """
+        从 IMV_FrameInfo 中取出常用字段, 不保留 SDK 结构体
+        IMV_FrameInfo 没有丢包数, status 非 0 表示残帧, 记为 1
+        """
+        return FrameInfo(stFrameInfo.blockId,
+                         stFrameInfo.timeStamp,
+                         int(time.time() * 1000),
+                         0 if stFrameInfo.status == 0 else 1,
+                         stFrameInfo.pixelFormat,
+                         stFrameInfo.width,
+                         stFrameInfo.height,
+                         stFrameInfo.size)
+
+    @staticmethod
+    def checkGetFrame(sdk, ret):
+        if ret == IMV_OK:
+            return
+        # IMV_GetFrame 超时没有独立的错误码, 仍在取流时按超时处理
+        if sdk.IMV_IsGrabbing():
+            raise GrabTimeoutError("采集图像超时")
+        raise Exception("采集图像失败")
+
+    def startGrabbing(self):
+        if self.frameRing is not None:
+            self.frameRing.open()
+        # maxImagesGrabbed 为 0 时连续取流
+        ret = self.sdk.IMV_StartGrabbingEx(0, self.grabStrategy)
+        if ret != IMV_OK:
+            raise Exception("开始取流失败")
+        self.isGrabbing = True
+
+    def stopGrabbing(self):
+        self.isGrabbing = False
+        if self.frameRing is not None:
+            # 唤醒等待回调图像的线程
+            self.frameRing.close()
+        ret = self.sdk.IMV_StopGrabbing()
+        if ret != IMV_OK:
+            raise Exception("停止取流失败")
+        return ret
 
     def release(self):
-        pass
+        self.stopGrabbing()
+        ret = self.sdk.IMV_Close()
+        if ret != IMV_OK:
+            raise Exception("关闭设备失败")
+        ret = self.sdk.IMV_DestroyHandle()
+        if ret != IMV_OK:
+            raise Exception("销毁句柄失败")
+        return ret
+
+    def getFrame(self, timeout=1000):
+        """
+        取一帧, 返回的图像不占用 SDK 缓存, 可以任意长时间持有
+        轮询模式下 IMV_GetFrame 的数据拷贝到预分配的内存池后立即 IMV_ReleaseFrame, SDK 缓存不会被调用方耗尽;
+        需要零拷贝时使用 leaseFrame, 在 with 块内直接访问 SDK 缓存
+        """
+        if self.frameRing is not None:
+            # 回调模式, 图像已由 SDK 线程写入缓存
+            frame = self.frameRing.get(timeout / 1000)
+            if frame is None:
+                raise GrabTimeoutError("采集图像超时")
+        else:
+            # 内存池用完时等待调用方归还, 期间新帧留在 SDK 缓存中按取流策略丢弃
+            buffer = self.bufferPool.acquire(timeout / 1000)
+            if buffer is None:
+                raise GrabTimeoutError("取流内存池已用完")
+            frame_ = IMV_Frame()
+            try:
+                ImvSdk.checkGetFrame(self.sdk, self.sdk.IMV_GetFrame(frame_, timeout))
+            except Exception:
+                self.bufferPool.release(buffer)
+                raise
+            try:
+                frame = self._copyFrame_(frame_, buffer)
+            finally:
+                # 拷贝后立即归还, SDK 缓存不会被调用方占用
+                self.sdk.IMV_ReleaseFrame(frame_)
+        self.lastFrameInfo = frame.info
+        return self.pixelDecoder.decodeFrame(frame)
+
+    def leaseFrame(self, timeout=1000, safe=False) -> ImvFrameLease:
+        """
+        租用SDK内部缓存中的一帧, 不做内存拷贝
+        用法:
+            with sdk.leaseFrame() as frame:
+                ...
+        Args:
+            timeout: 等待的毫秒数
+            safe: 安全模式, 返回 LeasedFrame, 退出 with 块时仍被引用则拷贝后归还缓存, 否则退出后视图立即失效
+        """
+        if self.frameRing is not None:
+            raise Exception("回调取流模式下不支持租用图像缓存")
+        return ImvFrameLease(self.sdk, timeout, safe)
+
+    def frames(self, timeout=1000):
+        """
+        连续取流的迭代器, 轮询和回调模式用法相同
+        Args:
+            timeout: 单帧等待的毫秒数, 超时后继续等待下一帧
+        """
+        while self.isGrabbing:
+            try:
+                yield self.getFrame(timeout)
+            except GrabTimeoutError:
+                continue
+
+    def _getInt_(self, name):
+        value = c_int64()
+        if self.sdk.IMV_GetIntFeatureValue(name, value) != IMV_OK:
+            raise Exception(f"读取参数 {name} 失败")
+        return value.value
+
+    def _getDouble_(self, name):
+        value = c_double()
+        if self.sdk.IMV_GetDoubleFeatureValue(name, value) != IMV_OK:
+            raise Exception(f"读取参数 {name} 失败")
+        return value.value
+
+    def _check_(self, ret, name):
+        if ret != IMV_OK:
+            raise Exception(f"设置参数 {name} 失败")
+
+    @property
+    def payloadSize(self):
+        return self._getInt_("PayloadSize")
+
+    @property
+    def width(self):
+        return self._getInt_("Width")
+
+    @property
+    def height(self):
+        return self._getInt_("Height")
+
+    @property
+    def exposureTime(self):
+        return self._getDouble_("ExposureTime")
+
+    @exposureTime.setter
+    def exposureTime(self, value):
+        self._check_(self.sdk.IMV_SetDoubleFeatureValue("ExposureTime", value), "ExposureTime")
+
+    @property
+    def gain(self):
+        return self._getDouble_("GainRaw")
+
+    @gain.setter
+    def gain(self, value):
+        self._check_(self.sdk.IMV_SetDoubleFeatureValue("GainRaw", value), "GainRaw")
+
+    def setExposureTime(self, exposureTime):
+        self.exposureTime = exposureTime
+
+    def setTriggerSource(self, source):
+        """
+        开启触发模式并设置触发源
+        Args:
+            source: 触发源 如 Software Line1
+        """
+        self._check_(self.sdk.IMV_SetEnumFeatureSymbol("TriggerMode", "On"), "TriggerMode")
+        self._check_(self.sdk.IMV_SetEnumFeatureSymbol("TriggerSource", source), "TriggerSource")
+
+    def triggerSoftware(self):
+        self._check_(self.sdk.IMV_ExecuteCommandFeature("TriggerSoftware"), "TriggerSoftware")
+
+    def getFeatureType(self, name):
+        featureType = c_uint()
+        if not self.sdk.IMV_GetFeatureType(name, featureType):
+            raise Exception(f"获取节点{name}类型失败")
+        return featureType.value
+
+    def hasFeature(self, name):
+        return bool(self.sdk.IMV_FeatureIsAvailable(name))
+
+    def getFeature(self, name):
+        """
+        按节点类型读取任意 GenICam 参数, 枚举返回符号
+        """
+        featureType = self.getFeatureType(name)
+        if featureType == IMV_EFeatureType.featureInt:
+            return self._getInt_(name)
+        if featureType == IMV_EFeatureType.featureFloat:
+            return self._getDouble_(name)
+        if featureType == IMV_EFeatureType.featureBool:
+            value = c_bool()
+            ret = self.sdk.IMV_GetBoolFeatureValue(name, value)
+        elif featureType == IMV_EFeatureType.featureEnum:
+            value = IMV_String()
+            ret = self.sdk.IMV_GetEnumFeatureSymbol(name, value)
+        elif featureType == IMV_EFeatureType.featureString:
+            value = IMV_String()
+            ret = self.sdk.IMV_GetStringFeatureValue(name, value)
+        else:
+            raise Exception(f"节点{name}不支持读取")
+        if ret != IMV_OK:
+            raise Exception(f"读取参数 {name} 失败")
+        if isinstance(value, c_bool):
+            return value.value
+        return value.str.decode('utf-8')
+
+    def setFeature(self, name, value=None):
+        """
+        按节点类型写入任意 GenICam 参数, Command 节点不需要 value
+        """
+        featureType = self.getFeatureType(name)
+        if featureType == IMV_EFeatureType.featureInt:
+            ret = self.sdk.IMV_SetIntFeatureValue(name, c_int64(int(value)))
+        elif featureType == IMV_EFeatureType.featureFloat:
+            ret = self.sdk.IMV_SetDoubleFeatureValue(name, float(value))
+        elif featureType == IMV_EFeatureType.featureEnum:
+            if isinstance(value, str):
+                ret = self.sdk.IMV_SetEnumFeatureSymbol(name, value)
+            else:
+                ret = self.sdk.IMV_SetEnumFeatureValue(name, value)
+        elif featureType == IMV_EFeatureType.featureBool:
+            ret = self.sdk.IMV_SetBoolFeatureValue(name, toBool(value))
+        elif featureType == IMV_EFeatureType.featureString:
+            ret = self.sdk.IMV_SetStringFeatureValue(name, value)
+        elif featureType == IMV_EFeatureType.featureCommand:
+            ret = self.sdk.IMV_ExecuteCommandFeature(name)
+        else:
+            raise Exception(f"节点{name}不支持写入")
+        self._check_(ret, name)
+        return ret
 
     def saveConfig(self, config):
-        pass
+        """
+        IMV_SaveDeviceCfg 保存相机全部参数为快照文件
+        """
+        if self.sdk.IMV_SaveDeviceCfg(str(config)) != IMV_OK:
+            raise Exception("保存相机参数失败")
 
     def loadConfig(self, config):
-        pass
+        """
+        加载快照文件, 只写入与相机当前值不同的节点, 结果保存在 configReport
+        """
+        self.configReport = loadFeatureFile(config, self.saveConfig, self.setFeature, self._loadDeviceCfg_)
+        return self.configReport
+
+    def _loadDeviceCfg_(self, config):
+        errorList = IMV_ErrorList()
+        if self.sdk.IMV_LoadDeviceCfg(str(config), errorList) != IMV_OK:
+            raise Exception("加载相机参数失败")
+        if errorList.nParamCnt:
+            print(f"加载相机参数时 {errorList.nParamCnt} 个节点失败")
+
+    def getTransportStats(self):
+        """
+        IMV_GetStatisticsInfo 的流统计, 按相机类型取对应的结构体
+        C 头文件中三种统计信息是 nCameraType 之后的联合体, Python 绑定按结构体顺序声明,
+        只有第一个成员的偏移正确, 其他类型从同一偏移处读取
+        """
+        statsInfo = IMV_StreamStatisticsInfo()
+        if self.sdk.IMV_GetStatisticsInfo(statsInfo) != IMV_OK:
+            return {}
+        offset = IMV_StreamStatisticsInfo.pcieStatisticsInfo.offset
+        if statsInfo.nCameraType == typeGigeCamera:
+            info = IMV_GigEStreamStatsInfo.from_buffer(statsInfo, offset)
+        elif statsInfo.nCameraType == typeU3vCamera:
+            info = IMV_U3VStreamStatsInfo.from_buffer(statsInfo, offset)
+        else:
+            info = statsInfo.pcieStatisticsInfo
+        return {
+            "receivedFrames": info.imageReceived,
+            "errorFrames": info.imageError,
+            "lostPacketBlocks": info.lostPacketBlock,
+            "fps": info.fps,
+            "bandwidth": info.bandwidth,
+        }
 
 
 if __name__ == '__main__':
-    sdk = ImvSdk()
-    print(sdk.camera_info_list)
-    print(sdk.camera_info)
+    sdk = ImvSdk(camera_info=ImvSdk.getDeviceList()[0])
     sdk.init()
-    sdk.release()
\ No newline at end of file
+    sdk.open()
+    for frame in sdk.frames():
+        cv2.imshow("frame", frame)
+        cv2.waitKey(1)
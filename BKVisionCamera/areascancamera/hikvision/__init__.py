@@ -1 +1,9 @@
-from .hik_camera import HikCamera
+from importlib import import_module
+
+# hik_camera 加载 MvCameraControl.dll, 使用时才导入, hik_params 等纯 Python 模块在没有SDK的环境下也能导入
+
+
+def __getattr__(name):
+    if name == "HikCamera":
+        return import_module(".hik_camera", __name__).HikCamera
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 from BKVisionCamera.areascancamera.hikvision.hik_sdk import MvSdk
 from BKVisionCamera.base import register
+from BKVisionCamera.base.property import GrabTimeoutError
 from BKVisionCamera.base.property.capture import CaptureModel
 
 
@@ -14,20 +15,40 @@ class HikCamera(CaptureModel):
 
     def open(self):
         self.sdk.open()
+        if self.property.multiThread:
+            self.startGrabThread()
 
     def release(self):
+        self.stopGrabThread()
         self.sdk.release()
 
-    def getFrame(self):
+    def grab(self, timeout=None):
+        """
+        超时返回 None, 其他错误(如断线)抛出, 后台采集线程据此发现断线
+        Args:
+            timeout: 等待的秒数, None 使用 SDK 默认的 1000ms
+        """
         try:
-            return self.sdk.getFrame()
-        except:
+            if timeout is None:
+                return self.sdk.getFrame()
+            return self.sdk.getFrame(int(timeout * 1000))
+        except GrabTimeoutError:
             return None
 
+    def leaseFrame(self, timeout=1000, safe=False):
+        """
+        租用SDK内部缓存中的一帧, 不做内存拷贝, 参见 MvSdk.leaseFrame
+        """
+        return self.sdk.leaseFrame(timeout, safe)
+
     def __init__(self, property_):
         super().__init__(property_)
         self.sdk: MvSdk
 
+    @classmethod
+    def getSdkClass(cls):
+        return MvSdk
+
     def load(self):
         return MvSdk(self.property)
 
@@ -0,0 +1,148 @@
+import time
+from ctypes import c_bool
+
+from BKVisionCamera.areascancamera.hikvision.MvImport.CameraParams_header import MV_XML_InterfaceType, \
+    MVCC_INTVALUE, MVCC_FLOATVALUE, MVCC_ENUMVALUE, MVCC_STRINGVALUE, IFT_IInteger, IFT_IFloat, IFT_IBoolean, \
+    IFT_IString, IFT_IEnumeration, IFT_ICommand
+from BKVisionCamera.utils.feature_file import toBool
+
+# 只读或极少变化的节点, 读取后缓存, 任意写入或 invalidate 后失效
+CACHED_NODES = {
+    "Width", "Height", "OffsetX", "OffsetY", "WidthMax", "HeightMax", "SensorWidth", "SensorHeight",
+    "PayloadSize", "PixelFormat", "PixelSize", "BinningX", "BinningY", "ReverseX", "ReverseY",
+    "DeviceModelName", "DeviceVendorName", "DeviceVersion", "DeviceSerialNumber", "DeviceFirmwareVersion",
+}
+
+
+class NodeLatency(object):
+    """
+    单个节点的SDK访问耗时统计, 单位秒
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def __repr__(self):
+        return f"NodeLatency(count={self.count}, mean={self.mean * 1000:.3f}ms, max={self.max * 1000:.3f}ms)"
+
+
+class HikParams(object):
+    """
+    GenICam 参数读写, 首次访问时查询节点类型, 缓存不常变化的值, 并记录每个节点的访问耗时
+    Args:
+        cam: MvCamera
+        cachedNodes: 需要缓存的节点名, 默认为 CACHED_NODES
+    """
+
+    def __init__(self, cam, cachedNodes=None):
+        self.cam = cam
+        self.cachedNodes = set(CACHED_NODES if cachedNodes is None else cachedNodes)
+        self.latency = {}
+        self._types = {}
+        self._values = {}
+
+    def _record_(self, name, start):
+        latency = self.latency.get(name)
+        if latency is None:
+            latency = self.latency[name] = NodeLatency()
+        latency.add(time.perf_counter() - start)
+
+    def nodeType(self, name):
+        """
+        节点类型 IFT_IInteger / IFT_IFloat ..., 只查询一次
+        """
+        nodeType = self._types.get(name)
+        if nodeType is None:
+            enType = MV_XML_InterfaceType()
+            ret = self.cam.MV_XML_GetNodeInterfaceType(name, enType)
+            if ret != 0:
+                raise Exception(f"获取节点{name}类型失败")
+            nodeType = self._types[name] = enType.value
+        return nodeType
+
+    def get(self, name):
+        if name in self._values:
+            return self._values[name]
+        nodeType = self.nodeType(name)
+        start = time.perf_counter()
+        if nodeType == IFT_IInteger:
+            stParam = MVCC_INTVALUE()
+            ret = self.cam.MV_CC_GetIntValue(name, stParam)
+            value = stParam.nCurValue
+        elif nodeType == IFT_IFloat:
+            stParam = MVCC_FLOATVALUE()
+            ret = self.cam.MV_CC_GetFloatValue(name, stParam)
+            value = stParam.fCurValue
+        elif nodeType == IFT_IEnumeration:
+            stParam = MVCC_ENUMVALUE()
+            ret = self.cam.MV_CC_GetEnumValue(name, stParam)
+            value = stParam.nCurValue
+        elif nodeType == IFT_IBoolean:
+            stParam = c_bool()
+            ret = self.cam.MV_CC_GetBoolValue(name, stParam)
+            value = stParam.value
+        elif nodeType == IFT_IString:
+            stParam = MVCC_STRINGVALUE()
+            ret = self.cam.MV_CC_GetStringValue(name, stParam)
+            value = stParam.chCurValue.decode('utf-8')
+        else:
+            raise Exception(f"节点{name}不支持读取")
+        self._record_(name, start)
+        if ret != 0:
+            raise Exception(f"获取{name}失败")
+        if name in self.cachedNodes:
+            self._values[name] = value
+        return value
+
+    def set(self, name, value=None):
+        nodeType = self.nodeType(name)
+        start = time.perf_counter()
+        if nodeType == IFT_IInteger:
+            ret = self.cam.MV_CC_SetIntValue(name, int(value))
+        elif nodeType == IFT_IFloat:
+            ret = self.cam.MV_CC_SetFloatValue(name, float(value))
+        elif nodeType == IFT_IEnumeration:
+            if isinstance(value, str):
+                ret = self.cam.MV_CC_SetEnumValueByString(name, value)
+            else:
+                ret = self.cam.MV_CC_SetEnumValue(name, value)
+        elif nodeType == IFT_IBoolean:
+            ret = self.cam.MV_CC_SetBoolValue(name, toBool(value))
+        elif nodeType == IFT_IString:
+            ret = self.cam.MV_CC_SetStringValue(name, value)
+        elif nodeType == IFT_ICommand:
+            ret = self.cam.MV_CC_SetCommandValue(name)
+        else:
+            raise Exception(f"节点{name}不支持写入")
+        self._record_(name, start)
+        # 写入可能改变其他节点, 如 Width 影响 PayloadSize, 整体失效
+        self._values.clear()
+        if ret != 0:
+            raise Exception(f"设置{name}失败")
+        return ret
+
+    def invalidate(self):
+        """
+        通知SDK刷新节点并清空缓存, 相机参数被外部修改后调用
+        """
+        self._values.clear()
+        return self.cam.MV_CC_InvalidateNodes()
+
+    def clear(self):
+        """
+        清空值缓存和节点类型, 重新打开相机后调用
+        """
+        self._values.clear()
+        self._types.clear()
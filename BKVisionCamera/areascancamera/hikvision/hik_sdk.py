@@ -1,18 +1,83 @@
 import ctypes
 import socket
 import struct
-from ctypes import POINTER, cast, c_ubyte, byref, sizeof, create_string_buffer
+from ctypes import POINTER, cast, c_ubyte, c_uint, c_void_p, byref, sizeof, create_string_buffer
 from typing import List
 
 import cv2
 import numpy as np
 
+from BKVisionCamera.areascancamera.hikvision.hik_params import HikParams
 from BKVisionCamera.areascancamera.hikvision.MvImport.CameraParams_const import MV_GIGE_DEVICE, MV_USB_DEVICE, \
-    MV_ACCESS_Exclusive, MV_CAMERALINK_DEVICE
+    MV_ACCESS_Exclusive, MV_CAMERALINK_DEVICE, MV_EXCEPTION_DEV_DISCONNECT
 from BKVisionCamera.areascancamera.hikvision.MvImport.CameraParams_header import MV_CC_DEVICE_INFO_LIST, \
-    MV_CC_DEVICE_INFO, MV_TRIGGER_MODE_OFF,MV_TRIGGER_MODE_ON, MV_FRAME_OUT_INFO_EX, MVCC_ENUMVALUE, MVCC_INTVALUE, MV_GIGE_DEVICE_INFO
+    MV_CC_DEVICE_INFO, MV_TRIGGER_MODE_OFF,MV_TRIGGER_MODE_ON, MV_FRAME_OUT_INFO_EX, MV_FRAME_OUT, MV_GIGE_DEVICE_INFO, \
+    MV_ACTION_CMD_INFO, MV_ACTION_CMD_RESULT_LIST, MV_CC_PIXEL_CONVERT_PARAM_EX, MV_NETTRANS_INFO, \
+    MV_GrabStrategy_OneByOne, MV_GrabStrategy_LatestImagesOnly, MV_GrabStrategy_LatestImages, \
+    MV_GrabStrategy_UpcomingImage
 from BKVisionCamera.areascancamera.hikvision.MvImport.MvCameraControl_class import MvCamera
-from BKVisionCamera.base.property import CameraInfo, CameraSdkInterface, BaseProperty
+from BKVisionCamera.areascancamera.hikvision.MvImport.MvErrorDefine_const import MV_E_NODATA, MV_E_GC_TIMEOUT
+from BKVisionCamera.areascancamera.hikvision.MvImport.PixelType_header import PixelType_Gvsp_Mono8, \
+    PixelType_Gvsp_Mono16, PixelType_Gvsp_BGR8_Packed, PixelType_Gvsp_RGB16_Packed
+from BKVisionCamera.base.property import CameraInfo, CameraSdkInterface, BaseProperty, GrabTimeoutError, FrameInfo
+from BKVisionCamera.base.property.acquisition import GRAB_STRATEGY_LATEST, GRAB_STRATEGY_UPCOMING
+from BKVisionCamera.base.property.frame_lease import FrameLease
+from BKVisionCamera.base.property.frame_ring import FrameRing, DROP_OLDEST, DROP_NEWEST
+from BKVisionCamera.utils.buffer_pool import BufferPool
+from BKVisionCamera.utils.feature_file import loadFeatureFile
+from BKVisionCamera.utils.pixel_format import PixelDecoder, getPixelFormat, benchmark, fastestPath, rawView
+
+try:
+    from ctypes import WINFUNCTYPE as FUNCTYPE
+except ImportError:
+    from ctypes import CFUNCTYPE as FUNCTYPE
+
+# MV_CC_RegisterImageCallBackEx 的回调类型
+FrameInfoCallBack = FUNCTYPE(None, POINTER(c_ubyte), POINTER(MV_FRAME_OUT_INFO_EX), c_void_p)
+# MV_CC_RegisterExceptionCallBack 的回调类型
+ExceptionCallBack = FUNCTYPE(None, c_uint, c_void_p)
+
+GRAB_MODE_POLL = "poll"  # 主动调用 MV_CC_GetOneFrameTimeout 取流
+GRAB_MODE_CALLBACK = "callback"  # SDK 回调推送图像
+
+PIXEL_CONVERT_NUMPY = "numpy"  # numpy / OpenCV 解码
+PIXEL_CONVERT_SDK = "sdk"  # MV_CC_ConvertPixelTypeEx 转换
+PIXEL_CONVERT_AUTO = "auto"  # 每种格式首帧测速, 选最快的方式
+
+
+class HikFrameLease(FrameLease):
+    """
+    基于 MV_CC_GetImageBuffer / MV_CC_FreeImageBuffer 的图像租约, 直接访问SDK内部缓存
+    视图按 enPixelType 的 dtype 和形状构造, Packed 和 Bayer 等需要解码的格式不支持租用
+    """
+
+    def __init__(self, cam: MvCamera, timeout=1000, safe=False):
+        super().__init__(safe)
+        self.cam = cam
+        self.timeout = timeout
+        self.stOutFrame = MV_FRAME_OUT()
+
+    @property
+    def frameInfo(self):
+        return MvSdk.createFrameInfo(self.stOutFrame.stFrameInfo)
+
+    def _acquire_(self):
+        ret = self.cam.MV_CC_GetImageBuffer(self.stOutFrame, self.timeout)
+        if ret != 0:
+            if ret in (MV_E_NODATA, MV_E_GC_TIMEOUT):
+                raise GrabTimeoutError("采集图像超时")
+            raise Exception("采集图像失败")
+        stFrameInfo = self.stOutFrame.stFrameInfo
+        try:
+            return rawView(self.stOutFrame.pBufAddr, stFrameInfo.enPixelType, stFrameInfo.nWidth, stFrameInfo.nHeight)
+        except Exception:
+            self._free_()
+            raise
+
+    def _free_(self):
+        ret = self.cam.MV_CC_FreeImageBuffer(self.stOutFrame)
+        if ret != 0:
+            print(f"释放图像缓存失败 {ret}")
 
 
 class MvSdk(CameraSdkInterface):
@@ -20,12 +85,39 @@ class MvSdk(CameraSdkInterface):
     def __init__(self, property_: BaseProperty = None, camera_info: CameraInfo = None):
         super().__init__(property_, camera_info)
         self.cam = MvCamera()
+        self.params = HikParams(self.cam)
+        self.bufferPool = None
+        self.frameRing = None
+        self._imageCallBack = None
+        self._exceptionCallBack = None
+        self.lastFrameInfo = None
+        self.transportLayer = None
+        self.transportSettings = {}
+        self.configReport = None
+        self.paramReport = None
+        self.pixelDecoder = PixelDecoder()
+        # 各像素格式选定的解码方式
+        self.convertPaths = {}
 
     def saveConfig(self, config):
-        pass
+        """
+        MV_CC_FeatureSave 保存相机全部参数为快照文件
+        """
+        if self.cam.MV_CC_FeatureSave(str(config)) != 0:
+            raise Exception("保存相机参数失败")
 
     def loadConfig(self, config):
-        pass
+        """
+        加载快照文件, 只写入与相机当前值不同的节点, 结果保存在 configReport
+        """
+        self.configReport = loadFeatureFile(config, self.saveConfig, self.setFeature, self._featureLoad_)
+        # 节点可能被整体改写, 清空参数缓存
+        self.params.invalidate()
+        return self.configReport
+
+    def _featureLoad_(self, config):
+        if self.cam.MV_CC_FeatureLoad(str(config)) != 0:
+            raise Exception("加载相机参数失败")
 
     @staticmethod
     def _getCameraInfo_(camera_):
@@ -43,7 +135,8 @@ class MvSdk(CameraSdkInterface):
 
     @staticmethod
     def createCamera(stDeviceInfo):
-        stDeviceInfo = cast(stDeviceInfo, POINTER(MV_CC_DEVICE_INFO)).contents
+        # 设备列表的内存在下次枚举时会被 SDK 覆盖, 保存副本供缓存后直接创建句柄
+        stDeviceInfo = MV_CC_DEVICE_INFO.from_buffer_copy(cast(stDeviceInfo, POINTER(MV_CC_DEVICE_INFO)).contents)
         camera_info = CameraInfo(stDeviceInfo)
         camera_info.majorVer = stDeviceInfo.nMajorVer
         camera_info.minorVer = stDeviceInfo.nMinorVer
@@ -81,30 +174,29 @@ class MvSdk(CameraSdkInterface):
         camera_info.netExport = nto(stDeviceInfo.SpecialInfo.stGigEInfo.nNetExport)
         return camera_info
 
+    @staticmethod
+    def createFrameInfo(stFrameInfo) -> FrameInfo:
+        """
+        从 MV_FRAME_OUT_INFO_EX 中取出常用字段, 不保留 SDK 结构体
+        """
+        return FrameInfo(stFrameInfo.nFrameNum,
+                         stFrameInfo.nDevTimeStampHigh << 32 | stFrameInfo.nDevTimeStampLow,
+                         stFrameInfo.nHostTimeStamp,
+                         stFrameInfo.nLostPacket,
+                         stFrameInfo.enPixelType,
+                         stFrameInfo.nWidth,
+                         stFrameInfo.nHeight,
+                         stFrameInfo.nFrameLen)
+
     @staticmethod
     def getDeviceList() -> List[CameraInfo]:
         cam_ = MvCamera()
         return MvSdk._getCameraInfo_(cam_)
 
-    def _enumDevices_(self):
-        # 创建相机实例
-        stDevList = MV_CC_DEVICE_INFO_LIST()
-        ret = self.cam.MV_CC_EnumDevices(MV_GIGE_DEVICE | MV_USB_DEVICE | MV_CAMERALINK_DEVICE | MV_CAMERALINK_DEVICE
-                                         , stDevList)
-        return stDevList, ret
-
     def init(self):
-        stDevList, ret = self._enumDevices_()
-        index = -1
-        for i in range(stDevList.nDeviceNum):
-            print("stDevList.pDeviceInfo[i]", stDevList.pDeviceInfo[i])
-            if self.camera_info == MvSdk.createCamera(stDevList.pDeviceInfo[i]):
-                index = i
-                break
-        print(self.camera_info.ip)
-        print(fr"index {index}")
-        stDevInfo = cast(stDevList.pDeviceInfo[index], POINTER(MV_CC_DEVICE_INFO)).contents
-        # 选择第一台相机并创建句柄
+        # 枚举缓存中的 CameraInfo 保存了设备信息结构体, 直接创建句柄, 不再重新枚举
+        stDevInfo = self.camera_info._devInfo_
+        self.transportLayer = stDevInfo.nTLayerType
         ret = self.cam.MV_CC_CreateHandle(stDevInfo)
         if ret != 0:
             raise Exception("创建句柄失败")
@@ -113,9 +205,159 @@ class MvSdk(CameraSdkInterface):
     def open(self):
         # 打开设备
         self._open()
+        self.registerExceptionCallBack()
+        self.applySnapshot()
+        self.applyCameraConfig()
+        self.applyTransport()
+        self.allocBufferPool()
+        self.applyAcquisition()
+        if self.grabMode == GRAB_MODE_CALLBACK:
+            # 回调必须在开始取流之前注册
+            self.registerImageCallBack()
         self.startGrabbing()
 
+    @property
+    def grabMode(self):
+        if self.property is None:
+            return GRAB_MODE_POLL
+        return self.property.grabMode
+
+    def applyAcquisition(self):
+        """
+        按 acquisition 配置设置 SDK 缓存节点数和取流策略, 必须在开始取流之前调用
+        """
+        acquisition = self.acquisition
+        if acquisition.bufferCount:
+            if self.cam.MV_CC_SetImageNodeNum(acquisition.bufferCount) != 0:
+                raise Exception("设置SDK缓存节点数失败")
+        if acquisition.strategy == GRAB_STRATEGY_LATEST:
+            if acquisition.outputQueueSize > 1:
+                strategy = MV_GrabStrategy_LatestImages
+            else:
+                strategy = MV_GrabStrategy_LatestImagesOnly
+        elif acquisition.strategy == GRAB_STRATEGY_UPCOMING:
+            strategy = MV_GrabStrategy_UpcomingImage
+        else:
+            strategy = MV_GrabStrategy_OneByOne
+        if self.cam.MV_CC_SetGrabStrategy(strategy) != 0:
+            raise Exception("设置取流策略失败")
+        if strategy == MV_GrabStrategy_LatestImages:
+            # 输出队列只在 LatestImages 策略下生效
+            if self.cam.MV_CC_SetOutputQueueSize(acquisition.outputQueueSize) != 0:
+                raise Exception("设置输出队列长度失败")
+
+    def applyTransport(self):
+        """
+        按 transport 配置设置 GigE 包长 包间延时 重发和包超时, 必须在开始取流之前调用
+        auto 包长使用 MV_CC_GetOptimalPacketSize 探测的最大可用包长, 探测失败时保持相机当前包长
+        实际生效的参数保存在 transportSettings
+        """
+        self.transportSettings = {}
+        if self.transportLayer != MV_GIGE_DEVICE:
+            return self.transportSettings
+        transport = self.transport
+        packetSize = transport.packetSize
+        if transport.autoPacketSize:
+            packetSize = self.cam.MV_CC_GetOptimalPacketSize()
+            # restype 为 c_uint, 错误码会变成很大的正数
+            if packetSize <= 0 or packetSize >= 0x80000000:
+                print(f"获取最佳包长失败 {packetSize:#x}, 保持当前包长")
+                packetSize = None
+        if packetSize is not None:
+            self.params.set("GevSCPSPacketSize", packetSize)
+        if transport.packetDelay is not None:
+            self.params.set("GevSCPD", transport.packetDelay)
+        if transport.resend is not None:
+            if self.cam.MV_GIGE_SetResend(int(transport.resend), transport.resendPercent,
+                                          transport.resendTimeout) != 0:
+                raise Exception("设置丢包重发失败")
+        if transport.packetTimeout is not None:
+            if self.cam.MV_GIGE_SetGvspTimeout(transport.packetTimeout) != 0:
+                raise Exception("设置取流包超时失败")
+        packetTimeout = c_uint()
+        self.transportSettings = {
+            "packetSize": self.params.get("GevSCPSPacketSize"),
+            "packetDelay": self.params.get("GevSCPD"),
+            "resend": None if transport.resend is None else bool(transport.resend),
+            "resendPercent": transport.resendPercent,
+            "resendTimeout": transport.resendTimeout,
+            "packetTimeout": packetTimeout.value if self.cam.MV_GIGE_GetGvspTimeout(packetTimeout) == 0 else None,
+        }
+        return self.transportSettings
+
+    def registerExceptionCallBack(self):
+        """
+        注册设备异常回调, 断线时立即通知 ConnectionSupervisor
+        """
+        # 保存回调对象的引用, 防止被回收后 SDK 调用野指针
+        self._exceptionCallBack = ExceptionCallBack(self._onException_)
+        if self.cam.MV_CC_RegisterExceptionCallBack(self._exceptionCallBack, None) != 0:
+            self._exceptionCallBack = None
+            raise Exception("注册异常回调失败")
+
+    def _onException_(self, nMsgType, pUser):
+        if nMsgType == MV_EXCEPTION_DEV_DISCONNECT:
+            self._disconnected_()
+
+    def isConnected(self):
+        return bool(self.cam.MV_CC_IsDeviceConnected())
+
+    def reset(self):
+        # 设备断开后停止取流和关闭设备都可能失败, 逐步执行, 保证句柄被销毁
+        for step in (self.stopGrabbing, self.closeDevice, self.destroyHandle):
+            try:
+                step()
+            except Exception as e:
+                print(f"释放相机失败 ({e})")
+
+    def registerImageCallBack(self):
+        """
+        注册图像回调, 图像由 SDK 线程推送到 frameRing, getFrame 直接从缓存读取
+        """
+        # 回调线程不能阻塞, block 策略按 oldest 处理
+        if self.property is not None and self.property.dropPolicy == DROP_NEWEST:
+            dropPolicy = DROP_NEWEST
+        else:
+            dropPolicy = DROP_OLDEST
+        ringSize = self.property.ringSize if self.property is not None else 8
+        self.frameRing = FrameRing(ringSize, dropPolicy)
+        # 保存回调对象的引用, 防止被回收后 SDK 调用野指针
+        self._imageCallBack = FrameInfoCallBack(self._onImage_)
+        ret = self.cam.MV_CC_RegisterImageCallBackEx(self._imageCallBack, None)
+        if ret != 0:
+            self.frameRing = None
+            self._imageCallBack = None
+            raise Exception("注册图像回调失败")
+
+    def _onImage_(self, pData, pFrameInfo, pUser):
+        # 在 SDK 取流线程中执行, 只做一次内存拷贝后入队, 尽量缩短持有GIL的时间
+        stFrameInfo = pFrameInfo.contents
+        buffer = self._callbackBuffer_()
+        if buffer is None:
+            return
+        ctypes.memmove(buffer, pData, min(stFrameInfo.nFrameLen, self.bufferPool.size))
+        frame = self.bufferPool.wrap(buffer, (min(stFrameInfo.nFrameLen, self.bufferPool.size),))
+        # 回调返回后 SDK 会复用帧信息结构体, 需要在回调内取出
+        frame.info = MvSdk.createFrameInfo(stFrameInfo)
+        self.frameRing.put(frame)
+
+    def _callbackBuffer_(self):
+        # 回调线程不能阻塞, 内存池用完时按丢帧策略丢弃最旧的一帧腾出内存, 否则丢弃新到的一帧
+        buffer = self.bufferPool.acquire()
+        if buffer is None:
+            frame = self.frameRing.discard()
+            if frame is not None:
+                frame.release()
+                buffer = self.bufferPool.acquire()
+        return buffer
+
+    def allocBufferPool(self):
+        # 按 PayloadSize 预分配取流内存, 取流过程中不再查询图像尺寸也不再分配
+        self.bufferPool = BufferPool(self.payloadSize, self.bufferPoolCount)
+
     def _open(self):
+        # 重新打开后节点可能变化, 清空参数缓存
+        self.params.clear()
         # 打开设备
         ret = self.cam.MV_CC_OpenDevice(MV_ACCESS_Exclusive, 0)
         if ret != 0:
@@ -124,228 +366,177 @@ class MvSdk(CameraSdkInterface):
         # self.triggerMode = MV_TRIGGER_MODE_ON
         # 开始取流
 
+    def getFeature(self, name):
+        """
+        按节点类型读取任意 GenICam 参数
+        """
+        return self.params.get(name)
+
+    def setFeature(self, name, value=None):
+        """
+        按节点类型写入任意 GenICam 参数, Command 节点不需要 value
+        """
+        return self.params.set(name, value)
+
+    def hasFeature(self, name):
+        """
+        相机是否有该节点, 节点类型会被缓存, 之后读写不再查询
+        """
+        try:
+            self.params.nodeType(name)
+            return True
+        except Exception:
+            return False
+
     @property
     def triggerMode(self):
-        stEnumValue = MVCC_ENUMVALUE()
-        ret = self.cam.MV_CC_GetEnumValue("TriggerMode", stEnumValue)
-        if ret != 0:
-            raise Exception("获取触发模式失败")
-        return stEnumValue.nCurValue
+        return self.params.get("TriggerMode")
 
     @triggerMode.setter
     def triggerMode(self, value=MV_TRIGGER_MODE_ON):
-        self.cam.MV_CC_SetEnumValue("TriggerMode", value)
+        self.params.set("TriggerMode", value)
 
     @property
     def exposureTime(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("ExposureTime", stParam)
-        if ret != 0:
-            raise Exception("获取曝光时间失败")
-        return stParam.nCurValue
+        return self.params.get("ExposureTime")
 
     @exposureTime.setter
     def exposureTime(self, value):
-        self.cam.MV_CC_SetIntValue("ExposureTime", value)
+        self.params.set("ExposureTime", value)
 
     @property
     def gain(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("Gain", stParam)
-        if ret != 0:
-            raise Exception("获取增益失败")
-        return stParam.nCurValue
+        return self.params.get("Gain")
 
     @gain.setter
     def gain(self, value):
-        self.cam.MV_CC_SetIntValue("Gain", value)
+        self.params.set("Gain", value)
 
     @property
     def gamma(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("Gamma", stParam)
-        if ret != 0:
-            raise Exception("获取Gamma失败")
-        return stParam.nCurValue
+        return self.params.get("Gamma")
 
     @gamma.setter
     def gamma(self, value):
-        self.cam.MV_CC_SetIntValue("Gamma", value)
+        self.params.set("Gamma", value)
 
     @property
     def balanceRatioRed(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("BalanceRatioRed", stParam)
-        if ret != 0:
-            raise Exception("获取BalanceRatioRed失败")
-        return stParam.nCurValue
+        return self.params.get("BalanceRatioRed")
 
     @balanceRatioRed.setter
     def balanceRatioRed(self, value):
-        self.cam.MV_CC_SetIntValue("BalanceRatioRed", value)
+        self.params.set("BalanceRatioRed", value)
 
     @property
     def balanceRatioGreen(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("BalanceRatioGreen", stParam)
-        if ret != 0:
-            raise Exception("获取BalanceRatioGreen失败")
-        return stParam.nCurValue
+        return self.params.get("BalanceRatioGreen")
 
     @balanceRatioGreen.setter
     def balanceRatioGreen(self, value):
-        self.cam.MV_CC_SetIntValue("BalanceRatioGreen", value)
+        self.params.set("BalanceRatioGreen", value)
 
     @property
     def balanceRatioBlue(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("BalanceRatioBlue", stParam)
-        if ret != 0:
-            raise Exception("获取BalanceRatioBlue失败")
-        return stParam.nCurValue
+        return self.params.get("BalanceRatioBlue")
 
     @balanceRatioBlue.setter
     def balanceRatioBlue(self, value):
-        self.cam.MV_CC_SetIntValue("BalanceRatioBlue", value)
+        self.params.set("BalanceRatioBlue", value)
 
     @property
     def balanceWhiteAuto(self):
-        stEnumValue = MVCC_ENUMVALUE()
-        ret = self.cam.MV_CC_GetEnumValue("BalanceWhiteAuto", stEnumValue)
-        if ret != 0:
-            raise Exception("获取BalanceWhiteAuto失败")
-        return stEnumValue.nCurValue
+        return self.params.get("BalanceWhiteAuto")
 
     @balanceWhiteAuto.setter
     def balanceWhiteAuto(self, value):
-        self.cam.MV_CC_SetEnumValue("BalanceWhiteAuto", value)
+        self.params.set("BalanceWhiteAuto", value)
 
     @property
     def balanceRatioSelector(self):
-        stEnumValue = MVCC_ENUMVALUE()
-        ret = self.cam.MV_CC_GetEnumValue("BalanceRatioSelector", stEnumValue)
-        if ret != 0:
-            raise Exception("获取BalanceRatioSelector失败")
-        return stEnumValue.nCurValue
+        return self.params.get("BalanceRatioSelector")
 
     @balanceRatioSelector.setter
     def balanceRatioSelector(self, value):
-        self.cam.MV_CC_SetEnumValue("BalanceRatioSelector", value)
+        self.params.set("BalanceRatioSelector", value)
 
     @property
     def balanceWhiteAutoOnce(self):
-        stEnumValue = MVCC_ENUMVALUE()
-        ret = self.cam.MV_CC_GetEnumValue("BalanceWhiteAutoOnce", stEnumValue)
-        if ret != 0:
-            raise Exception("获取BalanceWhiteAutoOnce失败")
-        return stEnumValue.nCurValue
+        return self.params.get("BalanceWhiteAutoOnce")
 
     @balanceWhiteAutoOnce.setter
     def balanceWhiteAutoOnce(self, value):
-        self.cam.MV_CC_SetEnumValue("BalanceWhiteAutoOnce", value)
+        self.params.set("BalanceWhiteAutoOnce", value)
 
     @property
     def balanceRatio(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("BalanceRatio", stParam)
-        if ret != 0:
-            raise Exception("获取BalanceRatio失败")
-        return stParam.nCurValue
+        return self.params.get("BalanceRatio")
 
     @balanceRatio.setter
     def balanceRatio(self, value):
-        self.cam.MV_CC_SetIntValue("BalanceRatio", value)
+        self.params.set("BalanceRatio", value)
 
     @property
     def payloadSize(self):
-        stCap = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("PayloadSize", stCap)
-        if ret != 0:
-            raise Exception("获取相机能力失败")
-        return stCap.nCurValue
+        return self.params.get("PayloadSize")
 
     @property
     def width(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("Width", stParam)
-        if ret != 0:
-            raise Exception("获取图像宽度失败")
-        return stParam.nCurValue
+        return self.params.get("Width")
 
     @property
     def height(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("Height", stParam)
-        if ret != 0:
-            raise Exception("获取图像高度失败")
-        return stParam.nCurValue
+        return self.params.get("Height")
 
     @property
     def pixelFormat(self):
-        stEnumValue = MVCC_ENUMVALUE()
-        ret = self.cam.MV_CC_GetEnumValue("PixelFormat", stEnumValue)
-        if ret != 0:
-            raise Exception("获取像素格式失败")
-        return stEnumValue.nCurValue
+        return self.params.get("PixelFormat")
 
     @pixelFormat.setter
     def pixelFormat(self, value):
-        self.cam.MV_CC_SetEnumValue("PixelFormat", value)
+        self.params.set("PixelFormat", value)
 
     @property
     def reverseX(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("ReverseX", stParam)
-        if ret != 0:
-            raise Exception("获取ReverseX失败")
-        return stParam.nCurValue
+        return self.params.get("ReverseX")
 
     @reverseX.setter
     def reverseX(self, value):
-        self.cam.MV_CC_SetIntValue("ReverseX", value)
+        self.params.set("ReverseX", value)
 
     @property
     def reverseY(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("ReverseY", stParam)
-        if ret != 0:
-            raise Exception("获取ReverseY失败")
-        return stParam.nCurValue
+        return self.params.get("ReverseY")
 
     @reverseY.setter
     def reverseY(self, value):
-        self.cam.MV_CC_SetIntValue("ReverseY", value)
+        self.params.set("ReverseY", value)
 
     @property
     def binningX(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("BinningX", stParam)
-        if ret != 0:
-            raise Exception("获取BinningX失败")
-        return stParam.nCurValue
+        return self.params.get("BinningX")
 
     @binningX.setter
     def binningX(self, value):
-        self.cam.MV_CC_SetIntValue("BinningX", value)
+        self.params.set("BinningX", value)
 
     @property
     def binningY(self):
-        stParam = MVCC_INTVALUE()
-        ret = self.cam.MV_CC_GetIntValue("BinningY", stParam)
-        if ret != 0:
-            raise Exception("获取BinningY失败")
-        return stParam.nCurValue
+        return self.params.get("BinningY")
 
     @binningY.setter
     def binningY(self, value):
-        self.cam.MV_CC_SetIntValue("BinningY", value)
+        self.params.set("BinningY", value)
 
     def startGrabbing(self):
         # 开始取流
+        if self.frameRing is not None:
+            self.frameRing.open()
         ret = self.cam.MV_CC_StartGrabbing()
         if ret != 0:
             print(ret)
             raise Exception("开始取流失败")
+        self.isGrabbing = True
 
     def getOneFrame(self, pData, stOutFrame):
         ret = self.cam.MV_CC_GetOneFrameTimeout(byref(pData), sizeof(pData), stOutFrame, 1000)
@@ -360,6 +551,10 @@ class MvSdk(CameraSdkInterface):
 
     def stopGrabbing(self):
         # 停止取流
+        self.isGrabbing = False
+        if self.frameRing is not None:
+            # 唤醒等待回调图像的线程
+            self.frameRing.close()
         ret = self.cam.MV_CC_StopGrabbing()
         if ret != 0:
             raise Exception("停止取流失败")
@@ -387,26 +582,198 @@ class MvSdk(CameraSdkInterface):
         # 销毁句柄
         self.destroyHandle()
 
-    def getFrame(self):
+    def getFrame(self, timeout=1000):
+        if self.frameRing is not None:
+            # 回调模式, 图像已由 SDK 线程写入缓存
+            frame = self.frameRing.get(timeout / 1000)
+            if frame is None:
+                raise GrabTimeoutError("采集图像超时")
+            self.lastFrameInfo = frame.info
+            return self.decodeFrame(frame)
         stOutFrame = MV_FRAME_OUT_INFO_EX()
-        pData = (c_ubyte * self.width * self.height)()  # 假设最大分辨率为2048x2048
-        ret = self.cam.MV_CC_GetOneFrameTimeout(byref(pData), sizeof(pData), stOutFrame, 1000)
+        # 内存池用完时等待调用方归还, 期间新帧留在 SDK 缓存中按取流策略丢弃
+        pData = self.bufferPool.acquire(timeout / 1000)
+        if pData is None:
+            raise GrabTimeoutError("取流内存池已用完")
+        ret = self.cam.MV_CC_GetOneFrameTimeout(byref(pData), sizeof(pData), stOutFrame, timeout)
         if ret != 0:
+            self.bufferPool.release(pData)
+            if ret in (MV_E_NODATA, MV_E_GC_TIMEOUT):
+                raise GrabTimeoutError("采集图像超时")
             raise Exception("采集图像失败")
-        # 数据处理，这里仅将其转换为NumPy数组并显示
-        frame_data = np.frombuffer(pData, count=int(stOutFrame.nWidth * stOutFrame.nHeight), dtype=np.uint8)
-        frame_data = frame_data.reshape((stOutFrame.nHeight, stOutFrame.nWidth))
+        # 返回池化内存上的视图, 调用 release() 或释放引用后内存归还到池中
+        frame = self.bufferPool.wrap(pData, (min(stOutFrame.nFrameLen, self.bufferPool.size),))
+        frame.info = self.lastFrameInfo = MvSdk.createFrameInfo(stOutFrame)
+        return self.decodeFrame(frame)
+
+    @property
+    def pixelConvert(self):
+        if self.property is None:
+            return PIXEL_CONVERT_NUMPY
+        return self.property.pixelConvert
+
+    def decodeFrame(self, raw):
+        """
+        按 enPixelType 将原始数据解码为图像
+        Args:
+            raw: 取流内存上的一维 uint8 数组, raw.info 为 FrameInfo
+        Returns:
+            Mono8 等无需转换的格式返回原始内存上的视图, 否则返回解码后的新图像, 原始内存立即归还
+        """
+        frameInfo = raw.info
+        pixelType, width, height = frameInfo.pixelType, frameInfo.width, frameInfo.height
+        if getPixelFormat(pixelType).decoder is None or \
+                self._convertPath_(pixelType, width, height) != PIXEL_CONVERT_SDK:
+            return self.pixelDecoder.decodeFrame(raw)
+        frame = self.convertPixelType(raw, width, height, pixelType)
+        frame.info = frameInfo
+        raw.release()
+        return frame
+
+    def _convertPath_(self, pixelType, width, height):
+        path = self.convertPaths.get(pixelType)
+        if path is None:
+            path = self.pixelConvert
+            if path == PIXEL_CONVERT_AUTO:
+                path = fastestPath(self.benchmark(pixelType, width, height))
+            self.convertPaths[pixelType] = path
+        return path
+
+    def benchmark(self, pixelType, width, height, repeat=20):
+        """
+        比较 numpy 与 SDK 两种解码方式的每帧毫秒数
+        """
+        def sdk(data, width_, height_):
+            return self.convertPixelType(data, width_, height_, pixelType)
+
+        return benchmark(pixelType, width, height, repeat, {PIXEL_CONVERT_SDK: sdk})
+
+    def convertPixelType(self, data, width, height, pixelType):
+        """
+        通过 MV_CC_ConvertPixelTypeEx 转换, 输出格式与 numpy 解码一致
+        """
+        pixelFormat = getPixelFormat(pixelType)
+        if pixelFormat.channels == 1:
+            dstPixelType = PixelType_Gvsp_Mono8 if pixelFormat.dtype == np.uint8 else PixelType_Gvsp_Mono16
+        else:
+            dstPixelType = PixelType_Gvsp_BGR8_Packed if pixelFormat.dtype == np.uint8 else PixelType_Gvsp_RGB16_Packed
+        out = self.pixelDecoder.allocOutput(pixelFormat.shape(width, height), pixelFormat.dtype)
+        stConvertParam = MV_CC_PIXEL_CONVERT_PARAM_EX()
+        stConvertParam.nWidth = width
+        stConvertParam.nHeight = height
+        stConvertParam.enSrcPixelType = pixelType
+        stConvertParam.pSrcData = data.ctypes.data_as(POINTER(c_ubyte))
+        stConvertParam.nSrcDataLen = pixelFormat.rawSize(width, height)
+        stConvertParam.enDstPixelType = dstPixelType
+        stConvertParam.pDstBuffer = out.ctypes.data_as(POINTER(c_ubyte))
+        stConvertParam.nDstBufferSize = out.nbytes
+        ret = self.cam.MV_CC_ConvertPixelTypeEx(stConvertParam)
         if ret != 0:
-            raise Exception("采集图像失败")
+            raise Exception(f"像素格式转换失败 {ret}")
+        if dstPixelType == PixelType_Gvsp_RGB16_Packed:
+            # SDK 没有 BGR16 输出, 原地交换通道
+            cv2.cvtColor(out, cv2.COLOR_RGB2BGR, dst=out)
+        return out
+
+    def getQueueDepth(self):
+        nValidImageNum = c_uint(0)
+        if self.cam.MV_CC_GetValidImageNum(nValidImageNum) != 0:
+            return None
+        return nValidImageNum.value
+
+    def getTransportStats(self):
+        """
+        MV_GIGE_GetNetTransInfo 的传输统计, 非 GigE 相机返回空字典
+        """
+        stNetTransInfo = MV_NETTRANS_INFO()
+        if self.cam.MV_GIGE_GetNetTransInfo(stNetTransInfo) != 0:
+            return {}
+        return {
+            "receivedBytes": stNetTransInfo.nReceiveDataSize,
+            "receivedFrames": stNetTransInfo.nNetRecvFrameCount,
+            "droppedFrames": stNetTransInfo.nThrowFrameCount,
+            "requestResendPackets": stNetTransInfo.nRequestResendPacketCount,
+            "resendPackets": stNetTransInfo.nResendPacketCount,
+        }
+
+    def setTriggerSource(self, source):
+        """
+        开启触发模式并设置触发源
+        Args:
+            source: 触发源 如 Software Line0 Action1
+        """
+        self.triggerMode = MV_TRIGGER_MODE_ON
+        self.params.set("TriggerSource", source)
+
+    def triggerSoftware(self):
+        self.params.set("TriggerSoftware")
+
+    def setActionKeys(self, deviceKey, groupKey, groupMask):
+        """
+        设置 GigE 动作命令的密钥, 与 issueActionCommand 的参数一致的相机才会响应
+        """
+        self.params.set("ActionDeviceKey", deviceKey)
+        self.params.set("ActionGroupKey", groupKey)
+        self.params.set("ActionGroupMask", groupMask)
+        self.setTriggerSource("Action1")
+
+    @staticmethod
+    def issueActionCommand(deviceKey, groupKey, groupMask, broadcastAddress="255.255.255.255", timeout=0):
+        """
+        广播 GigE 动作命令, 同一网段内密钥匹配的相机同时触发
+        Args:
+            timeout: 等待ACK的毫秒数, 0 为不等待
+        Returns:
+            [(相机IP, 状态码)], 不等待ACK时为空
+        """
+        stActionCmdInfo = MV_ACTION_CMD_INFO()
+        stActionCmdInfo.nDeviceKey = deviceKey
+        stActionCmdInfo.nGroupKey = groupKey
+        stActionCmdInfo.nGroupMask = groupMask
+        stActionCmdInfo.bActionTimeEnable = 0
+        stActionCmdInfo.pBroadcastAddress = broadcastAddress.encode('ascii')
+        stActionCmdInfo.nTimeOut = timeout
+        stActionCmdResults = MV_ACTION_CMD_RESULT_LIST()
+        ret = MvCamera().MV_GIGE_IssueActionCommand(stActionCmdInfo, stActionCmdResults)
+        if ret != 0:
+            raise Exception("发送动作命令失败")
+        res = []
+        for i in range(stActionCmdResults.nNumResults):
+            result = stActionCmdResults.pResults[i]
+            res.append((bytes(result.strDeviceAddress).split(b"\0")[0].decode(), result.nStatus))
+        return res
 
-        return frame_data
+    def leaseFrame(self, timeout=1000, safe=False) -> HikFrameLease:
+        """
+        租用SDK内部缓存中的一帧, 不做内存拷贝
+        用法:
+            with sdk.leaseFrame() as frame:
+                ...
+        Args:
+            timeout: 等待的毫秒数
+            safe: 安全模式, 返回 LeasedFrame, 退出 with 块时仍被引用则拷贝后归还缓存, 否则退出后视图立即失效
+        """
+        if self.frameRing is not None:
+            raise Exception("回调取流模式下不支持租用图像缓存")
+        return HikFrameLease(self.cam, timeout, safe)
+
+    def frames(self, timeout=1000):
+        """
+        连续取流的迭代器, 轮询和回调模式用法相同
+        Args:
+            timeout: 单帧等待的毫秒数, 超时后继续等待下一帧
+        """
+        while self.isGrabbing:
+            try:
+                yield self.getFrame(timeout)
+            except GrabTimeoutError:
+                continue
 
 
 if __name__ == '__main__':
     cam = MvSdk(camera_info=MvSdk.getDeviceList()[0])
     cam.init()
     cam.open()
-    while True:
-        frame = cam.getFrame()
+    for frame in cam.frames():
         cv2.imshow("frame", frame)
         cv2.waitKey(1)
@@ -1,5 +1,11 @@
+import importlib
+
 from pypattyrn.creational.singleton import Singleton
 
+from .property.discovery import discoverAll
+
+ENTRY_POINT_GROUP = "bkvisioncamera.cameras"  # 第三方厂商插件的入口点
+
 
 def register():
     """
@@ -18,19 +24,105 @@ def register():
     return inner
 
 
+def _entryPoints_():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return []
+    entryPoints = entry_points()
+    if hasattr(entryPoints, "select"):
+        return list(entryPoints.select(group=ENTRY_POINT_GROUP))
+    return list(entryPoints.get(ENTRY_POINT_GROUP, []))
+
+
 class SingCameraAll(metaclass=Singleton):
     def __init__(self):
         self.models = {}
+        # 尚未导入的厂商插件 {名称: 模块路径 或 模块:类}, 用到时才导入
+        self.plugins = {}
+        self._entryPointsLoaded = False
         super().__init__()
 
     def register(self, name, class_):
         self.models[name.lower()] = class_
 
+    def registerPlugin(self, names, module):
+        """
+        登记厂商插件, 只记录模块路径, 创建该厂商的相机时才导入
+        Args:
+            names: yaml 中 name 可用的名称
+            module: 模块路径, 模块中的类用 @register() 注册; 也可以是 模块:类
+        """
+        for name in names:
+            self.plugins[name.lower()] = module
+
+    def _loadEntryPoints_(self):
+        # 第三方包可以在 bkvisioncamera.cameras 入口点中登记厂商, 值为 模块:类
+        if self._entryPointsLoaded:
+            return
+        self._entryPointsLoaded = True
+        for entryPoint in _entryPoints_():
+            self.plugins.setdefault(entryPoint.name.lower(), entryPoint.value)
+
+    def resolve(self, name):
+        """
+        按名称取得相机类, 插件在第一次用到时导入
+        """
+        name = name.lower()
+        if name in self.models:
+            return self.models[name]
+        if name not in self.plugins:
+            self._loadEntryPoints_()
+        if name not in self.plugins:
+            raise ValueError(f"未注册的相机类型 {name}")
+        moduleName, _, className = self.plugins[name].partition(":")
+        module = importlib.import_module(moduleName)
+        if name not in self.models and className:
+            self.register(name, getattr(module, className))
+        if name not in self.models:
+            raise ValueError(f"插件 {moduleName} 没有注册相机类型 {name}")
+        return self.models[name]
+
+    def loadAll(self):
+        """
+        导入所有插件
+        Returns:
+            {名称: 导入失败原因}
+        """
+        self._loadEntryPoints_()
+        errors = {}
+        failed = set()
+        for name, module in list(self.plugins.items()):
+            if name in self.models or module in failed:
+                continue
+            try:
+                self.resolve(name)
+            except Exception as e:
+                failed.add(module)
+                errors[name] = str(e)
+        return errors
+
     def create(self, property_):
-        return self.models[property_.name.lower()](property_)
+        return self.resolve(property_.name)(property_)
 
-    def get_camera_list(self):
-        res = {}
-        for key in self.models.keys():
-            res[key] = self.models[key].get_model_list()
-        return res
+    def get_camera_list(self, timeout=5.0):
+        """
+        并发枚举所有已注册厂商的相机, 合并为按 MAC/序列号去重的设备表
+        Args:
+            timeout: 全局超时秒数, 超时或失败的厂商只打印原因
+        Returns:
+            {deviceKey: CameraInfo}, CameraInfo.driver 为 yaml 中 name 可用的厂商名
+        """
+        importErrors = self.loadAll()
+        enumerators = {}
+        classes = set()
+        for key, class_ in self.models.items():
+            # 一个厂商注册了多个名称, 只枚举一次
+            if class_ not in classes:
+                classes.add(class_)
+                enumerators[key] = class_.get_model_list
+        devices, errors = discoverAll(enumerators, timeout)
+        errors.update(importErrors)
+        for key, error in errors.items():
+            print(f"{key} 枚举相机失败 {error}")
+        return devices
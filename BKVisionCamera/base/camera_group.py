@@ -0,0 +1,197 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from BKVisionCamera.base import SingCameraAll
+from BKVisionCamera.base.property import BaseProperty, CaptureModel, GrabTimeoutError
+
+TRIGGER_SOFTWARE = "software"  # 并发下发软触发
+TRIGGER_ACTION = "action"  # 广播 GigE 动作命令, 各相机同时触发
+
+
+class FrameSet(object):
+    """
+    一次同步触发得到的一组图像, 顺序与 CameraGroup.members 一致
+    """
+
+    def __init__(self, index, size):
+        self.index = index
+        self.frames = [None] * size
+        self.timestamps = [None] * size  # 主机时间戳 ms
+        self.frameNums = [None] * size
+        self.late = []  # 超时未到或时间戳偏差过大的相机序号
+        self.dropped = []  # 帧号不连续或有丢包的相机序号
+        self.skew = 0  # 各相机时间戳的最大偏差 ms
+
+    @property
+    def complete(self):
+        return not self.late and not self.dropped
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, item):
+        return self.frames[item]
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __repr__(self):
+        return f"FrameSet(index={self.index}, late={self.late}, dropped={self.dropped}, skew={self.skew})"
+
+
+class CameraGroup(object):
+    """
+    多相机同步采集, 并行打开所有相机, 同时触发后按相机顺序返回一组图像
+    Args:
+        properties: yaml 路径 / BaseProperty / 已创建的 CaptureModel 列表
+        triggerType: software 软触发 / action GigE动作命令
+        timeout: 每组等待图像的秒数, 超时的相机标记为 late
+        maxSkew: 时间戳允许的最大偏差 ms, 超出的相机标记为 late, None 为不检查
+        deviceKey groupKey groupMask broadcastAddress: 动作命令参数
+    """
+
+    def __init__(self, properties, triggerType=TRIGGER_SOFTWARE, timeout=1.0, maxSkew=None,
+                 deviceKey=1, groupKey=1, groupMask=1, broadcastAddress="255.255.255.255"):
+        self.triggerType = triggerType
+        self.timeout = timeout
+        self.maxSkew = maxSkew
+        self.deviceKey = deviceKey
+        self.groupKey = groupKey
+        self.groupMask = groupMask
+        self.broadcastAddress = broadcastAddress
+        self.members: List[CaptureModel] = [self._create_(property_) for property_ in properties]
+        self.count = 0
+        self._lastFrameNums = [None] * len(self.members)
+        self._executor = None
+
+    @staticmethod
+    def _create_(property_):
+        if isinstance(property_, CaptureModel):
+            return property_
+        if isinstance(property_, str):
+            property_ = BaseProperty(property_)
+        return SingCameraAll().create(property_)
+
+    def __len__(self):
+        return len(self.members)
+
+    def _map_(self, func, *args):
+        return list(self._executor.map(lambda member: func(member, *args), self.members))
+
+    def open(self):
+        """
+        并行初始化并打开所有相机, 配置触发源
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.members), thread_name_prefix="CameraGroup")
+        self._map_(self._openMember_)
+
+    def _openMember_(self, member):
+        if hasattr(member, "init"):
+            member.init()
+        member.open()
+        if self.triggerType == TRIGGER_ACTION:
+            member.sdk.setActionKeys(self.deviceKey, self.groupKey, self.groupMask)
+        else:
+            member.sdk.setTriggerSource("Software")
+
+    def release(self):
+        if self._executor is None:
+            return
+        self._map_(lambda member: member.release())
+        self._executor.shutdown()
+        self._executor = None
+
+    def trigger(self):
+        if self.triggerType == TRIGGER_ACTION:
+            sdkClass = type(self.members[0].sdk)
+            sdkClass.issueActionCommand(self.deviceKey, self.groupKey, self.groupMask, self.broadcastAddress)
+        else:
+            self._map_(lambda member: member.triggerSoftware())
+
+    @staticmethod
+    def _fetch_(member, timeout):
+        # 经 CaptureModel 取帧, 计入统计并解码, 超时单位由各厂商换算, 其他错误(如断线)抛出
+        try:
+            return member.getFrame(timeout)
+        except GrabTimeoutError:
+            return None
+
+    @staticmethod
+    def _drain_(member):
+        # 取回上一组迟到的图像, 没有图像时不计入超时统计
+        try:
+            frame = member.frameRing.get(0) if member.grabThread is not None else member.grab(0)
+        except GrabTimeoutError:
+            return None
+        if frame is not None:
+            member.stats.record(frame)
+        return frame
+
+    def flush(self):
+        """
+        丢弃各相机中上一组迟到的图像, 避免错位到下一组
+        """
+        for _ in range(len(self.members)):
+            frames = self._map_(CameraGroup._drain_)
+            if all(frame is None for frame in frames):
+                break
+            for i, frame in enumerate(frames):
+                info = getattr(frame, "info", None)
+                if info is not None:
+                    # 迟到的帧已在上一组标记, 更新帧号避免下一组误报丢帧
+                    self._lastFrameNums[i] = info.frameNum
+
+    def grab(self) -> FrameSet:
+        """
+        同时触发所有相机并取回一组图像
+        """
+        self.flush()
+        self.trigger()
+        frames = self._map_(CameraGroup._fetch_, self.timeout)
+        frameSet = self.check(frames)
+        self.count += 1
+        return frameSet
+
+    def check(self, frames) -> FrameSet:
+        """
+        按帧信息检查一组图像, 标记迟到和丢帧的相机
+        """
+        frameSet = FrameSet(self.count, len(frames))
+        for i, frame in enumerate(frames):
+            frameSet.frames[i] = frame
+            if frame is None:
+                frameSet.late.append(i)
+                continue
+            info = getattr(frame, "info", None)
+            if info is None:
+                continue
+            frameSet.timestamps[i] = info.hostTimestamp
+            frameSet.frameNums[i] = info.frameNum
+            lastFrameNum = self._lastFrameNums[i]
+            if info.lostPacket > 0 or (lastFrameNum is not None and info.frameNum - lastFrameNum > 1):
+                frameSet.dropped.append(i)
+            self._lastFrameNums[i] = info.frameNum
+        timestamps = sorted(t for t in frameSet.timestamps if t is not None)
+        if timestamps:
+            frameSet.skew = timestamps[-1] - timestamps[0]
+            if self.maxSkew is not None:
+                median = timestamps[len(timestamps) // 2]
+                for i, t in enumerate(frameSet.timestamps):
+                    if t is not None and abs(t - median) > self.maxSkew:
+                        frameSet.late.append(i)
+        return frameSet
+
+    def frameSets(self):
+        while self._executor is not None:
+            yield self.grab()
+
+    def __iter__(self):
+        return self.frameSets()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
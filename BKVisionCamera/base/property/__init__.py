@@ -1,6 +1,13 @@
 from .capture import *
 from .camera_info import *
 from .camera_sdk import *
+from .frame_info import *
+from .capture_stats import *
+from .acquisition import *
+from .transport import *
+from .camera_config import *
+from .discovery import *
+from .supervisor import *
 from .property import *
 
 
@@ -0,0 +1,33 @@
+# SDK 取流队列策略
+GRAB_STRATEGY_FIFO = "fifo"  # 从旧到新逐帧取出, 不丢帧, 延迟随积压增加
+GRAB_STRATEGY_LATEST = "latest"  # 只取最新的 outputQueueSize 帧, 延迟最低
+GRAB_STRATEGY_UPCOMING = "upcoming"  # 忽略已缓存的帧, 等待下一帧
+
+GRAB_STRATEGIES = (GRAB_STRATEGY_FIFO, GRAB_STRATEGY_LATEST, GRAB_STRATEGY_UPCOMING)
+
+
+class AcquisitionConfig(object):
+    """
+    与厂商无关的 SDK 取流队列配置, 对应 yaml 中的 acquisition 块, 各 SDK 在 open() 时应用
+    Args:
+        config: acquisition 块
+            bufferCount: SDK 内部缓存帧数, 不设置时使用 SDK 默认值
+            strategy: fifo / latest / upcoming
+            outputQueueSize: latest 策略下保留的最新帧数
+    """
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.bufferCount = config.get('bufferCount', None)
+        self.strategy = config.get('strategy', GRAB_STRATEGY_FIFO)
+        self.outputQueueSize = config.get('outputQueueSize', 1)
+        if self.strategy not in GRAB_STRATEGIES:
+            raise ValueError(f"不支持的取流策略 {self.strategy}")
+        if self.outputQueueSize < 1:
+            raise ValueError("输出队列长度必须大于0")
+        if self.bufferCount is not None and self.bufferCount < self.outputQueueSize:
+            raise ValueError("缓存帧数不能小于输出队列长度")
+
+    def __repr__(self):
+        return f"AcquisitionConfig(bufferCount={self.bufferCount}, strategy={self.strategy}, " \
+               f"outputQueueSize={self.outputQueueSize})"
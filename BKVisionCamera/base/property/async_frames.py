@@ -0,0 +1,179 @@
+import asyncio
+import threading
+from collections import deque
+
+from .camera_sdk import GrabTimeoutError
+from .frame_ring import DROP_OLDEST, DROP_NEWEST, DROP_BLOCK
+
+
+class AsyncFrameQueue(object):
+    """
+    取流线程与事件循环之间的帧缓存, 线程通过 call_soon_threadsafe 投递, 协程直接 await 读取
+    Args:
+        loop: 读取方所在的事件循环
+        size: 缓存帧数
+        dropPolicy: 缓存满时的丢帧策略, 同 FrameRing
+    """
+
+    def __init__(self, loop, size=8, dropPolicy=DROP_OLDEST):
+        self.loop = loop
+        self.size = size
+        self.dropPolicy = dropPolicy
+        self.dropped = 0
+        self.closed = False
+        self._frames = deque()
+        self._waiter = None
+        self._finished = False
+        self._error = None
+        # block 策略下取流线程等待空位, 不能阻塞事件循环
+        self._space = threading.Semaphore(size) if dropPolicy == DROP_BLOCK else None
+
+    def put(self, frame):
+        """
+        在取流线程中调用, 返回是否投递成功
+        """
+        if self._space is not None:
+            while not self._space.acquire(timeout=0.1):
+                if self.closed:
+                    return False
+        if self.closed:
+            return False
+        try:
+            self.loop.call_soon_threadsafe(self._put_, frame)
+        except RuntimeError:
+            # 事件循环已关闭
+            self.closed = True
+            return False
+        return True
+
+    def _put_(self, frame):
+        if self.closed:
+            return
+        if self._space is None and len(self._frames) >= self.size:
+            self.dropped += 1
+            if self.dropPolicy == DROP_NEWEST:
+                return
+            self._frames.popleft()
+        self._frames.append(frame)
+        self._wake_()
+
+    def finish(self, error=None):
+        """
+        在取流线程中调用, 取流结束后唤醒读取方, error 会在 get() 中抛出
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._finish_, error)
+        except RuntimeError:
+            pass
+
+    def _finish_(self, error):
+        self._finished = True
+        self._error = error
+        self._wake_()
+
+    def _wake_(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def get(self):
+        """
+        按顺序读取一帧, 取流结束后返回None
+        """
+        while not self._frames:
+            if self._finished:
+                if self._error is not None:
+                    raise self._error
+                return None
+            self._waiter = self.loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        frame = self._frames.popleft()
+        if self._space is not None:
+            self._space.release()
+        return frame
+
+    def close(self):
+        """
+        读取方不再需要图像, 取流线程随后退出
+        """
+        self.closed = True
+        self._frames.clear()
+
+
+class AsyncGrabThread(threading.Thread):
+    """
+    为 async for 取流的线程, 不断调用 capture.getFrame() 并投递到 AsyncFrameQueue
+    """
+
+    def __init__(self, capture, queue: AsyncFrameQueue, timeout=1.0):
+        super().__init__(name=f"AsyncGrabThread-{capture.property.name}", daemon=True)
+        self.capture = capture
+        self.queue = queue
+        self.timeout = timeout
+
+    def run(self):
+        error = None
+        try:
+            while not self.queue.closed and self.capture.isGrabbing:
+                try:
+                    frame = self.capture.getFrame(self.timeout)
+                except GrabTimeoutError:
+                    continue
+                if frame is not None:
+                    self.queue.put(frame)
+        except Exception as e:
+            error = e
+        finally:
+            self.queue.finish(error)
+
+    def stop(self, timeout=None):
+        """
+        通知线程退出并等待正在进行的 getFrame 返回, 之后才能释放相机
+        """
+        self.queue.close()
+        self.join(timeout)
+
+
+class FrameStream(object):
+    """
+    CaptureModel.frames() 的返回值, 同时支持 for 和 async for
+    Args:
+        timeout: 单帧等待的秒数, 超时后继续等待下一帧
+    """
+
+    def __init__(self, capture, timeout=None):
+        self.capture = capture
+        self.timeout = timeout
+        self._frames = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._frames is None:
+            self._frames = self.capture._frames_(self.timeout)
+        return next(self._frames)
+
+    def __aiter__(self):
+        return self._aframes_()
+
+    async def _aframes_(self):
+        capture = self.capture
+        queue = AsyncFrameQueue(asyncio.get_event_loop(), capture.property.ringSize, capture.property.dropPolicy)
+        # 阻塞等待放在专用线程中, 每帧只有一次 call_soon_threadsafe, 不占用默认线程池
+        thread = AsyncGrabThread(capture, queue, 1.0 if self.timeout is None else self.timeout)
+        # break 后生成器由事件循环稍后关闭, 登记到 capture, release() 时也会停止该线程
+        capture.asyncGrabThreads.add(thread)
+        thread.start()
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            # 最长等待一次 getFrame 超时, 线程退出后才能安全地 release() 相机
+            await asyncio.get_event_loop().run_in_executor(None, thread.stop, thread.timeout + 1.0)
+            capture.asyncGrabThreads.discard(thread)
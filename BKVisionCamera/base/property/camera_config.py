@@ -0,0 +1,190 @@
+"""
+yaml 中 cameraConfig 块的参数写入, useOtherConfig 为 true 时在 open() 中开始取流之前应用
+键名映射为 GenICam 节点, 按节点依赖排序后一次写入, 全部写完后读回校验, 并记录每个节点的耗时
+首字母大写的键直接作为节点名写入, 如 TriggerSelector: FrameBurstStart
+"""
+import time
+
+from BKVisionCamera.utils.feature_file import isSelector, toBool
+
+
+class ConfigNode(object):
+    """
+    cameraConfig 键对应的节点
+    Args:
+        node: GenICam 节点名
+        order: 写入顺序, 小的先写
+        requires: 写入前需要先写入的 (节点名, 值), 相机没有该节点时跳过
+    """
+
+    def __init__(self, node, order, requires=()):
+        self.node = node
+        self.order = order
+        self.requires = requires
+
+
+# 写入顺序:
+#   自动模式和 Selector  ExposureAuto 开着时 ExposureTime 不可写
+#   使能开关            GammaEnable 关闭时 Gamma 不可写
+#   图像参数            ExposureTime 决定 AcquisitionFrameRate 的上限, 先写曝光
+#   帧率
+#   触发参数
+#   TriggerMode        触发源等配置好之后再开启触发
+ORDER_AUTO = 10
+ORDER_ENABLE = 20
+ORDER_VALUE = 30
+ORDER_FRAME_RATE = 40
+ORDER_TRIGGER = 50
+ORDER_TRIGGER_MODE = 60
+
+CAMERA_CONFIG_NODES = {
+    "exposureTime": ConfigNode("ExposureTime", ORDER_VALUE, (("ExposureAuto", "Off"),)),
+    "gain": ConfigNode("Gain", ORDER_VALUE, (("GainAuto", "Off"),)),
+    "gamma": ConfigNode("Gamma", ORDER_VALUE, (("GammaEnable", True),)),
+    "whiteBalance": ConfigNode("BalanceWhiteAuto", ORDER_AUTO),
+    "blackLevel": ConfigNode("BlackLevel", ORDER_VALUE, (("BlackLevelEnable", True),)),
+    "saturation": ConfigNode("Saturation", ORDER_VALUE, (("SaturationEnable", True),)),
+    "sharpness": ConfigNode("Sharpness", ORDER_VALUE, (("SharpnessEnable", True),)),
+    "hue": ConfigNode("Hue", ORDER_VALUE, (("HueEnable", True),)),
+    "contrast": ConfigNode("Contrast", ORDER_VALUE),
+    "brightness": ConfigNode("Brightness", ORDER_VALUE),
+    "frameRate": ConfigNode("AcquisitionFrameRate", ORDER_FRAME_RATE, (("AcquisitionFrameRateEnable", True),)),
+    "triggerMode": ConfigNode("TriggerMode", ORDER_TRIGGER_MODE),
+    "triggerSource": ConfigNode("TriggerSource", ORDER_TRIGGER),
+    "triggerActivation": ConfigNode("TriggerActivation", ORDER_TRIGGER),
+    "triggerDelay": ConfigNode("TriggerDelay", ORDER_TRIGGER),
+    "triggerDelayEnable": ConfigNode("TriggerDelayEnable", ORDER_ENABLE),
+    "triggerOverlap": ConfigNode("TriggerOverlap", ORDER_TRIGGER),
+    "triggerFilter": ConfigNode("LineDebouncerTime", ORDER_TRIGGER),
+}
+
+# 命令不是参数, 不在 open() 时执行
+IGNORED_KEYS = {"triggerSoftware"}
+
+_ENABLE_NODES = {require[0] for item in CAMERA_CONFIG_NODES.values() for require in item.requires
+                 if not require[0].endswith("Auto")}
+
+FLOAT_TOLERANCE = 0.01  # 浮点节点读回值允许的相对误差, 相机会把曝光等按步长取整
+
+
+def _rawOrder_(node):
+    if isSelector(node) or node.endswith("Auto"):
+        return ORDER_AUTO
+    if node in _ENABLE_NODES or node.endswith("Enable"):
+        return ORDER_ENABLE
+    if node == "TriggerMode":
+        return ORDER_TRIGGER_MODE
+    if node.startswith("Trigger"):
+        return ORDER_TRIGGER
+    if node == "AcquisitionFrameRate":
+        return ORDER_FRAME_RATE
+    return ORDER_VALUE
+
+
+def planCameraConfig(config, overrides=None):
+    """
+    按依赖排序 cameraConfig 的写入
+    Args:
+        config: cameraConfig 块, 值为 null 的键保持相机当前值
+        overrides: 厂商的 {键名: 节点名}, 如大华 gain 对应 GainRaw
+    Returns:
+        ([(节点名, 值, 键名)], {键名: 跳过原因}), 依赖的开关节点的键名为 None
+    """
+    overrides = overrides or {}
+    steps = {}
+    skipped = {}
+    for index, (key, value) in enumerate(config.items()):
+        if key in IGNORED_KEYS:
+            skipped[key] = "命令节点, 不在打开相机时执行"
+            continue
+        if value is None:
+            continue
+        item = CAMERA_CONFIG_NODES.get(key)
+        if item is not None:
+            node, order, requires = overrides.get(key, item.node), item.order, item.requires
+        elif key[:1].isupper():
+            node, order, requires = key, _rawOrder_(key), ()
+        else:
+            skipped[key] = "未知的配置项"
+            continue
+        for requireNode, requireValue in requires:
+            # 用户显式配置的值优先于依赖的默认值
+            if requireNode not in steps:
+                steps[requireNode] = (_rawOrder_(requireNode), index, requireNode, requireValue, None)
+        steps[node] = (order, index, node, value, key)
+    return [(node, value, key) for _, _, node, value, key in sorted(steps.values(), key=lambda s: s[:2])], skipped
+
+
+def readbackMatches(value, readback):
+    """
+    读回值是否与写入值一致, 无法比较时返回 None, 如海康枚举按符号写入但读回整数
+    """
+    if isinstance(readback, bool):
+        return toBool(value) == readback
+    if isinstance(value, str) != isinstance(readback, str):
+        return None
+    if isinstance(value, str):
+        return value == readback
+    return abs(float(readback) - float(value)) <= max(1e-6, abs(float(value)) * FLOAT_TOLERANCE)
+
+
+def commitCameraConfig(config, setFeature, getFeature, hasFeature, overrides=None):
+    """
+    一次写入 cameraConfig 的全部节点, 再逐个读回校验, 写入失败的节点不影响其他节点
+    读回在全部写入之后进行, 能发现被后写的节点改变的值, 如曝光过长时帧率被相机限制
+    Args:
+        config: cameraConfig 块
+        setFeature: setFeature(name, value) 按节点类型写入
+        getFeature: getFeature(name) 按节点类型读取
+        hasFeature: hasFeature(name) 相机是否有该节点
+        overrides: 厂商的 {键名: 节点名}
+    Returns:
+        nodes: [{key node value readback verified elapsed readElapsed error}], 按写入顺序, 耗时单位 s
+        skipped: {键名或节点名: 跳过原因}
+        failed: 写入失败的节点
+        mismatched: 读回值与写入值不一致的节点
+        elapsed: 总耗时 s
+    """
+    start = time.perf_counter()
+    steps, skipped = planCameraConfig(config, overrides)
+    nodes = []
+    for node, value, key in steps:
+        if not hasFeature(node):
+            if key is not None:
+                skipped[key] = f"相机没有节点 {node}"
+            continue
+        result = {"key": key, "node": node, "value": value, "readback": None, "verified": None,
+                  "elapsed": 0.0, "readElapsed": 0.0, "error": None}
+        writeStart = time.perf_counter()
+        try:
+            setFeature(node, value)
+        except Exception as e:
+            result["error"] = str(e)
+            print(f"写入 {node}={value} 失败 ({e})")
+        result["elapsed"] = time.perf_counter() - writeStart
+        nodes.append(result)
+    for result in nodes:
+        if result["error"] is not None:
+            continue
+        readStart = time.perf_counter()
+        try:
+            result["readback"] = getFeature(result["node"])
+            result["verified"] = readbackMatches(result["value"], result["readback"])
+        except Exception as e:
+            print(f"读取 {result['node']} 失败 ({e})")
+        result["readElapsed"] = time.perf_counter() - readStart
+    return {
+        "nodes": nodes,
+        "skipped": skipped,
+        "failed": [result["node"] for result in nodes if result["error"] is not None],
+        "mismatched": [result["node"] for result in nodes if result["verified"] is False],
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def slowestNodes(report, count=3):
+    """
+    写入加读回耗时最长的节点 [(节点名, 耗时 s)]
+    """
+    nodes = sorted(report["nodes"], key=lambda result: result["elapsed"] + result["readElapsed"], reverse=True)
+    return [(result["node"], result["elapsed"] + result["readElapsed"]) for result in nodes[:count]]
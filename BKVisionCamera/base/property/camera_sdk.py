@@ -1,51 +1,73 @@
 from abc import ABC, abstractmethod
 from typing import List
 
+from .acquisition import AcquisitionConfig
+from .camera_config import commitCameraConfig, slowestNodes
 from .camera_info import CameraInfo
+from .discovery import discoveryCache
+from .transport import TransportConfig
+
+
+class GrabTimeoutError(Exception):
+    """
+    取流超时, 相机仍在正常取流
+    """
 
 
 class CameraSdkInterface(ABC):
+    isGrabbing = False
+    cameraConfigNodes = {}  # cameraConfig 键名对应的厂商节点名, 与 GenICam 标准名不同时配置
+    onDisconnect = None  # 断线回调, 由 ConnectionSupervisor 设置, 在 SDK 线程中调用
+
     def __init__(self, property_=None, camera_info: CameraInfo = None):
 
         self.property = property_
         if camera_info is not None:
             self.camera_info = camera_info
         else:
-            self.camera_info = None
-            self.camera_info_list = self.getDeviceList()
-            print(self.camera_info_list)
-            print(property_.selectType)
-            print(property_.ip)
-            for index, camera_info in enumerate(self.camera_info_list):
-                print(camera_info)
-                print(camera_info.ip)
-
-                camera_info: CameraInfo
-                if property_.selectType == "mac":
-                    if camera_info.mac == property_.mac:
-                        self.camera_info = camera_info
-                        break
-                elif property_.selectType == "ip":
-                    if camera_info.ip == property_.ip:
-                        self.camera_info = camera_info
-                        break
-                elif property_.selectType == "index":
-                    if index == property_.index:
-                        self.camera_info = camera_info
-                        break
-                elif property_.selectType == "sn":
-                    if camera_info.sn == property_.sn:
-                        self.camera_info = camera_info
-                        break
-                else:
-                    if getattr(camera_info, property_.selectType) == getattr(property_, property_.selectType):
-                        self.camera_info = camera_info
-                        break
+            # 先从枚举缓存中查找, 找不到时可能是缓存之后新接入的相机, 强制重新枚举一次
+            self.camera_info_list = self.discover(property_)
+            self.camera_info = self._selectCamera_(self.camera_info_list, property_)
+            if self.camera_info is None:
+                self.camera_info_list = self.discover(property_, refresh=True)
+                self.camera_info = self._selectCamera_(self.camera_info_list, property_)
 
         if self.camera_info is None:
-            print(self.getDeviceList())
+            print(self.camera_info_list)
             raise ValueError("未找到对应的相机")
 
+    @classmethod
+    def discover(cls, property_=None, refresh=False) -> List[CameraInfo]:
+        """
+        从进程内共享的枚举缓存中读取设备列表, 缓存过期后才重新调用 getDeviceList
+        子类可以按 property_ 缩小枚举范围, 如按 IP 单播枚举
+        Args:
+            property_: 相机配置
+            refresh: 忽略缓存, 强制重新枚举
+        """
+        return discoveryCache.get(cls.__name__, cls.getDeviceList, refresh)
+
+    @staticmethod
+    def _selectCamera_(cameraInfoList, property_):
+        for index, camera_info in enumerate(cameraInfoList):
+            camera_info: CameraInfo
+            if property_.selectType == "mac":
+                if camera_info.mac == property_.mac:
+                    return camera_info
+            elif property_.selectType == "ip":
+                if camera_info.ip == property_.ip:
+                    return camera_info
+            elif property_.selectType == "index":
+                if index == property_.index:
+                    return camera_info
+            elif property_.selectType == "sn":
+                if camera_info.sn == property_.sn:
+                    return camera_info
+            else:
+                if getattr(camera_info, property_.selectType) == getattr(property_, property_.selectType):
+                    return camera_info
+        return None
+
     @abstractmethod
     def init(self):
         ...
@@ -57,6 +79,20 @@ class CameraSdkInterface(ABC):
     @abstractmethod
     def getFrame(self):
         ...
+
+    def frames(self):
+        """
+        连续取流的迭代器, 跳过超时, 停止取流后结束
+        """
+        while self.isGrabbing:
+            try:
+                yield self.getFrame()
+            except GrabTimeoutError:
+                continue
+
+    def __iter__(self):
+        return self.frames()
+
     @staticmethod
     @abstractmethod
     def createCamera(cameraInfo):
@@ -75,6 +111,49 @@ class CameraSdkInterface(ABC):
     def loadConfig(self, config):
         ...
 
+    def applySnapshot(self):
+        """
+        open() 时加载 yaml 中 snapshotFile 指定的参数快照, 在应用 transport 和 acquisition 之前调用
+        """
+        snapshotFile = self.property.snapshotFile if self.property is not None else None
+        if not snapshotFile:
+            return None
+        report = self.loadConfig(snapshotFile)
+        print(f"加载参数快照 {snapshotFile} {report}")
+        return report
+
+    def applyCameraConfig(self):
+        """
+        useOtherConfig 为 true 时写入 yaml 中的 cameraConfig 块, 在 applySnapshot 之后 开始取流之前调用
+        结果保存在 paramReport, 包含每个节点的写入和读回耗时
+        """
+        if self.property is None or not self.property.useOtherConfig or not self.property.cameraConfig:
+            return None
+        self.paramReport = commitCameraConfig(self.property.cameraConfig, self.setFeature, self.getFeature,
+                                              self.hasFeature, self.cameraConfigNodes)
+        slowest = ", ".join(f"{node} {seconds * 1000:.1f}ms" for node, seconds in slowestNodes(self.paramReport))
+        print(f"写入 cameraConfig {len(self.paramReport['nodes'])} 个节点 "
+              f"耗时 {self.paramReport['elapsed'] * 1000:.1f}ms, 最慢 {slowest}")
+        if self.paramReport["failed"] or self.paramReport["mismatched"]:
+            print(f"写入失败 {self.paramReport['failed']} 读回不一致 {self.paramReport['mismatched']}")
+        return self.paramReport
+
+    def getFeature(self, name):
+        raise Exception("当前相机不支持读取参数")
+
+    def setFeature(self, name, value=None):
+        raise Exception("当前相机不支持写入参数")
+
+    def hasFeature(self, name):
+        """
+        相机是否有该节点, 默认按能否读取判断
+        """
+        try:
+            self.getFeature(name)
+            return True
+        except Exception:
+            return False
+
     @property
     def width(self):
         return 0
@@ -84,4 +163,73 @@ class CameraSdkInterface(ABC):
         return 0
 
     def setExposureTime(self, exposureTime):
-        pass
\ No newline at end of file
+        pass
+
+    @property
+    def acquisition(self) -> AcquisitionConfig:
+        """
+        yaml 中的 acquisition 块, 没有配置文件时使用默认值
+        """
+        if self.property is None:
+            return AcquisitionConfig()
+        return self.property.acquisition
+
+    @property
+    def transport(self) -> TransportConfig:
+        """
+        yaml 中的 transport 块, 没有配置文件时使用默认值
+        """
+        if self.property is None:
+            return TransportConfig()
+        return self.property.transport
+
+    @property
+    def bufferPoolCount(self):
+        """
+        取流内存池的块数: 缓存中的帧 ringSize + 正在写入的一帧 + 调用方同时持有的帧 bufferPoolSize
+        内存池在 open() 时一次分配, 取流过程中不再追加
+        """
+        if self.property is None:
+            return 8 + 1 + 4
+        return self.property.ringSize + 1 + self.property.bufferPoolSize
+
+    def getTransportSettings(self) -> dict:
+        """
+        open() 时应用 transport 配置后实际生效的传输参数, 如包长 包间延时 重发, 非 GigE 相机返回空字典
+        """
+        return getattr(self, "transportSettings", {})
+
+    def isConnected(self):
+        """
+        设备是否仍然连接, 不支持查询的 SDK 总是返回 True, 只依赖取流失败发现断线
+        """
+        return True
+
+    def _disconnected_(self):
+        # SDK 断线回调中调用
+        if self.onDisconnect is not None:
+            self.onDisconnect()
+
+    def reset(self):
+        """
+        断线后释放旧句柄, 设备已断开时 SDK 调用会失败, 忽略错误尽量释放
+        """
+        try:
+            self.release()
+        except Exception as e:
+            print(f"释放相机失败 ({e})")
+
+    def getQueueDepth(self):
+        """
+        SDK 内部缓存中未取走的图像数, 不支持时返回 None
+        """
+        return None
+
+    def getTransportStats(self) -> dict:
+        """
+        SDK 统计的传输计数, 如收到的帧数 丢帧数 重发包数
+        """
+        return {}
+
+    def triggerSoftware(self):
+        raise Exception("当前相机不支持软触发")
\ No newline at end of file
@@ -1,6 +1,11 @@
+import asyncio
 from abc import ABC, abstractmethod
 
+from .async_frames import FrameStream
 from .camera_sdk import CameraSdkInterface
+from .capture_stats import CaptureStats
+from .frame_ring import FrameRing, GrabThread
+from .supervisor import ConnectionSupervisor
 
 
 class CaptureModel(ABC):
@@ -9,11 +14,34 @@ class CaptureModel(ABC):
         self.sdk = self.load()
         self.sdk:CameraSdkInterface
         self.camera_info = self.sdk.camera_info
+        self.frameRing = None
+        self.grabThread = None
+        # async for 取流的线程, 停止取流时一并停止
+        self.asyncGrabThreads = set()
+        self.supervisor = None
+        self.stats = CaptureStats()
 
     @abstractmethod
     def load(self):
         ...
 
+    @classmethod
+    def getSdkClass(cls):
+        """
+        对应的 CameraSdkInterface 子类, 用于不创建相机的设备枚举, 不支持时返回 None
+        """
+        return None
+
+    @classmethod
+    def get_model_list(cls, refresh=True):
+        """
+        枚举该厂商的相机, 结果同时写入枚举缓存
+        """
+        sdkClass = cls.getSdkClass()
+        if sdkClass is None:
+            return []
+        return sdkClass.discover(refresh=refresh)
+
     @abstractmethod
     def open(self):
         ...
@@ -23,14 +51,178 @@ class CaptureModel(ABC):
         ...
 
     @abstractmethod
-    def getFrame(self):
+    def grab(self, timeout=None):
+        """
+        从相机同步采集一帧, 多线程模式下由采集线程调用
+        Args:
+            timeout: 等待的秒数, None 使用 SDK 默认超时, 各厂商自行换算为 SDK 的单位
+        """
         ...
 
+    def getFrame(self, timeout=None):
+        """
+        获取一帧图像
+        Args:
+            timeout: 等待的秒数, 多线程模式下 None 为一直等待, 单线程模式下 None 使用 SDK 默认超时
+        Returns:
+            图像, 超时返回None
+        """
+        if self.grabThread is not None:
+            frame = self.frameRing.get(timeout)
+        else:
+            frame = self.grab() if timeout is None else self.grab(timeout)
+        self.stats.record(frame)
+        return frame
+
+    def getLatest(self, timeout=None):
+        """
+        获取最新的一帧图像, 多线程模式下丢弃缓存中更旧的帧
+        """
+        if self.grabThread is not None:
+            frame = self.frameRing.latest(timeout)
+        else:
+            frame = self.grab()
+        self.stats.record(frame)
+        return frame
+
+    @property
+    def isGrabbing(self):
+        if self.grabThread is not None:
+            return True
+        return self.sdk.isGrabbing
+
+    def frames(self, timeout=None) -> FrameStream:
+        """
+        连续取流的迭代器, 支持 for 和 async for
+        Args:
+            timeout: 多线程模式下单帧等待的秒数, 超时后继续等待下一帧
+        """
+        return FrameStream(self, timeout)
+
+    def _frames_(self, timeout=None):
+        if self.grabThread is None:
+            for frame in self.sdk.frames():
+                self.stats.record(frame)
+                yield frame
+            return
+        ring = self.frameRing
+        while self.grabThread is not None:
+            frame = ring.get(timeout)
+            self.stats.record(frame)
+            if frame is not None:
+                yield frame
+
+    def __iter__(self):
+        return self.frames()
+
+    def getStats(self):
+        """
+        取流统计快照, 开销很小, 可以每秒轮询
+        Returns:
+            CaptureStats.snapshot() 加上
+            queueDepth ringDropped: 本库缓存中的帧数和丢弃的帧数
+            poolExhausted: 取流内存池用完的次数, 调用方持有的帧过多时增加
+            sdkQueueDepth: SDK 内部缓存中的帧数
+            transport: SDK 传输统计
+            transportSettings: open() 时实际生效的传输参数
+            connection: 断线重连状态, 未开启时为 None
+        """
+        res = self.stats.snapshot()
+        ring = self.frameRing if self.grabThread is not None else getattr(self.sdk, "frameRing", None)
+        res["queueDepth"] = len(ring) if ring is not None else 0
+        res["ringDropped"] = ring.dropped if ring is not None else 0
+        pool = getattr(self.sdk, "bufferPool", None)
+        res["poolExhausted"] = pool.exhausted if pool is not None else 0
+        res["sdkQueueDepth"] = self.sdk.getQueueDepth()
+        res["transport"] = self.sdk.getTransportStats()
+        res["transportSettings"] = self.sdk.getTransportSettings()
+        res["connection"] = self.supervisor.snapshot() if self.supervisor is not None else None
+        return res
+
+    def startGrabThread(self):
+        """
+        启动后台采集线程, 在相机开始取流后调用
+        """
+        if self.grabThread is not None:
+            return
+        self.frameRing = FrameRing(self.property.ringSize, self.property.dropPolicy)
+        self.grabThread = GrabThread(self, self.frameRing)
+        self.grabThread.start()
+        reconnect = getattr(self.property, "reconnect", None)
+        if reconnect is not None and reconnect.enable:
+            self.startSupervisor(reconnect)
+
+    def stopGrabThread(self):
+        self.stopSupervisor()
+        for thread in list(self.asyncGrabThreads):
+            thread.stop(timeout=5)
+        self.asyncGrabThreads.clear()
+        if self.grabThread is None:
+            return
+        self.grabThread.stop(timeout=5)
+        self.grabThread = None
+
+    def startSupervisor(self, config):
+        """
+        启动断线监控线程, SDK 断线回调会立即唤醒它
+        """
+        if self.supervisor is not None:
+            return
+        self.supervisor = ConnectionSupervisor(self, config)
+        self.sdk.onDisconnect = self.supervisor.notifyDisconnect
+        self.supervisor.start()
+
+    def stopSupervisor(self):
+        if self.supervisor is None:
+            return
+        self.sdk.onDisconnect = None
+        self.supervisor.stop(timeout=5)
+        self.supervisor = None
+
+    def reopen(self):
+        """
+        断线后重新打开相机: 释放旧句柄, 重新创建句柄并打开, open() 中会重新应用 yaml 配置
+        后台采集线程和 frameRing 保持不变, 由 ConnectionSupervisor 在暂停采集后调用
+        """
+        self.sdk.reset()
+        self.sdk.init()
+        self.sdk.open()
+
     def __enter_(self):
         ...
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         ...
 
+    @staticmethod
+    async def _runAsync_(func, *args):
+        # SDK 调用都是阻塞的, 放到线程池中执行, 多台相机可以并发打开
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    async def initAsync(self):
+        return await self._runAsync_(self.init)
+
+    async def openAsync(self):
+        return await self._runAsync_(self.open)
+
+    async def releaseAsync(self):
+        return await self._runAsync_(self.release)
+
+    async def getFrameAsync(self, timeout=None):
+        """
+        单次取帧, 连续取流请使用 async for frame in capter.frames()
+        """
+        return await self._runAsync_(self.getFrame, timeout)
+
+    async def __aenter__(self):
+        await self._runAsync_(self.__enter__)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return await self._runAsync_(self.__exit__, exc_type, exc_val, exc_tb)
+
     def setExposureTime(self, exposureTime):
         self.sdk.setExposureTime(exposureTime)
+
+    def triggerSoftware(self):
+        self.sdk.triggerSoftware()
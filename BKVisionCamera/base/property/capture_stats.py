@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import deque
+
+
+class CaptureStats(object):
+    """
+    单台相机的取流统计, 每帧只记录时间和帧号, 百分位等在 snapshot() 时计算
+    Args:
+        window: 计算帧率的时间窗口 秒
+        samples: 保留的延迟样本数
+    """
+
+    def __init__(self, window=5.0, samples=1024):
+        self.window = window
+        self.samples = samples
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.frames = 0
+            self.timeouts = 0
+            self.gaps = 0  # 帧号不连续的次数
+            self.missing = 0  # 按帧号计算缺失的总帧数
+            self.lostPackets = 0
+            self._start = None
+            self._lastFrameNum = None
+            self._times = deque()
+            self._latency = deque(maxlen=self.samples)
+
+    def record(self, frame):
+        """
+        在 getFrame 返回前调用, frame 为 None 时记为超时
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if frame is None:
+                self.timeouts += 1
+                return
+            self.frames += 1
+            if self._start is None:
+                self._start = now
+            self._times.append(now)
+            self._prune_(now)
+            info = getattr(frame, "info", None)
+            if info is None:
+                return
+            # 从 SDK 交出图像到返回给调用方的耗时, 包含缓存排队和解码
+            self._latency.append(now - info.recvTime)
+            self.lostPackets += info.lostPacket
+            lastFrameNum = self._lastFrameNum
+            if lastFrameNum is not None and info.frameNum - lastFrameNum > 1:
+                self.gaps += 1
+                self.missing += info.frameNum - lastFrameNum - 1
+            self._lastFrameNum = info.frameNum
+
+    def _prune_(self, now):
+        times = self._times
+        while times and now - times[0] > self.window:
+            times.popleft()
+
+    @staticmethod
+    def _percentile_(values, percent):
+        return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+    def snapshot(self):
+        """
+        Returns:
+            {fps, frames, timeouts, gaps, missing, lostPackets, latency: {p50, p90, p99, max}}, 延迟单位 ms
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self._prune_(now)
+            count = len(self._times)
+            latency = sorted(self._latency)
+            res = {
+                "frames": self.frames,
+                "timeouts": self.timeouts,
+                "gaps": self.gaps,
+                "missing": self.missing,
+                "lostPackets": self.lostPackets,
+            }
+            elapsed = 0 if self._start is None else min(self.window, now - self._start)
+        res["fps"] = count / elapsed if elapsed > 0 else 0.0
+        if latency:
+            res["latency"] = {
+                "p50": self._percentile_(latency, 50) * 1000,
+                "p90": self._percentile_(latency, 90) * 1000,
+                "p99": self._percentile_(latency, 99) * 1000,
+                "max": latency[-1] * 1000,
+            }
+        else:
+            res["latency"] = {}
+        return res
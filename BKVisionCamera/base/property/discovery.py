@@ -0,0 +1,100 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class DiscoveryCache(object):
+    """
+    进程内共享的设备枚举缓存, 按 SDK 分别缓存 getDeviceList 的结果
+    同一 SDK 的并发枚举只执行一次, 其他线程等待结果, 避免打开多台相机时重复广播
+    Args:
+        ttl: 缓存有效秒数, 0 为不缓存
+    """
+
+    def __init__(self, ttl=10.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._keyLocks = {}
+        self._entries = {}
+
+    def _keyLock_(self, key):
+        with self._lock:
+            lock = self._keyLocks.get(key)
+            if lock is None:
+                lock = self._keyLocks[key] = threading.Lock()
+            return lock
+
+    def get(self, key, enumerate_, refresh=False):
+        """
+        读取缓存的设备列表, 过期或 refresh 时重新枚举
+        Args:
+            key: 缓存键, 一般为 SDK 类名
+            enumerate_: 枚举函数, 返回 CameraInfo 列表
+            refresh: 忽略缓存, 强制重新枚举
+        """
+        with self._keyLock_(key):
+            entry = self._entries.get(key)
+            if not refresh and entry is not None and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+            devices = list(enumerate_())
+            self._entries[key] = (time.monotonic(), devices)
+            return devices
+
+    def invalidate(self, key=None):
+        """
+        清空缓存, key 为 None 时清空所有 SDK
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+discoveryCache = DiscoveryCache()
+
+
+def deviceKey(cameraInfo):
+    """
+    合并多厂商设备表时的去重键, 优先 MAC, 其次序列号, 最后 IP
+    """
+    mac = cameraInfo.mac or getattr(cameraInfo, "macAddress", "")
+    mac = mac.replace(":", "").replace("-", "").upper()
+    if mac.strip("0"):
+        return mac
+    serial = cameraInfo.serialNumber or cameraInfo.sn
+    if serial:
+        return serial
+    return cameraInfo.ip or str(id(cameraInfo))
+
+
+def discoverAll(enumerators, timeout=5.0):
+    """
+    在线程池中并发枚举所有厂商的相机, 总耗时取决于最慢的厂商而不是各厂商之和
+    Args:
+        enumerators: {厂商名: 枚举函数}, 枚举函数返回 CameraInfo 列表
+        timeout: 全局超时秒数, 超时未返回的厂商不计入结果
+    Returns:
+        ({deviceKey: CameraInfo}, {厂商名: 失败原因}), CameraInfo.driver 为找到该设备的厂商名
+        同一设备被多个厂商枚举到时按 enumerators 的顺序保留第一个
+    """
+    executor = ThreadPoolExecutor(max_workers=max(len(enumerators), 1), thread_name_prefix="discover")
+    futures = {name: executor.submit(enumerate_) for name, enumerate_ in enumerators.items()}
+    wait(futures.values(), timeout=timeout)
+    # 超时的枚举线程无法中断, 不等待它们结束
+    executor.shutdown(wait=False)
+    devices = {}
+    errors = {}
+    for name, future in futures.items():
+        if not future.done():
+            errors[name] = "枚举超时"
+            continue
+        if future.exception() is not None:
+            errors[name] = str(future.exception())
+            continue
+        for cameraInfo in future.result():
+            key = deviceKey(cameraInfo)
+            if key not in devices:
+                cameraInfo.driver = name
+                devices[key] = cameraInfo
+    return devices, errors
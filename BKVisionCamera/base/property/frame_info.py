@@ -0,0 +1,33 @@
+import time
+
+
+class FrameInfo(object):
+    """
+    与厂商无关的帧信息, 取流时由 SDK 填写, 挂在图像的 info 属性上
+    丢帧检测和延迟统计只依赖这些字段, 不需要再调用 SDK
+    Args:
+        frameNum: 相机帧号
+        devTimestamp: 相机时间戳, 单位由相机决定, 一般为 ns 或时钟计数
+        hostTimestamp: 主机收到图像的时间戳 ms
+        lostPacket: 丢包数
+        pixelType: PFNC 像素格式
+        recvTime: SDK 交出图像时的 time.perf_counter(), 默认为创建时刻, 用于计算取流延迟
+    """
+    __slots__ = ("frameNum", "devTimestamp", "hostTimestamp", "lostPacket", "pixelType", "width", "height",
+                 "frameLen", "recvTime")
+
+    def __init__(self, frameNum=0, devTimestamp=0, hostTimestamp=0, lostPacket=0, pixelType=0, width=0, height=0,
+                 frameLen=0, recvTime=None):
+        self.frameNum = frameNum
+        self.devTimestamp = devTimestamp
+        self.hostTimestamp = hostTimestamp
+        self.lostPacket = lostPacket
+        self.pixelType = pixelType
+        self.width = width
+        self.height = height
+        self.frameLen = frameLen
+        self.recvTime = time.perf_counter() if recvTime is None else recvTime
+
+    def __repr__(self):
+        return f"FrameInfo(frameNum={self.frameNum}, hostTimestamp={self.hostTimestamp}, " \
+               f"lostPacket={self.lostPacket}, {self.width}x{self.height})"
@@ -0,0 +1,130 @@
+import sys
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class LeasedFrame(np.lib.mixins.NDArrayOperatorsMixin):
+    """
+    安全模式下租约返回的图像, with 块内指向SDK缓存, 退出时仍被引用则改为指向拷贝
+    支持下标和运算, 传给 OpenCV 等需要 ndarray 的接口时使用 frame.array 或 np.asarray(frame)
+    从 frame.array 切出的视图仍指向SDK缓存, 需要保留时先拷贝
+    """
+
+    def __init__(self, array):
+        self.array = array
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None and dtype != self.array.dtype:
+            return self.array.astype(dtype)
+        return self.array.copy() if copy else self.array
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        inputs = [np.asarray(x) if isinstance(x, LeasedFrame) else x for x in inputs]
+        if "out" in kwargs:
+            kwargs["out"] = tuple(np.asarray(x) if isinstance(x, LeasedFrame) else x for x in kwargs["out"])
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __getattr__(self, name):
+        if name == "array":
+            raise AttributeError(name)
+        return getattr(self.array, name)
+
+    def __getitem__(self, item):
+        return self.array[item]
+
+    def __setitem__(self, item, value):
+        self.array[item] = value
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def __repr__(self):
+        return f"LeasedFrame({self.array!r})"
+
+
+class FrameLease(ABC):
+    """
+    SDK 内部图像缓存的租约, with 块内直接访问驱动内存, 退出时归还缓存, 不做内存拷贝
+    Args:
+        safe: 安全模式, with 返回可脱离缓存的图像, 退出时图像仍被引用则先拷贝再归还缓存
+    """
+
+    def __init__(self, safe=False):
+        self.safe = safe
+        # 安全模式下退出时是否拷贝了图像
+        self.copied = False
+        self._view = None
+        self._frame = None
+
+    @abstractmethod
+    def _acquire_(self):
+        """
+        从 SDK 取得一帧缓存, 返回该缓存上的 NumPy 视图
+        """
+        ...
+
+    @abstractmethod
+    def _free_(self):
+        """
+        将缓存归还给 SDK
+        """
+        ...
+
+    def _wrap_(self, view):
+        """
+        安全模式下交给调用者的图像
+        """
+        return LeasedFrame(view)
+
+    def _detach_(self, frame):
+        """
+        把 _wrap_ 返回的图像改为指向独立拷贝
+        """
+        frame.array = np.array(frame.array)
+
+    @property
+    def frame(self):
+        return self._frame
+
+    @property
+    def released(self):
+        return self._view is None
+
+    def acquire(self):
+        if self._view is not None:
+            raise Exception("租约已持有图像缓存")
+        self._view = self._acquire_()
+        self._frame = self._wrap_(self._view) if self.safe else self._view
+        return self._frame
+
+    def copy(self):
+        """
+        返回当前帧的独立拷贝, 可在租约结束后继续使用
+        """
+        if self._view is None:
+            raise Exception("租约未持有图像缓存")
+        return self._view.copy()
+
+    def release(self):
+        if self._view is None:
+            return
+        frame = self._frame
+        self._view = None
+        self._frame = None
+        try:
+            # 引用来自 frame 变量和 getrefcount 参数, 更多则说明图像在 with 块外仍可访问
+            if self.safe and sys.getrefcount(frame) > 2:
+                self._detach_(frame)
+                self.copied = True
+        finally:
+            self._free_()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+
+from .camera_sdk import GrabTimeoutError
+
+# 缓存满时的丢帧策略
+DROP_OLDEST = "oldest"  # 丢弃最旧的一帧, 保证拿到的总是最新数据
+DROP_NEWEST = "newest"  # 丢弃新到的一帧, 保留已缓存的数据
+DROP_BLOCK = "block"  # 采集线程阻塞等待, 不丢帧
+
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST, DROP_BLOCK)
+
+
+class FrameRing(object):
+    """
+    固定长度的帧缓存, 采集线程写入, 处理线程读取
+    Args:
+        size: 缓存帧数
+        dropPolicy: 缓存满时的丢帧策略 oldest / newest / block
+    """
+
+    def __init__(self, size=8, dropPolicy=DROP_OLDEST):
+        if size < 1:
+            raise ValueError("缓存帧数必须大于0")
+        if dropPolicy not in DROP_POLICIES:
+            raise ValueError(f"不支持的丢帧策略 {dropPolicy}")
+        self.size = size
+        self.dropPolicy = dropPolicy
+        self.dropped = 0
+        self._frames = deque()
+        self._lock = threading.Lock()
+        self._notEmpty = threading.Condition(self._lock)
+        self._notFull = threading.Condition(self._lock)
+        self._closed = False
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frames)
+
+    def put(self, frame, timeout=None):
+        """
+        写入一帧, 返回是否写入成功
+        """
+        with self._lock:
+            if len(self._frames) >= self.size:
+                if self.dropPolicy == DROP_OLDEST:
+                    self._frames.popleft()
+                    self.dropped += 1
+                elif self.dropPolicy == DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                else:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while len(self._frames) >= self.size and not self._closed:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self.dropped += 1
+                            return False
+                        self._notFull.wait(remaining)
+                    if self._closed:
+                        return False
+            self._frames.append(frame)
+            self._notEmpty.notify()
+            return True
+
+    def get(self, timeout=None):
+        """
+        按顺序读取一帧, 超时返回None
+        """
+        with self._lock:
+            if not self._notEmpty.wait_for(lambda: self._frames or self._closed, timeout):
+                return None
+            if not self._frames:
+                return None
+            frame = self._frames.popleft()
+            self._notFull.notify()
+            return frame
+
+    def latest(self, timeout=None):
+        """
+        读取最新的一帧并丢弃更旧的帧, 超时返回None
+        """
+        with self._lock:
+            if not self._notEmpty.wait_for(lambda: self._frames or self._closed, timeout):
+                return None
+            if not self._frames:
+                return None
+            frame = self._frames.pop()
+            self.dropped += len(self._frames)
+            self._frames.clear()
+            self._notFull.notify_all()
+            return frame
+
+    def discard(self):
+        """
+        丢弃一帧并计入 dropped, oldest 策略丢弃并返回最旧的一帧, 其他策略丢弃新到的一帧返回 None
+        用于回调取流时内存池用完, 按丢帧策略腾出内存
+        """
+        with self._lock:
+            self.dropped += 1
+            if self.dropPolicy == DROP_OLDEST and self._frames:
+                frame = self._frames.popleft()
+                self._notFull.notify()
+                return frame
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._notFull.notify_all()
+
+    def close(self):
+        """
+        关闭缓存, 唤醒所有等待的线程
+        """
+        with self._lock:
+            self._closed = True
+            self._notEmpty.notify_all()
+            self._notFull.notify_all()
+
+    def open(self):
+        with self._lock:
+            self._closed = False
+
+
+class GrabThread(threading.Thread):
+    """
+    后台采集线程, 不断调用 capture.grab() 并写入 FrameRing
+    grab() 抛出异常记为出错, 返回 None 或抛出 GrabTimeoutError 记为超时, 连续失败时通知 capture.supervisor
+    """
+
+    def __init__(self, capture, ring: FrameRing):
+        super().__init__(name=f"GrabThread-{capture.property.name}", daemon=True)
+        self.capture = capture
+        self.ring = ring
+        self.errorCount = 0
+        self.lastError = None
+        self.consecutiveErrors = 0
+        self.consecutiveTimeouts = 0
+        self._running = threading.Event()
+        self._running.set()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        # pause() 通过该锁等待正在进行的 grab 返回
+        self._grabLock = threading.Lock()
+
+    def run(self):
+        while self._running.is_set():
+            with self._grabLock:
+                paused = not self._resumed.is_set()
+                if not paused:
+                    try:
+                        frame = self.capture.grab()
+                    except GrabTimeoutError:
+                        frame = None
+                    except Exception as e:
+                        self.errorCount += 1
+                        self.lastError = e
+                        self._failed_(error=True)
+                        # 避免相机异常时空转占满CPU
+                        time.sleep(0.01)
+                        continue
+            if paused:
+                self._resumed.wait(0.1)
+                continue
+            if frame is None:
+                self._failed_(error=False)
+                continue
+            self.consecutiveErrors = 0
+            self.consecutiveTimeouts = 0
+            self.ring.put(frame)
+
+    def _failed_(self, error):
+        if error:
+            self.consecutiveErrors += 1
+        else:
+            self.consecutiveTimeouts += 1
+        supervisor = getattr(self.capture, "supervisor", None)
+        if supervisor is not None and supervisor.grabFailed(self.consecutiveErrors, self.consecutiveTimeouts):
+            self.consecutiveErrors = 0
+            self.consecutiveTimeouts = 0
+
+    def pause(self):
+        """
+        暂停采集并等待正在进行的 grab 返回, 之后不再访问 SDK, 断线重连时调用
+        """
+        self._resumed.clear()
+        with self._grabLock:
+            pass
+
+    def resume(self):
+        self.consecutiveErrors = 0
+        self.consecutiveTimeouts = 0
+        self._resumed.set()
+
+    def stop(self, timeout=None):
+        self._running.clear()
+        self.ring.close()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
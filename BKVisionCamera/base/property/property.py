@@ -5,6 +5,9 @@ from pathlib import Path
 import yaml
 
 from BKVisionCamera import CONFIG
+from .acquisition import AcquisitionConfig
+from .transport import TransportConfig
+from .supervisor import ReconnectConfig
 
 
 class BaseProperty(object):
@@ -35,10 +38,24 @@ class BaseProperty(object):
         self.debug = self.yaml_dict.get('debug', False)
         self.selectType = self.yaml_dict.get('selectType', 'index')
         self.configFile = self.yaml_dict.get('configFile', None)
+        self.snapshotFile = self.yaml_dict.get('snapshotFile', None)  # 相机参数快照, open() 时只写入有变化的节点
+        self.useOtherConfig = self.yaml_dict.get('useOtherConfig', False)  # 是否在 open() 时写入 cameraConfig 块
+        self.cameraConfig = self.yaml_dict.get('cameraConfig', None) or {}  # 曝光 增益 帧率 触发等相机参数
         self.ip = self.yaml_dict.get('ip', None)
         self.mac = self.yaml_dict.get('mac', None)
         self.sn = str(self.yaml_dict.get('sn', None))
         self.index = self.yaml_dict.get('index', None)
+        self.reconnect = ReconnectConfig(self.yaml_dict.get('reconnect', None))  # 断线重连配置
+        # 断线重连依赖后台采集线程
+        self.multiThread = self.yaml_dict.get('multiThread', False) or self.reconnect.enable  # 是否启用后台采集线程
+        self.ringSize = self.yaml_dict.get('ringSize', 8)  # 后台采集缓存帧数
+        self.dropPolicy = self.yaml_dict.get('dropPolicy', 'oldest')  # 缓存满时丢帧策略 oldest / newest / block
+        # 调用方同时持有的帧数, 取流内存池共 ringSize + 1 + bufferPoolSize 块
+        self.bufferPoolSize = self.yaml_dict.get('bufferPoolSize', 4)
+        self.grabMode = self.yaml_dict.get('grabMode', 'poll')  # 取流方式 poll 轮询 / callback SDK回调
+        self.pixelConvert = self.yaml_dict.get('pixelConvert', 'numpy')  # 像素格式解码方式 numpy / sdk / auto
+        self.acquisition = AcquisitionConfig(self.yaml_dict.get('acquisition', None))  # SDK 取流队列配置
+        self.transport = TransportConfig(self.yaml_dict.get('transport', None))  # GigE 传输配置
 
     def __getattr__(self, item):
         return self.yaml_dict[item]
@@ -0,0 +1,159 @@
+import threading
+import time
+
+
+class ReconnectConfig(object):
+    """
+    断线重连配置, 对应 yaml 中的 reconnect 块, 开启后自动启用后台采集线程
+    Args:
+        config: reconnect 块
+            enable: 是否开启断线重连
+            checkInterval: 轮询连接状态的间隔 s, SDK 断线回调会立即唤醒
+            minBackoff: 第一次重连失败后的等待 s, 之后每次翻倍
+            maxBackoff: 最长等待 s
+            maxGrabErrors: 后台采集连续出错多少次视为断线, 0 为不检查, 用于没有断线回调的 SDK
+            maxGrabTimeouts: 后台采集连续超时多少次视为断线, 0 为不检查, 触发模式下超时是正常的, 默认不检查
+    """
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.enable = config.get('enable', False)
+        self.checkInterval = config.get('checkInterval', 0.1)
+        self.minBackoff = config.get('minBackoff', 0.5)
+        self.maxBackoff = config.get('maxBackoff', 10.0)
+        self.maxGrabErrors = config.get('maxGrabErrors', 5)
+        self.maxGrabTimeouts = config.get('maxGrabTimeouts', 0)
+        if self.checkInterval <= 0:
+            raise ValueError("连接检查间隔必须大于0")
+        if self.minBackoff <= 0 or self.maxBackoff < self.minBackoff:
+            raise ValueError("重连等待时间必须大于0且 maxBackoff 不小于 minBackoff")
+        if self.maxGrabErrors < 0 or self.maxGrabTimeouts < 0:
+            raise ValueError("maxGrabErrors 和 maxGrabTimeouts 不能小于0")
+
+    def __repr__(self):
+        return f"ReconnectConfig(enable={self.enable}, checkInterval={self.checkInterval}, " \
+               f"minBackoff={self.minBackoff}, maxBackoff={self.maxBackoff}, " \
+               f"maxGrabErrors={self.maxGrabErrors}, maxGrabTimeouts={self.maxGrabTimeouts})"
+
+
+class ConnectionSupervisor(threading.Thread):
+    """
+    断线监控线程, 通过 SDK 断线回调, 轮询 isConnected() 和后台采集连续失败发现断线
+    断线后暂停后台采集线程, 按指数退避调用 capture.reopen() 重新打开相机, 成功后恢复采集
+    frameRing 和后台采集线程保持不变, 使用方的 getFrame / frames() 不需要重新创建相机
+    Args:
+        capture: CaptureModel
+        config: ReconnectConfig
+    """
+
+    def __init__(self, capture, config: ReconnectConfig):
+        super().__init__(name=f"ConnectionSupervisor-{capture.property.name}", daemon=True)
+        self.capture = capture
+        self.config = config
+        self.connected = True
+        self.reconnecting = False
+        self.disconnects = 0
+        self.attempts = 0
+        self.downtime = 0.0
+        self.lastDowntime = 0.0
+        self.lastError = None
+        self._downSince = None
+        self._lost = threading.Event()
+        self._stopped = threading.Event()
+
+    def notifyDisconnect(self):
+        """
+        SDK 断线回调中调用, 只设置标志, 不阻塞 SDK 线程
+        """
+        self._lost.set()
+
+    def grabFailed(self, errors, timeouts):
+        """
+        后台采集线程连续失败时调用, 超过 maxGrabErrors / maxGrabTimeouts 时视为断线
+        Args:
+            errors: 连续出错次数
+            timeouts: 连续超时次数
+        Returns:
+            是否已视为断线, 是则调用方清零计数
+        """
+        config = self.config
+        if (config.maxGrabErrors and errors >= config.maxGrabErrors) or \
+                (config.maxGrabTimeouts and timeouts >= config.maxGrabTimeouts):
+            self.notifyDisconnect()
+            return True
+        return False
+
+    def _isLost_(self):
+        if self._lost.is_set():
+            return True
+        try:
+            return not self.capture.sdk.isConnected()
+        except Exception:
+            return True
+
+    def run(self):
+        while not self._stopped.is_set():
+            self._lost.wait(self.config.checkInterval)
+            if self._stopped.is_set():
+                break
+            if self._isLost_():
+                self._reconnect_()
+
+    def _reconnect_(self):
+        self.connected = False
+        self.reconnecting = True
+        self.disconnects += 1
+        self._downSince = time.monotonic()
+        grabThread = self.capture.grabThread
+        if grabThread is not None:
+            grabThread.pause()
+        backoff = self.config.minBackoff
+        while not self._stopped.is_set():
+            self.attempts += 1
+            try:
+                self.capture.reopen()
+                break
+            except Exception as e:
+                self.lastError = e
+                print(f"重连相机失败, {backoff}s 后重试 ({e})")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, self.config.maxBackoff)
+        else:
+            return
+        # 释放旧句柄时 SDK 可能再次回调断线, 重新打开成功后再清除
+        self._lost.clear()
+        self.lastDowntime = time.monotonic() - self._downSince
+        self.downtime += self.lastDowntime
+        self._downSince = None
+        self.connected = True
+        self.reconnecting = False
+        if grabThread is not None:
+            grabThread.resume()
+
+    def snapshot(self):
+        """
+        连接状态
+        Returns:
+            connected reconnecting: 当前状态
+            disconnects attempts: 断线次数和重连尝试次数
+            downtime lastDowntime: 累计和最近一次断线时长 s, 断线中包含当前这次已持续的时间
+            lastError: 最近一次重连失败的原因
+        """
+        downtime = self.downtime
+        if self._downSince is not None:
+            downtime += time.monotonic() - self._downSince
+        return {
+            "connected": self.connected,
+            "reconnecting": self.reconnecting,
+            "disconnects": self.disconnects,
+            "attempts": self.attempts,
+            "downtime": downtime,
+            "lastDowntime": self.lastDowntime,
+            "lastError": str(self.lastError) if self.lastError is not None else None,
+        }
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        self._lost.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
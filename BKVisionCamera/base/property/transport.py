@@ -0,0 +1,50 @@
+PACKET_SIZE_AUTO = "auto"  # 由 SDK 探测网卡和链路能承载的最大包长
+
+MIN_PACKET_SIZE = 576  # GigE Vision 规定的最小包长
+
+
+class TransportConfig(object):
+    """
+    与厂商无关的 GigE 传输配置, 对应 yaml 中的 transport 块, 各 SDK 在 open() 时应用, 非 GigE 相机忽略
+    没有 transport 块时不修改相机的包长和重发设置
+    Args:
+        config: transport 块
+            packetSize: 包长  auto 自动选择最大可用包长(默认)  数值 固定包长  null 保持相机当前值
+            packetDelay: 包间延时 GevSCPD, 多相机共用一个网口时加大, null 保持相机当前值
+            resend: 是否开启丢包重发, 默认开启, null 保持 SDK 当前设置
+            resendPercent: 最大重发包比例 %
+            resendTimeout: 重发超时 ms
+            packetTimeout: 等待数据包的超时 ms, null 使用 SDK 默认值
+            maxLostPacket: 一帧内允许的最大丢包数, 超过后放弃该帧, null 使用 SDK 默认值(大华)
+    """
+
+    def __init__(self, config=None):
+        configured = config is not None
+        config = config or {}
+        self.packetSize = config.get('packetSize', PACKET_SIZE_AUTO if configured else None)
+        self.packetDelay = config.get('packetDelay', None)
+        self.resend = config.get('resend', True if configured else None)
+        self.resendPercent = config.get('resendPercent', 10)
+        self.resendTimeout = config.get('resendTimeout', 50)
+        self.packetTimeout = config.get('packetTimeout', None)
+        self.maxLostPacket = config.get('maxLostPacket', None)
+        if self.packetSize not in (None, PACKET_SIZE_AUTO):
+            if not isinstance(self.packetSize, int) or self.packetSize < MIN_PACKET_SIZE:
+                raise ValueError(f"包长必须是 auto 或不小于 {MIN_PACKET_SIZE} 的整数")
+        if self.packetDelay is not None and self.packetDelay < 0:
+            raise ValueError("包间延时不能小于0")
+        if not 0 <= self.resendPercent <= 100:
+            raise ValueError("重发包比例必须在 0-100 之间")
+        if self.resendTimeout < 0:
+            raise ValueError("重发超时不能小于0")
+        if self.packetTimeout is not None and self.packetTimeout <= 0:
+            raise ValueError("数据包超时必须大于0")
+
+    @property
+    def autoPacketSize(self):
+        return self.packetSize == PACKET_SIZE_AUTO
+
+    def __repr__(self):
+        return f"TransportConfig(packetSize={self.packetSize}, packetDelay={self.packetDelay}, " \
+               f"resend={self.resend}, resendPercent={self.resendPercent}, resendTimeout={self.resendTimeout}, " \
+               f"packetTimeout={self.packetTimeout}, maxLostPacket={self.maxLostPacket})"
@@ -0,0 +1,256 @@
+"""
+SICK 录像组件压缩, 只依赖 NumPy 和标准库
+编码格式写作 "预处理+预处理:压缩器[:等级]", 如 "delta+shuffle:zlib:1", "lzma", "bitshuffle:bz2:9"
+    delta       按行差分, 深度图相邻像素接近, 差分后大部分值很小
+    shuffle     按字节平面重排, 16 位数据的高字节和低字节分别连续存放
+    bitshuffle  按位平面重排, 高位平面几乎全为 0
+    压缩器       zlib lzma bz2 或 none
+"""
+import bz2
+import lzma
+import sys
+import time
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+COMPRESSORS = {
+    "none": (lambda data, level: bytes(data), bytes),
+    "zlib": (lambda data, level: zlib.compress(data, 6 if level is None else level), zlib.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=0 if level is None else level), lzma.decompress),
+    "bz2": (lambda data, level: bz2.compress(data, 9 if level is None else level), bz2.decompress),
+}
+
+# 深度图的默认编码, Visionary 和 Ranger3 的 Range 组件都是 16 位整数
+DEPTH_CODEC = "delta+shuffle:zlib:1"
+
+# record.py 开启压缩时使用的编码 {data_format: 编码格式}, 未列出的组件不压缩
+DEFAULT_COMPRESSION = {
+    "Coord3D_C16": DEPTH_CODEC,
+    "Mono16": "shuffle:zlib:1",
+    "Confidence16": "shuffle:zlib:1",
+}
+
+# benchmark 默认比较的编码
+BENCHMARK_CODECS = [
+    "zlib:1", "delta+shuffle:zlib:1", "bitshuffle:zlib:1", "delta+bitshuffle:zlib:1",
+    "delta+shuffle:zlib:6", "delta+shuffle:lzma:0", "delta+shuffle:bz2:9",
+]
+
+# 已编码的组件数据, 由 Writer 直接写入
+EncodedArray = namedtuple("EncodedArray", ["payload", "dtype", "shape", "codec"])
+
+Codec = namedtuple("Codec", ["filters", "compressor", "level"])
+
+
+def parseCodec(spec):
+    """
+    解析编码格式字符串
+    Returns:
+        Codec(filters, compressor, level)
+    """
+    parts = spec.split(":")
+    if len(parts) > 1 and parts[-1].isdigit():
+        level = int(parts.pop())
+    else:
+        level = None
+    if len(parts) == 1 and parts[0] in COMPRESSORS:
+        filters, compressor = [], parts[0]
+    elif len(parts) == 2:
+        filters, compressor = parts[0].split("+"), parts[1]
+    else:
+        raise ValueError(f"无法解析的编码格式: {spec}")
+    if compressor not in COMPRESSORS:
+        raise ValueError(f"不支持的压缩器: {compressor}")
+    for index, name in enumerate(filters):
+        if name not in FILTERS:
+            raise ValueError(f"不支持的预处理: {name}")
+        if name == "delta" and index:
+            raise ValueError("delta 只能作为第一个预处理")
+    return Codec(tuple(filters), compressor, level)
+
+
+def _delta_(array):
+    if array.dtype.kind not in "ui":
+        raise ValueError(f"delta 只支持整数数据, 当前为 {array.dtype}")
+    unsigned = np.dtype(f"u{array.dtype.itemsize}")
+    rows = array.view(unsigned).reshape(-1, array.shape[-1] if array.ndim else 1)
+    res = np.empty_like(rows)
+    res[:, 0] = rows[:, 0]
+    # 差分按无符号回绕, 再 zigzag 编码, 小的负差值也只占低位
+    np.subtract(rows[:, 1:], rows[:, :-1], out=res[:, 1:])
+    signed = res[:, 1:].view(f"i{array.dtype.itemsize}")
+    res[:, 1:] = ((signed << 1) ^ (signed >> (array.dtype.itemsize * 8 - 1))).view(unsigned)
+    return res.reshape(array.shape)
+
+
+def _undelta_(array, dtype, shape):
+    dtype = np.dtype(dtype)
+    unsigned = np.dtype(f"u{dtype.itemsize}")
+    rows = array.view(unsigned).reshape(-1, shape[-1] if len(shape) else 1).copy()
+    zigzag = rows[:, 1:]
+    rows[:, 1:] = (zigzag >> 1) ^ (unsigned.type(0) - (zigzag & 1))
+    return np.cumsum(rows, axis=1, dtype=unsigned).view(dtype).reshape(shape)
+
+
+def _shuffle_(array):
+    itemsize = array.dtype.itemsize
+    return np.ascontiguousarray(array.reshape(-1).view(np.uint8).reshape(-1, itemsize).T)
+
+
+def _unshuffle_(array, dtype, shape):
+    itemsize = np.dtype(dtype).itemsize
+    return np.ascontiguousarray(array.reshape(itemsize, -1).T).view(dtype).reshape(shape)
+
+
+def _bitshuffle_(array):
+    count = array.size
+    padded = (count + 7) // 8 * 8
+    raw = np.zeros((padded, array.dtype.itemsize), dtype=np.uint8)
+    raw[:count] = array.reshape(-1).view(np.uint8).reshape(count, -1)
+    bits = np.unpackbits(raw, axis=1, bitorder="little")
+    return np.packbits(bits.T, axis=1, bitorder="little")
+
+
+def _unbitshuffle_(array, dtype, shape):
+    dtype = np.dtype(dtype)
+    count = int(np.prod(shape))
+    bits = np.unpackbits(array.reshape(dtype.itemsize * 8, -1), axis=1, bitorder="little")
+    raw = np.packbits(bits.T, axis=1, bitorder="little")
+    return np.ascontiguousarray(raw[:count]).view(dtype).reshape(shape)
+
+
+# {名称: (编码, 解码)}, 解码输入为 uint8 或原始 dtype, 需要原始 dtype 和 shape 还原
+FILTERS = {
+    "delta": (_delta_, _undelta_),
+    "shuffle": (_shuffle_, _unshuffle_),
+    "bitshuffle": (_bitshuffle_, _unbitshuffle_),
+}
+
+
+def encode(array, spec):
+    """
+    编码一个组件
+    Args:
+        array: 组件数据
+        spec: 编码格式字符串
+    Returns:
+        EncodedArray
+    """
+    codec = parseCodec(spec)
+    array = np.ascontiguousarray(array)
+    if array.size == 0:
+        # 空组件只记录 dtype 和 shape
+        return EncodedArray(b"", array.dtype.str, list(array.shape), spec)
+    data = array
+    for name in codec.filters:
+        data = FILTERS[name][0](data)
+    compress = COMPRESSORS[codec.compressor][0]
+    payload = compress(memoryview(np.ascontiguousarray(data)).cast("B"), codec.level)
+    return EncodedArray(payload, array.dtype.str, list(array.shape), spec)
+
+
+def decode(payload, dtype, shape, spec):
+    """
+    解码一个组件
+    Args:
+        payload: 压缩后的数据, bytes 或 np.memmap 切片
+    """
+    codec = parseCodec(spec)
+    dtype = np.dtype(dtype)
+    if int(np.prod(shape)) == 0:
+        return np.empty(shape, dtype=dtype)
+    # bz2.decompress 不接受 ndarray, 统一按 memoryview 传入
+    payload = memoryview(np.ascontiguousarray(payload)).cast("B") if isinstance(payload, np.ndarray) else payload
+    data = np.frombuffer(COMPRESSORS[codec.compressor][1](payload), dtype=np.uint8)
+    for name in reversed(codec.filters):
+        data = FILTERS[name][1](data, dtype, shape)
+    if not codec.filters:
+        data = data.view(dtype).reshape(shape)
+    return np.asarray(data).reshape(shape)
+
+
+def codecFor(compression, dataFormat):
+    """
+    组件使用的编码格式
+    Args:
+        compression: None, 编码格式字符串(所有组件相同), 或 {data_format: 编码格式}
+    Returns:
+        编码格式字符串, 不压缩时为 None
+    """
+    if compression is None or isinstance(compression, str):
+        return compression
+    return compression.get(dataFormat)
+
+
+def encodeFrame(frame, compression):
+    """
+    按 compression 编码帧字典中的组件, 返回新的帧字典, 不需要压缩的组件保持原样
+    """
+    frame = dict(frame)
+    maps = []
+    for item in frame.get("maps", []):
+        spec = codecFor(compression, item["data_format"])
+        if spec is not None and not isinstance(item["data"], EncodedArray):
+            item = dict(item, data=encode(item["data"], spec))
+        maps.append(item)
+    frame["maps"] = maps
+    return frame
+
+
+def benchmark(frames, codecs=None, repeat=1):
+    """
+    用录像中的帧比较各编码的压缩率和速度
+    Args:
+        frames: 帧字典的可迭代对象, 如 recording.Reader 或 pickle_harvester.Reader
+        codecs: 编码格式列表, 默认为 BENCHMARK_CODECS
+    Returns:
+        {data_format: {编码格式: {ratio, encodeMBps, decodeMBps}}}
+    """
+    codecs = codecs or BENCHMARK_CODECS
+    totals = {}
+    for frame in frames:
+        for item in frame["maps"]:
+            array = np.ascontiguousarray(item["data"])
+            for spec in codecs:
+                if "delta" in spec and array.dtype.kind not in "ui":
+                    continue
+                total = totals.setdefault(item["data_format"], {}).setdefault(spec, [0, 0, 0.0, 0.0])
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    encoded = encode(array, spec)
+                    middle = time.perf_counter()
+                    decode(encoded.payload, encoded.dtype, encoded.shape, spec)
+                    total[0] += array.nbytes
+                    total[1] += len(encoded.payload)
+                    total[2] += middle - start
+                    total[3] += time.perf_counter() - middle
+    res = {}
+    for dataFormat, specs in totals.items():
+        res[dataFormat] = {spec: {
+            "ratio": raw / max(1, packed),
+            "encodeMBps": raw / 1e6 / encodeTime if encodeTime > 0 else 0.0,
+            "decodeMBps": raw / 1e6 / decodeTime if decodeTime > 0 else 0.0,
+        } for spec, (raw, packed, encodeTime, decodeTime) in specs.items()}
+    return res
+
+
+def _openRecording_(path):
+    if str(path).endswith(".pickle"):
+        from .python.lib.pickle_harvester import Reader as PickleReader
+        return PickleReader(path)
+    from .recording import Reader
+    return Reader(path)
+
+
+if __name__ == "__main__":
+    # python -m BKVisionCamera.d3cancamera.SICK.compression 录像文件(.rec/.pickle) [最多帧数]
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with _openRecording_(sys.argv[1]) as reader:
+        result = benchmark(reader[:limit])
+    for dataFormat, specs in result.items():
+        print(dataFormat)
+        for spec, item in sorted(specs.items(), key=lambda kv: -kv[1]["ratio"]):
+            print(f"  {spec:<26} ratio {item['ratio']:6.2f}  encode {item['encodeMBps']:8.1f} MB/s"
+                  f"  decode {item['decodeMBps']:8.1f} MB/s")
@@ -0,0 +1,103 @@
+import threading
+import time
+
+
+def createHarvester():
+    """
+    创建 Harvester 并加载 SICK GenTL Producer
+    """
+    from harvesters.core import Harvester
+    from .python.lib.utils import get_cti_path
+    harvester = Harvester()
+    harvester.add_file(get_cti_path(), check_existence=True, check_validity=True)
+    return harvester
+
+
+class HarvesterService(object):
+    """
+    进程内共享的 Harvester, 第一次使用时才加载 CTI, 打开多台 SICK 相机只加载一次 CTI
+    设备列表超过 ttl 秒后才重新 update(), 打开 N 台相机只需要一次 GigE 枚举
+    有相机打开时只在找不到设备时才 update(), 避免影响正在取流的 ImageAcquirer
+    Args:
+        factory: 创建并加载好 CTI 的 Harvester, 默认为 createHarvester
+        ttl: 设备列表有效秒数
+    """
+
+    def __init__(self, factory=None, ttl=10.0):
+        self.factory = factory or createHarvester
+        self.ttl = ttl
+        self.updates = 0
+        self._harvester = None
+        self._updatedAt = None
+        self._acquirers = {}
+        self._lock = threading.RLock()
+
+    @property
+    def harvester(self):
+        with self._lock:
+            if self._harvester is None:
+                self._harvester = self.factory()
+                self._updatedAt = None
+            return self._harvester
+
+    def _expired_(self):
+        if self._updatedAt is None:
+            return True
+        return not self._acquirers and time.monotonic() - self._updatedAt >= self.ttl
+
+    def devices(self, refresh=False):
+        """
+        设备列表 harvesters DeviceInfo, 过期或 refresh 时重新枚举
+        """
+        with self._lock:
+            harvester = self.harvester
+            if refresh or self._expired_():
+                harvester.update()
+                self.updates += 1
+                self._updatedAt = time.monotonic()
+            return list(harvester.device_info_list)
+
+    def create(self, serial, numBuffers=10):
+        """
+        按序列号创建 ImageAcquirer, 不在设备列表中时强制重新枚举一次
+        Args:
+            serial: 相机序列号
+            numBuffers: GenTL 缓存数
+        """
+        serial = str(serial)
+        with self._lock:
+            if serial in self._acquirers:
+                raise Exception(f"相机 {serial} 已经打开")
+            if not any(device.serial_number == serial for device in self.devices()):
+                if not any(device.serial_number == serial for device in self.devices(refresh=True)):
+                    raise Exception(f"未找到序列号为 {serial} 的相机")
+            ia = self.harvester.create(search_key={'serial_number': serial})
+            ia.num_buffers = numBuffers
+            ia.stop()
+            self._acquirers[serial] = ia
+            return ia
+
+    def release(self, serial):
+        """
+        停止并销毁 ImageAcquirer, 相机可以重新 create
+        """
+        with self._lock:
+            ia = self._acquirers.pop(str(serial), None)
+        if ia is not None:
+            ia.stop()
+            ia.destroy()
+
+    def reset(self):
+        """
+        销毁所有 ImageAcquirer 并释放 Harvester, 下次使用时重新加载 CTI
+        """
+        with self._lock:
+            for serial in list(self._acquirers):
+                self.release(serial)
+            if self._harvester is not None:
+                self._harvester.reset()
+            self._harvester = None
+            self._updatedAt = None
+
+
+harvesterService = HarvesterService()
@@ -6,11 +6,27 @@ The :mod:`lib` module includes methods for reading/writing harvester
 pickle files and helpers from Harvesters ImageAcquirer.
 """
 
+from importlib import import_module
+
 from .pickle_harvester import Reader, Writer
-from .gev_helper import apply_param, set_components
-from .utils import data_map, extract_color, extract_depth
 from .intrinsics import Intrinsics, extract_intrinsics
 
+# these helpers need harvesters/genicam, import them on first use so that reading
+# pickle recordings works without the GenTL stack installed
+_LAZY = {
+    "apply_param": ".gev_helper",
+    "set_components": ".gev_helper",
+    "data_map": ".utils",
+    "extract_color": ".utils",
+    "extract_depth": ".utils",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     "Reader", "Writer", "apply_param", "set_components", "data_map", "extract_color",
     "extract_depth", "Intrinsics", "extract_intrinsics"
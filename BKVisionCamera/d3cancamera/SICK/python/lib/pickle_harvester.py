@@ -3,10 +3,48 @@
 
 """Read/Write harvester buffers into/from pickle files"""
 
-from logging import info, debug
-from pickle import dump, load
+from logging import info, debug, warning
+from os.path import getsize
+from pickle import dump, load, UnpicklingError
+from struct import Struct
 from time import strftime, localtime
 
+import numpy as np
+
+INDEX_EXT = ".idx"
+INDEX_MAGIC = b"PKLIDX01"
+# magic, size of the recording the index belongs to, number of frames
+_INDEX_HEADER = Struct("<8sQQ")
+
+
+def index_filename(filename):
+    """Name of the sidecar offset index of a recording"""
+    return str(filename) + INDEX_EXT
+
+
+def save_index(filename, offsets, size):
+    """Persists the frame offsets of a recording next to it"""
+    offsets = np.asarray(offsets, dtype="<u8")
+    try:
+        with open(index_filename(filename), 'wb') as f:
+            f.write(_INDEX_HEADER.pack(INDEX_MAGIC, size, len(offsets)))
+            f.write(offsets.tobytes())
+    except OSError as err:
+        warning(f"Could not write index for {filename}: {err}")
+
+
+def load_index(filename):
+    """Returns the frame offsets from the sidecar index or None if it is missing or stale"""
+    try:
+        with open(index_filename(filename), 'rb') as f:
+            magic, size, count = _INDEX_HEADER.unpack(f.read(_INDEX_HEADER.size))
+            if magic != INDEX_MAGIC or size != getsize(filename):
+                return None
+            offsets = np.frombuffer(f.read(count * 8), dtype="<u8")
+    except (OSError, ValueError):
+        return None
+    return offsets if len(offsets) == count else None
+
 
 class Writer:
     """Class for storing harvesters buffer into pickle file"""
@@ -19,6 +57,8 @@ class Writer:
         self.record_name = record_name
         self.wl_written = False
         self.file = None
+        self.filename = None
+        self.offsets = []
 
         # TODO(dedekst): How to handle chunk data dynamically?
         #     buffer.module.is_containing_chunk_data()
@@ -32,6 +72,7 @@ class Writer:
             self._create_wl()
             self._store_wl()
 
+        self.offsets.append(self.file.tell())
         for name, source in self.nodes_wl.items():
             try:
                 self._dump(buffer, nodeMap, source)
@@ -103,6 +144,7 @@ class Writer:
         filename = strftime("%Y-%m-%d_%H-%M-%S_", localtime()) + self.record_name + ".pickle"
         info(f"Open file for reading: {filename}")
 
+        self.filename = filename
         self.file = open(filename, 'wb')
         # store the WhiteList contracts
         dump(self.nodes_wl, self.file)
@@ -116,9 +158,15 @@ class Writer:
             exec(source)
         exec(f"dump({src_list[-1]}, self.file)")
 
-    def __del__(self):
+    def close(self):
+        """Closes the recording and writes its offset index"""
         if self.file:
             self.file.close()
+            self.file = None
+            save_index(self.filename, self.offsets, getsize(self.filename))
+
+    def __del__(self):
+        self.close()
 
 
 class Reader:
@@ -126,9 +174,20 @@ class Reader:
 
     def __init__(self, filename):
         info(f"Open file for reading: {filename}")
+        self.filename = filename
         self.file = open(filename, 'rb')
         # restore the WhiteList contracts
         self.nodes_wl, self.buffer_wl, self.maps_wl = self._load_wl()
+        self._offsets = None
+
+    @property
+    def offsets(self):
+        """Start offset of every frame, loaded from the sidecar index or built on first use"""
+        if self._offsets is None:
+            self._offsets = load_index(self.filename)
+            if self._offsets is None:
+                self._offsets = self._build_index()
+        return self._offsets
 
     def __enter__(self):
         return self
@@ -137,14 +196,28 @@ class Reader:
         self.file.close()
 
     def __len__(self):
-        return self._get_number_of_frames()
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        """Random access by frame number or slice, seeks directly to the frame"""
+        if isinstance(index, slice):
+            return [self._restore_at(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"frame index {index} out of range")
+        return self._restore_at(index)
 
     def __iter__(self):
         self._rewind_to_start_of_frames()
         return self
 
     def __next__(self):
-        frame = self._restore()
+        try:
+            frame = self._restore()
+        except (EOFError, UnpicklingError):
+            # incomplete last frame of an interrupted recording
+            frame = None
         if frame:
             return frame
         else:
@@ -152,7 +225,8 @@ class Reader:
             raise StopIteration
 
     def __del__(self):
-        self.file.close()
+        if not self.file.closed:
+            self.file.close()
 
     def get_next_frame(self):
         """Restores and returns the next frame from file. Alias for restore()"""
@@ -173,20 +247,33 @@ class Reader:
     def get_frames(self, skip, n=0):
         """Load n frames after skip frames were skipped"""
         if n == 0:
-            n = self._get_number_of_frames()
-
-        self._rewind_to_start_of_frames()
-        self._skip_frames(skip)
-        frames = list()
-        while self.file.read(1) and len(frames) < n:
-            self.file.seek(-1, 1)
-            frames.append(self.get_next_frame())
-        return frames
+            n = len(self)
+        return self[skip:skip + n]
 
     def _get_number_of_frames(self):
-        num_frames = sum(1 for _ in iter(self.get_next_frame, None))
+        return len(self)
+
+    def _restore_at(self, index):
+        self.file.seek(int(self.offsets[index]))
+        return self._restore()
+
+    def _build_index(self):
+        """Decodes the recording once to find the frame offsets and persists them"""
+        position = self.file.tell()
         self._rewind_to_start_of_frames()
-        return num_frames
+        offsets = list()
+        while True:
+            offset = self.file.tell()
+            try:
+                if self._restore() is None:
+                    break
+            except (EOFError, UnpicklingError):
+                # recording was interrupted in the middle of a frame
+                break
+            offsets.append(offset)
+        self.file.seek(position)
+        save_index(self.filename, offsets, getsize(self.filename))
+        return np.asarray(offsets, dtype="<u8")
 
     def _restore(self):
         """Restores and returns the next frame from file"""
@@ -203,10 +290,12 @@ class Reader:
         for buf_info in self.buffer_wl:
             try:
                 frame.update({buf_info: load(self.file)})
+            except (EOFError, UnpicklingError):
+                # recording ends in the middle of this frame
+                raise
             except:
                 continue
         maps = list()
-        print(frame)
         frame['numComponents'] = 1
         for i in range(frame['numComponents']):
             tmp = {}
@@ -214,6 +303,8 @@ class Reader:
 
                 try:
                     tmp.update({mapInfo: load(self.file)})
+                except (EOFError, UnpicklingError):
+                    raise
                 except:
                     continue
             maps.append(tmp)
@@ -236,8 +327,10 @@ class Reader:
         info("##################################")
 
     def _skip_frames(self, num):
-        for i in range(num):
-            _ = self.get_next_frame()
+        if num >= len(self):
+            self.file.seek(0, 2)
+        elif num > 0:
+            self.file.seek(int(self.offsets[num]))
 
     def _rewind_to_start_of_frames(self):
         self.file.seek(0)
@@ -146,9 +146,10 @@ def doFetch(camera, config):
       if cv2.waitKey(1) & 0xFF == ord('q'):
         return
       camera['frameCount'] += 1
-      # if camera['frameCount'] % config['cameras']['recordingRate'] == 0:
-      #     camera['recordedCount'] += 1
-      #     camera['writer'].store(buffer, camera['nm'])
+      if camera['writer'] is not None and camera['frameCount'] % config['cameras']['recordingRate'] == 0:
+          # AsyncWriter only copies the payload here, the buffer is requeued without waiting for the disk
+          if camera['writer'].store(buffer, camera['nm']) is not False:
+              camera['recordedCount'] += 1
 
 
 
@@ -17,8 +17,8 @@ class ReaderWrapper():
     def __init__(self, reader):
         self.reader = reader
         self.pos = 0
-        self.length = self.reader._get_number_of_frames()
-        self.frame = self._parseFrame(self.reader.get_next_frame())
+        self.length = len(self.reader)
+        self.frame = self._parseFrame(self.reader[0])
 
     def _parseFrame(self, frame):
         frame_object = {}
@@ -58,19 +58,11 @@ class ReaderWrapper():
         return frame_object
 
     def __getitem__(self, key):
-        if key > self.length:
+        if key >= self.length:
             return None
-        if key == self.pos:
-            return self.frame
-        data = None
-        if key < self.pos:
-            self.reader._rewind_to_start_of_frames()
-            data = self.reader.get_next_frame()
-            self.pos = 0
-        while self.pos < key:
-            data = self.reader.get_next_frame()
-            self.pos += 1
-        self.frame = self._parseFrame(data)
+        if key != self.pos:
+            self.frame = self._parseFrame(self.reader[key])
+            self.pos = key
         return self.frame
 
     def __len__(self):
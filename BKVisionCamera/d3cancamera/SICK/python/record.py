@@ -8,7 +8,9 @@ from argparse import Action, ArgumentParser, RawDescriptionHelpFormatter as rdhf
 from logging import basicConfig, info, INFO, error
 from os import environ as env
 from lib.utils import *
-from lib.pickle_harvester import Writer
+from BKVisionCamera.d3cancamera.SICK.harvester_pool import harvesterService
+from BKVisionCamera.d3cancamera.SICK.recording import Writer, AsyncWriter
+from BKVisionCamera.d3cancamera.SICK.compression import DEFAULT_COMPRESSION
 from sys import exit
 from time import time
 
@@ -29,34 +31,45 @@ class ListArgs(Action):
 
 def select_devices(device_list, config):
   serials = config['cameras']['serial']
-  device_ids = list()
+  device_serials = list()
   info("Available cameras:")
-  for idx, device in enumerate(device_list):
+  for device in device_list:
     acc_stat = device.access_status
     if acc_stat == DEVICE_ACCESS_STATUS_READWRITE and device.serial_number in serials:
-        device_ids.append(idx)
+        device_serials.append(device.serial_number)
         info(f"  {device.display_name} ({device.serial_number})")
-  return device_ids
+  return device_serials
   
 
-def setup_camera_objects(harvester, device_ids):
+def setup_camera_objects(devices, device_serials):
+    # all cameras share the process-wide harvester, a single CTI load and device discovery
     cameras = list()
     info("Cameras to be used")
-    for idx in device_ids:
-        device = harvester.device_info_list[idx]
-        info(f"  {device.display_name} ({device.serial_number})")
-        cameras.append(setup_camera_object(harvester, idx))
+    names = {device.serial_number: device.display_name for device in devices}
+    for serial in device_serials:
+        info(f"  {names[serial]} ({serial})")
+        ia = harvesterService.create(serial)
+        cameras.append({
+            'name': f"{names[serial]}_{serial}",
+            'serial': serial,
+            'ia': ia,
+            'nm': ia.remote_device.node_map,
+            'writer': None,  # init later after params config
+            'frameCount': 0,
+            'recordedCount': 0,
+        })
     return cameras
 
 def main(args):
-    harvester = init_harvester()
+    cameras = list()
     try:
         config = parse_config(args.config)
         # if 'env' in config:
         #   for key, value in config['env'].items():
         #     env[key] = str(value)
-        device_ids = select_devices(harvester.device_info_list, config)
-        cameras = setup_camera_objects(harvester, device_ids)
+        devices = harvesterService.devices()
+        device_serials = select_devices(devices, config)
+        cameras = setup_camera_objects(devices, device_serials)
         # for cam in cameras:
         #   try:
         #     config_camera(cam, config)
@@ -69,7 +82,10 @@ def main(args):
           record_ident = cam['name']
           if args.auto_bracket:
               record_ident += "_AutoBracket"
-          cam['writer'] = Writer(cam['name'])
+          # frames are copied out of the GenTL buffer and written to disk by a background thread
+          # depth/intensity maps are optionally compressed on a thread pool before writing
+          compression = DEFAULT_COMPRESSION if args.compress else None
+          cam['writer'] = AsyncWriter(Writer(record_ident, compression=compression), queueSize=args.queue_size)
         if len(cameras) < 1:
           raise RuntimeError("No cameras in the list - please double check whether the config file contains valid serial numbers identifying the cameras to use")
 
@@ -82,17 +98,20 @@ def main(args):
         
         for cam in cameras:
             info(f"{cam['name']} received {cam['frameCount']} frames ({cam['frameCount']/elapsed:.1f} Hz), recorded {cam['recordedCount']} frames")
+            cam['writer'].close()
+            stats = cam['writer'].getStats()
+            info(f"{cam['name']} wrote {stats['bytesWritten'] / 2**20:.1f} MiB "
+                 f"(ratio {stats['rawBytes'] / max(1, stats['bytesWritten']):.2f}), dropped {stats['dropped']} frames, "
+                 f"max queue depth {stats['maxQueueDepth']}, blocked {stats['blockedTime']:.2f} s")
             cam['writer'] = None
             cam['nm'] = None
             cam['ia'].stop()
     except:
         raise
     finally:
-        if cameras:
-            for cam in cameras:
-                cam['ia'].destroy()
-        if harvester:
-            harvester.reset()
+        for cam in cameras:
+            harvesterService.release(cam['serial'])
+        harvesterService.reset()
 
 
 if __name__ == "__main__":
@@ -109,6 +128,10 @@ if __name__ == "__main__":
     group.add_argument('-n', '--num_frames', type=int, required=False,
                        help='Number of frames to being recorded. '
                        'Example: "-n 100" will record exactly 100 frames')
+    parser.add_argument('-q', '--queue_size', type=int, default=16,
+                        help='Number of frames buffered in memory for the background disk writer')
+    parser.add_argument('-z', '--compress', action='store_true',
+                        help='Compress depth and intensity maps (delta/shuffle + zlib) while recording')
     basicConfig(format="%(levelname)s: %(message)s", level=INFO)
     # Catch any remaining exceptions which might be possibly related to the GenICam feature access (e.g. with an invalid input)
     try:
@@ -0,0 +1,579 @@
+"""
+SICK 相机录像文件, 替代 pickle_harvester 逐字段 pickle 的格式
+    文件头      固定 64 字节: 魔数 版本 头长度 标志 创建时间, 之后为 JSON 描述(录像名和字段白名单)
+    帧         16 字节帧头(魔数 元数据长度 组件数 标志) + JSON 元数据 + 各组件原始数据
+               组件数据按 64 字节对齐, 元数据中记录相对帧数据起点的偏移, 读取时直接 np.memmap, 不拷贝
+               压缩的组件在元数据中记录编码格式 codec, 读取时解压
+    索引        文件末尾为所有帧的偏移 uint64 和 24 字节尾部(魔数 索引偏移 帧数), len() 和随机访问都是 O(1)
+录像异常中断没有写入索引时, Reader 顺序扫描帧头重建索引
+读出的帧与 pickle_harvester.Reader 相同: {字段名: 值, 'maps': [{data_format width height delivered_image_height data}]}
+"""
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+
+import numpy as np
+
+from .compression import EncodedArray, encodeFrame, codecFor, encode, decode
+from .sick_frame import ComponentPools
+
+MAGIC = b"BKVREC01"
+INDEX_MAGIC = b"BKVIDX01"
+FRAME_MAGIC = b"FRM1"
+VERSION = 1
+ALIGN = 64  # 组件数据对齐字节数
+FILE_EXT = ".rec"
+WRITE_BUFFER = 4 << 20  # 文件写缓存, 帧头和对齐填充合并为大块顺序写入
+
+_HEADER = struct.Struct("<8sHHIQ")
+HEADER_SIZE = 64
+_FRAME_HEADER = struct.Struct("<4sIII")
+_TRAILER = struct.Struct("<8sQQ")
+
+# 每帧记录的相机参数 {字段名: (节点名, 读取前需要设置的 Selector)}, 读取失败记为 "N/A"
+NODE_FIELDS = {
+    "AcquisitionFrameRate": ("AcquisitionFrameRate", ()),
+    "ExposureTime": ("ExposureTime", ()),
+    "ExposureAuto": ("ExposureAuto", ()),
+    "ExposureAutoFrameRateMin": ("ExposureAutoFrameRateMin", ()),
+    "FieldOfView": ("FieldOfView", ()),
+    "MultiSlopeMode": ("MultiSlopeMode", ()),
+    "DataFilterEnable": ("Scan3dDataFilterEnable", ()),
+    "DepthValidationFilterLevel": ("Scan3dDepthValidationFilterLevel",
+                                   (("Scan3dDataFilterSelector", "ValidationFilter"),)),
+}
+
+# 每帧记录的 chunk 数据, 读取失败时不记录该字段
+CHUNK_FIELDS = {
+    "FocalLength": ("ChunkScan3dFocalLength", ()),
+    "AspectRatio": ("ChunkScan3dAspectRatio", ()),
+    "PrincipalPointU": ("ChunkScan3dPrincipalPointU", ()),
+    "PrincipalPointV": ("ChunkScan3dPrincipalPointV", ()),
+    "CoordinateScaleA": ("ChunkScan3dCoordinateScale", (("ChunkScan3dCoordinateSelector", "CoordinateA"),)),
+    "CoordinateOffsetA": ("ChunkScan3dCoordinateOffset", (("ChunkScan3dCoordinateSelector", "CoordinateA"),)),
+    "CoordinateScaleB": ("ChunkScan3dCoordinateScale", (("ChunkScan3dCoordinateSelector", "CoordinateB"),)),
+    "CoordinateOffsetB": ("ChunkScan3dCoordinateOffset", (("ChunkScan3dCoordinateSelector", "CoordinateB"),)),
+    "CoordinateScaleC": ("ChunkScan3dCoordinateScale", (("ChunkScan3dCoordinateSelector", "CoordinateC"),)),
+    "CoordinateOffsetC": ("ChunkScan3dCoordinateOffset", (("ChunkScan3dCoordinateSelector", "CoordinateC"),)),
+}
+
+BUFFER_FIELDS = ["frame_id", "timestamp_ns", "numComponents"] + list(CHUNK_FIELDS)
+
+MAP_FIELDS = ["data_format", "width", "height", "delivered_image_height", "data"]
+
+
+def _align_(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _jsonValue_(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _readNode_(nodeMap, node, selectors):
+    for selector, value in selectors:
+        getattr(nodeMap, selector).value = value
+    return getattr(nodeMap, node).value
+
+
+def captureFrame(buffer, nodeMap):
+    """
+    把 harvesters Buffer 和相机参数整理为帧字典, 组件 data 为 Buffer 上的视图, 写入前 Buffer 不能归还
+    """
+    frame = {}
+    for name, (node, selectors) in NODE_FIELDS.items():
+        try:
+            frame[name] = _readNode_(nodeMap, node, selectors)
+        except Exception:
+            # 如 ExposureAuto 开启时无法读取 ExposureTime
+            frame[name] = "N/A"
+    components = buffer.payload.components
+    frame["frame_id"] = buffer.module.frame_id
+    frame["timestamp_ns"] = buffer.timestamp_ns
+    frame["numComponents"] = len(components)
+    for name, (node, selectors) in CHUNK_FIELDS.items():
+        try:
+            frame[name] = _readNode_(nodeMap, node, selectors)
+        except Exception:
+            continue
+    frame["maps"] = [{
+        "data_format": component.data_format,
+        "width": component.width,
+        "height": component.height,
+        "delivered_image_height": component.delivered_image_height,
+        "data": component.data,
+    } for component in components]
+    return frame
+
+
+class Writer(object):
+    """
+    顺序写入录像文件, close() 时写入索引, 用法与 pickle_harvester.Writer 相同
+    Args:
+        record_name: 录像名, 默认文件名为 时间_录像名.rec
+        filename: 指定文件名
+        nodes buffer maps: 字段白名单, 只用于记录在文件头中, 转换旧录像时沿用原白名单
+        bufferSize: 文件写缓存字节数
+        compression: 组件压缩, None 不压缩, 编码格式字符串或 {data_format: 编码格式}, 见 compression.py
+    """
+
+    def __init__(self, record_name="UNNAMED", filename=None, nodes=None, buffer=None, maps=None,
+                 bufferSize=WRITE_BUFFER, compression=None):
+        self.record_name = record_name
+        if filename is None:
+            filename = time.strftime("%Y-%m-%d_%H-%M-%S_", time.localtime()) + record_name + FILE_EXT
+        self.filename = str(filename)
+        self.offsets = []
+        self.bytesWritten = 0
+        self.rawBytes = 0  # 组件压缩前的字节数
+        self.compression = compression
+        self.file = open(self.filename, "wb", buffering=bufferSize)
+        contract = json.dumps({
+            "recordName": record_name,
+            "nodes": list(NODE_FIELDS) if nodes is None else list(nodes),
+            "buffer": BUFFER_FIELDS if buffer is None else list(buffer),
+            "maps": MAP_FIELDS if maps is None else list(maps),
+            "compression": compression,
+        }).encode("utf-8")
+        header = _HEADER.pack(MAGIC, VERSION, HEADER_SIZE, 0, time.time_ns())
+        self._write_(header + bytes(HEADER_SIZE - len(header)))
+        self._write_(struct.pack("<I", len(contract)) + contract)
+        self._pad_()
+
+    def _write_(self, data):
+        self.file.write(data)
+        self.bytesWritten += len(data)
+
+    def _pad_(self):
+        padding = _align_(self.bytesWritten) - self.bytesWritten
+        if padding:
+            self._write_(bytes(padding))
+
+    def store(self, buffer, nodeMap):
+        """
+        写入一帧 harvesters Buffer
+        """
+        self.storeFrame(captureFrame(buffer, nodeMap))
+
+    def storeFrame(self, frame):
+        """
+        写入一帧帧字典, 组件 data 为 NumPy 数组, 或已在其他线程编码的 EncodedArray
+        """
+        start = self.bytesWritten
+        arrays = []
+        maps = []
+        for item in frame.get("maps", []):
+            data = item["data"]
+            spec = codecFor(self.compression, item["data_format"])
+            if spec is not None and not isinstance(data, EncodedArray):
+                data = encode(data, spec)
+            meta = {key: value for key, value in item.items() if key != "data"}
+            if isinstance(data, EncodedArray):
+                array = np.frombuffer(data.payload, dtype=np.uint8)
+                meta.update({"dtype": data.dtype, "shape": list(data.shape), "codec": data.codec})
+                self.rawBytes += int(np.prod(data.shape)) * np.dtype(data.dtype).itemsize
+            else:
+                array = np.ascontiguousarray(data)
+                meta.update({"dtype": array.dtype.str, "shape": list(array.shape)})
+                self.rawBytes += array.nbytes
+            meta["nbytes"] = array.nbytes
+            arrays.append(array)
+            maps.append(meta)
+        offset = 0
+        for item in maps:
+            # 相对帧数据起点的偏移, 帧数据起点为元数据之后按 ALIGN 对齐的位置
+            item["offset"] = offset
+            offset = _align_(offset + item["nbytes"])
+        fields = {key: value for key, value in frame.items() if key != "maps"}
+        meta = json.dumps({"fields": fields, "maps": maps}, default=_jsonValue_).encode("utf-8")
+        self._write_(_FRAME_HEADER.pack(FRAME_MAGIC, len(meta), len(maps), 0) + meta)
+        self._pad_()
+        for array in arrays:
+            self._write_(memoryview(array).cast("B"))
+            self._pad_()
+        self.offsets.append(start)
+
+    def close(self):
+        """
+        写入索引和尾部, 之后不能再写入
+        """
+        if self.file is None:
+            return
+        indexOffset = self.bytesWritten
+        self._write_(np.asarray(self.offsets, dtype="<u8").tobytes())
+        self._write_(_TRAILER.pack(INDEX_MAGIC, indexOffset, len(self.offsets)))
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        if getattr(self, "file", None) is not None:
+            self.close()
+
+
+BLOCK = "block"  # 队列满时取流线程等待写盘, 不丢帧
+DROP = "drop"  # 队列满时丢弃当前帧, 取流线程不等待
+
+
+class AsyncWriter(object):
+    """
+    后台线程写盘, 取流线程只把组件拷贝到内存池后入队, 拷贝完成即可归还 GenTL Buffer, 不会因为磁盘慢而占住 Buffer
+    Writer 开启压缩时在线程池中并行压缩, 写盘线程按入队顺序写入
+    Args:
+        writer: Writer, 由写盘线程独占, close() 时一起关闭
+        queueSize: 队列中最多缓存的帧数, 包含正在压缩的帧
+        policy: 队列满时的策略 block / drop
+        pools: 组件内存池, 默认每个组件预分配 queueSize + 2 块
+        workers: 压缩线程数, 默认为 CPU 核数, zlib lzma bz2 压缩时释放 GIL
+    """
+
+    def __init__(self, writer: Writer, queueSize=16, policy=BLOCK, pools: ComponentPools = None, workers=None):
+        if policy not in (BLOCK, DROP):
+            raise ValueError(f"不支持的队列策略: {policy}")
+        self.writer = writer
+        self.policy = policy
+        self.pools = pools or ComponentPools(count=queueSize + 2)
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.maxQueueDepth = 0
+        self.blockedTime = 0.0  # 取流线程因队列满等待的总秒数
+        self.error = None
+        self._queue = queue.Queue(maxsize=queueSize)
+        self._executor = None
+        if writer.compression is not None:
+            self._executor = ThreadPoolExecutor(workers or os.cpu_count(), thread_name_prefix="AsyncWriterCompress")
+        self._lastStats = (time.perf_counter(), 0)
+        self._thread = threading.Thread(target=self._run_, name=f"AsyncWriter-{writer.record_name}", daemon=True)
+        self._thread.start()
+
+    @property
+    def filename(self):
+        return self.writer.filename
+
+    @property
+    def queueDepth(self):
+        return self._queue.qsize()
+
+    def store(self, buffer, nodeMap):
+        """
+        拷贝一帧 harvesters Buffer 并入队, 返回后即可归还 Buffer
+        Returns:
+            是否入队, drop 策略下队列满时返回 False
+        """
+        return self.storeFrame(captureFrame(buffer, nodeMap))
+
+    def storeFrame(self, frame):
+        """
+        拷贝帧字典中的组件数据并入队
+        Returns:
+            是否入队
+        """
+        if self.error is not None:
+            raise Exception("录像写盘失败") from self.error
+        if self._thread is None:
+            raise Exception("录像已经关闭")
+        if self.policy == DROP and self._queue.full():
+            self.dropped += 1
+            return False
+        frame = dict(frame)
+        frame["maps"] = [dict(item, data=self.pools.copy(f"{index}:{item['data_format']}", item["data"]))
+                         for index, item in enumerate(frame.get("maps", []))]
+        if self._executor is not None:
+            frame = self._executor.submit(self._encode_, frame)
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            if self.policy == DROP:
+                self._discard_(frame)
+                self.dropped += 1
+                return False
+            start = time.perf_counter()
+            self._queue.put(frame)
+            self.blockedTime += time.perf_counter() - start
+        self.queued += 1
+        self.maxQueueDepth = max(self.maxQueueDepth, self._queue.qsize())
+        return True
+
+    @staticmethod
+    def _releaseFrame_(frame):
+        for item in frame["maps"]:
+            if not isinstance(item["data"], EncodedArray):
+                item["data"].release()
+
+    def _discard_(self, frame):
+        if isinstance(frame, Future):
+            frame.add_done_callback(lambda future: future.exception() is None and self._releaseFrame_(future.result()))
+        else:
+            self._releaseFrame_(frame)
+
+    def _encode_(self, frame):
+        try:
+            encoded = encodeFrame(frame, self.writer.compression)
+        except Exception:
+            self._releaseFrame_(frame)
+            raise
+        # 压缩后的组件不再需要内存池, 未压缩的组件写盘后再归还
+        for item, encodedItem in zip(frame["maps"], encoded["maps"]):
+            if isinstance(encodedItem["data"], EncodedArray):
+                item["data"].release()
+        return encoded
+
+    def _run_(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            try:
+                if isinstance(frame, Future):
+                    frame = frame.result()
+                if self.error is None:
+                    self.writer.storeFrame(frame)
+                    self.written += 1
+            except Exception as e:
+                self.error = e
+            finally:
+                if isinstance(frame, dict):
+                    self._releaseFrame_(frame)
+
+    def getStats(self):
+        """
+        写盘统计快照
+        Returns:
+            {queueDepth, maxQueueDepth, queued, written, dropped, bytesWritten, rawBytes, bytesPerSec, blockedTime}
+            rawBytes 为组件压缩前的字节数, bytesPerSec 为距上次调用 getStats() 的写盘速度
+        """
+        now = time.perf_counter()
+        bytesWritten = self.writer.bytesWritten
+        last, lastBytes = self._lastStats
+        self._lastStats = (now, bytesWritten)
+        return {
+            "queueDepth": self.queueDepth,
+            "maxQueueDepth": self.maxQueueDepth,
+            "queued": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "bytesWritten": bytesWritten,
+            "rawBytes": self.writer.rawBytes,
+            "bytesPerSec": (bytesWritten - lastBytes) / (now - last) if now > last else 0.0,
+            "blockedTime": self.blockedTime,
+        }
+
+    def close(self):
+        """
+        等待队列中的帧全部写完后关闭文件
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown()
+        self.writer.close()
+        if self.error is not None:
+            raise Exception("录像写盘失败") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Reader(object):
+    """
+    读取录像文件, 按索引随机访问, 用法与 pickle_harvester.Reader 相同
+        len(reader)  reader[i]  reader[a:b]  for frame in reader
+    Args:
+        filename: 录像文件
+        mmap: 组件数据为文件上的 np.memmap 视图, 否则读入内存
+    """
+
+    def __init__(self, filename, mmap=True):
+        self.filename = str(filename)
+        self.file = open(self.filename, "rb")
+        magic, version, headerSize, _, self.created = _HEADER.unpack(self.file.read(_HEADER.size))
+        if magic != MAGIC:
+            raise RuntimeError(f"{self.filename} 不是录像文件")
+        if version > VERSION:
+            raise RuntimeError(f"不支持的录像版本 {version}")
+        self.file.seek(headerSize)
+        contract = json.loads(self.file.read(struct.unpack("<I", self.file.read(4))[0]))
+        self.record_name = contract["recordName"]
+        self.nodes_wl = contract["nodes"]
+        self.buffer_wl = contract["buffer"]
+        self.maps_wl = contract["maps"]
+        self.compression = contract.get("compression")
+        self._firstFrame = _align_(self.file.tell())
+        self.size = Path(self.filename).stat().st_size
+        self.recovered = False
+        self.offsets = self._loadIndex_()
+        self._data = np.memmap(self.filename, dtype=np.uint8, mode="r") if mmap and self.size else None
+        self._next = 0
+
+    def _loadIndex_(self):
+        if self.size >= self._firstFrame + _TRAILER.size:
+            self.file.seek(self.size - _TRAILER.size)
+            magic, indexOffset, count = _TRAILER.unpack(self.file.read(_TRAILER.size))
+            if magic == INDEX_MAGIC and indexOffset + count * 8 + _TRAILER.size == self.size:
+                self.file.seek(indexOffset)
+                return np.frombuffer(self.file.read(count * 8), dtype="<u8").astype(np.int64)
+        self.recovered = True
+        return np.asarray(self.scan(), dtype=np.int64)
+
+    def _frameHeader_(self, offset):
+        """
+        帧元数据和帧数据起点, 不是完整的帧头时返回 None
+        """
+        if offset + _FRAME_HEADER.size > self.size:
+            return None
+        self.file.seek(offset)
+        magic, metaLen, _, _ = _FRAME_HEADER.unpack(self.file.read(_FRAME_HEADER.size))
+        if magic != FRAME_MAGIC:
+            return None
+        try:
+            meta = json.loads(self.file.read(metaLen))
+        except ValueError:
+            return None
+        return meta, _align_(offset + _FRAME_HEADER.size + metaLen)
+
+    def scan(self):
+        """
+        顺序扫描帧头得到所有完整帧的偏移, 用于没有索引的录像
+        """
+        offsets = []
+        offset = self._firstFrame
+        while True:
+            header = self._frameHeader_(offset)
+            if header is None:
+                break
+            meta, dataStart = header
+            end = dataStart
+            for item in meta["maps"]:
+                end = dataStart + item["offset"] + item["nbytes"]
+            if end > self.size:
+                break
+            offsets.append(offset)
+            offset = _align_(end)
+        return offsets
+
+    def _readFrame_(self, offset):
+        header = self._frameHeader_(offset)
+        if header is None:
+            raise RuntimeError(f"偏移 {offset} 处不是录像帧")
+        meta, dataStart = header
+        frame = dict(meta["fields"])
+        maps = []
+        for item in meta["maps"]:
+            dtype = np.dtype(item.pop("dtype"))
+            shape = item.pop("shape")
+            start, nbytes = dataStart + item.pop("offset"), item.pop("nbytes")
+            codec = item.pop("codec", None)
+            if self._data is not None:
+                payload = self._data[start:start + nbytes]
+            else:
+                self.file.seek(start)
+                payload = np.frombuffer(self.file.read(nbytes), dtype=np.uint8)
+            if codec is not None:
+                data = decode(payload, dtype, shape, codec)
+            else:
+                data = payload.view(dtype).reshape(shape)
+            item["data"] = data
+            maps.append(item)
+        frame["maps"] = maps
+        return frame
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._readFrame_(self.offsets[i]) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("帧序号超出范围")
+        return self._readFrame_(self.offsets[index])
+
+    def __iter__(self):
+        for offset in self.offsets:
+            yield self._readFrame_(offset)
+
+    def get_next_frame(self):
+        """
+        顺序读取下一帧, 读完返回 None
+        """
+        if self._next >= len(self):
+            return None
+        frame = self[self._next]
+        self._next += 1
+        return frame
+
+    def get_all_frames(self):
+        return self[:]
+
+    def get_frames(self, skip, n=0):
+        """
+        跳过 skip 帧后读取 n 帧, n 为 0 时读取到最后
+        """
+        return self[skip:skip + n if n else len(self)]
+
+    def close(self):
+        self._data = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def writeFrames(frames, filename, **contract):
+    """
+    把帧字典写入录像文件, 返回帧数
+    """
+    count = 0
+    with Writer(filename=filename, **contract) as writer:
+        for frame in frames:
+            writer.storeFrame(frame)
+            count += 1
+    return count
+
+
+def convertPickle(src, dst=None, compression=None):
+    """
+    把 pickle_harvester 录像转换为本格式
+    Args:
+        src: .pickle 文件
+        dst: 输出文件, 默认与 src 同名, 扩展名为 .rec
+        compression: 组件压缩, 同 Writer
+    Returns:
+        输出文件名
+    """
+    from .python.lib.pickle_harvester import Reader as PickleReader
+    dst = str(dst or Path(src).with_suffix(FILE_EXT))
+    with PickleReader(src) as reader:
+        writeFrames(reader, dst, record_name=Path(src).stem, nodes=reader.nodes_wl, buffer=reader.buffer_wl,
+                    maps=reader.maps_wl, compression=compression)
+    return dst
+
+
+if __name__ == "__main__":
+    import sys
+
+    for path in sys.argv[1:]:
+        print(f"{path} -> {convertPickle(path)}")
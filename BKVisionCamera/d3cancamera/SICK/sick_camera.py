@@ -1,4 +1,5 @@
 from BKVisionCamera.base import register
+from BKVisionCamera.base.property import GrabTimeoutError
 from BKVisionCamera.base.property.capture import CaptureModel
 # from .sick_sdk import SickSdk
 
@@ -11,19 +12,46 @@ class SickCamera(CaptureModel):
 
     def open(self):
         self.sdk.open()
+        if self.property.multiThread:
+            self.startGrabThread()
 
     def release(self):
+        self.stopGrabThread()
         self.sdk.release()
 
-    def getFrame(self):
-        return self.sdk.getFrame()
+    def grab(self, timeout=None):
+        """
+        与海康 大华相同, 超时返回 None, 其他错误(如断线)抛出
+        Args:
+            timeout: 等待的秒数, 与 SickSdk.getFrame 单位相同, None 使用默认值
+        """
+        try:
+            if timeout is None:
+                return self.sdk.getFrame()
+            return self.sdk.getFrame(timeout)
+        except GrabTimeoutError:
+            return None
+
+    def leaseFrame(self, timeout=None, safe=False):
+        """
+        租用一个 harvesters Buffer, 不做内存拷贝, 参见 SickSdk.leaseFrame
+        """
+        if timeout is None:
+            return self.sdk.leaseFrame(safe=safe)
+        return self.sdk.leaseFrame(timeout, safe)
 
     def __init__(self, property_):
         super().__init__(property_)
         self.sdk: SickSdk
 
+    @classmethod
+    def getSdkClass(cls):
+        # sick_sdk 依赖 harvesters, 用到时再导入, Harvester 在第一次枚举时才创建
+        from .sick_sdk import SickSdk
+        return SickSdk
+
     def load(self):
-        return SickSdk(self.property)
+        return self.getSdkClass()(self.property)
 
     def __enter__(self):
         # 初始化或打开相机等操作
@@ -0,0 +1,112 @@
+"""
+SICK 参数快照, csv 文件每行 "节点名,值", # 开头为注释, 与 SickSdk.loadConfig 读取的格式相同
+ComponentList 行为空格分隔的启用组件名, 如 Range Intensity
+"""
+import csv
+import time
+from pathlib import Path
+
+from BKVisionCamera.utils.feature_file import isSelector, parseValue
+
+# 不写入快照的节点, 组件开关由 ComponentList 行表示
+SNAPSHOT_SKIP = {"ComponentSelector", "ComponentEnable", "TLParamsLocked"}
+
+
+def formatValue(value):
+    """
+    节点值转为文本, parseValue 可以还原, float32 等 NumPy 标量按 Python 类型输出
+    """
+    if hasattr(value, "item"):
+        value = value.item()
+    return str(value)
+
+
+def enabledComponents(nodeMap, isAvailable):
+    """
+    相机当前启用的组件名, 读取后恢复 ComponentSelector
+    Args:
+        isAvailable: genicam.genapi.is_available
+    """
+    selector = nodeMap.ComponentSelector
+    current = selector.value
+    res = []
+    try:
+        for entry in selector.entries:
+            if not isAvailable(entry):
+                continue
+            selector.value = entry.symbolic
+            if nodeMap.ComponentEnable.value:
+                res.append(entry.symbolic)
+    finally:
+        selector.value = current
+    return res
+
+
+def nodeValues(nodeMap, isExportable):
+    """
+    读取所有可导出节点的当前值, Selector 排在最前, 加载时先选中同样的对象再写入其后的节点
+    Args:
+        isExportable: isExportable(node) 节点是否可读写且为数值 布尔 枚举或字符串
+    Returns:
+        [(节点名, 值字符串)]
+    """
+    rows = []
+    for node in nodeMap.nodes:
+        name = node.node.name
+        if name in SNAPSHOT_SKIP:
+            continue
+        try:
+            if not isExportable(node):
+                continue
+            rows.append((name, formatValue(node.value)))
+        except Exception:
+            # 依赖其他节点状态暂时不可读的节点不保存
+            continue
+    return sorted(rows, key=lambda row: not isSelector(row[0]))
+
+
+def saveCsvConfig(path, rows):
+    """
+    写入快照文件
+    Args:
+        rows: [(节点名, 值字符串)]
+    """
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write("# SICK 参数快照, 每行 节点名,值\n")
+        csv.writer(f).writerows(rows)
+
+
+def loadCsvConfig(path, nodeMap, setFeature, setComponents, isAvailable):
+    """
+    按快照写入参数, 只写入与相机当前值不同的节点
+    Args:
+        setFeature: setFeature(nodeMap, 节点名, 值)
+        setComponents: setComponents(nodeMap, [组件名]) 只启用给定的组件
+        isAvailable: genicam.genapi.is_available
+    Returns:
+        mode features written failed elapsed, 同 loadFeatureFile
+    """
+    start = time.perf_counter()
+    rows = []
+    if Path(path).exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = [row for row in csv.reader(f) if len(row) >= 2 and "#" not in row[0]]
+    written = 0
+    failed = []
+    for name, val in (row[:2] for row in rows):
+        try:
+            if name == "ComponentList":
+                if set(enabledComponents(nodeMap, isAvailable)) != set(val.split()):
+                    setComponents(nodeMap, val.split())
+                    written += 1
+                continue
+            value = parseValue(val)
+            if getattr(nodeMap, name).value == value:
+                continue
+            setFeature(nodeMap, name, value)
+            written += 1
+        except Exception as e:
+            print(f"Failed to set {name} to {val} ({e})")
+            failed.append(name)
+    return {"mode": "diff", "features": len(rows), "written": written, "failed": failed,
+            "elapsed": time.perf_counter() - start}
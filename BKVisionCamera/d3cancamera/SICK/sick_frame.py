@@ -0,0 +1,244 @@
+"""
+SICK 3D 相机的多组件帧, 一次 fetch 得到的 harvesters Buffer 中包含 Range / Intensity / Confidence 等组件
+Buffer 在 GenTL 缓存池中只有 num_buffers 个, 用完必须尽快 queue() 归还, 否则相机没有缓存可写而丢帧
+"""
+import time
+
+import numpy as np
+
+from BKVisionCamera.base.property import FrameInfo, GrabTimeoutError
+from BKVisionCamera.base.property.frame_lease import FrameLease
+from BKVisionCamera.utils.buffer_pool import BufferPool
+
+# 取帧方式
+FRAME_VIEW = "view"  # 直接访问 Buffer 的视图, 不拷贝, 下一次取帧时失效
+FRAME_COPY = "copy"  # 拷贝到内存池, 取帧后立即归还 Buffer
+FRAME_DECODED = "decoded"  # 拷贝并解码, Range 按 Scan3d 系数换算为距离 float32
+
+FRAME_MODES = (FRAME_VIEW, FRAME_COPY, FRAME_DECODED)
+
+# PFNC 像素格式对应的组件名
+COMPONENT_NAMES = {
+    "Coord3D_C16": "Range",
+    "Coord3D_C32f": "Range",
+    "Coord3D_ABC32f": "PointCloud",
+    "Mono8": "Intensity",
+    "Mono16": "Intensity",
+    "Confidence8": "Confidence",
+    "Confidence16": "Confidence",
+    "RGB8": "Color",
+    "BGR8": "Color",
+}
+
+
+def componentName(component):
+    """
+    按像素格式得到组件名, 未知格式返回格式名
+    """
+    return COMPONENT_NAMES.get(component.data_format, component.data_format)
+
+
+def componentView(component):
+    """
+    组件数据的 (height, width) 或 (height, width, 通道) 视图, 不拷贝
+    """
+    data = component.data
+    height, width = component.height, component.width
+    if data.size == height * width:
+        return data.reshape(height, width)
+    return data.reshape(height, width, -1)
+
+
+def bufferInfo(buffer):
+    """
+    Buffer 的帧信息, 宽高取第一个组件
+    """
+    components = buffer.payload.components
+    first = components[0] if len(components) else None
+    return FrameInfo(frameNum=buffer.module.frame_id, devTimestamp=buffer.timestamp_ns,
+                     hostTimestamp=int(time.time() * 1000), pixelType=first.data_format if first else 0,
+                     width=first.width if first else 0, height=first.height if first else 0,
+                     frameLen=sum(component.data.nbytes for component in components))
+
+
+class SickFrame(dict):
+    """
+    一帧的所有组件 {组件名: 图像}, info 为 FrameInfo
+    拷贝模式下图像为 PooledArray, release() 后内存归还到内存池
+    """
+
+    def __init__(self, components=None, info=None):
+        super().__init__(components or {})
+        self.info = info
+
+    @property
+    def range(self):
+        return self.get("Range")
+
+    @property
+    def intensity(self):
+        return self.get("Intensity")
+
+    @property
+    def confidence(self):
+        return self.get("Confidence")
+
+    def copy(self):
+        """
+        独立拷贝, 不占用内存池
+        """
+        return SickFrame({name: np.array(image) for name, image in self.items()}, self.info)
+
+    def release(self):
+        for image in self.values():
+            release = getattr(image, "release", None)
+            if release is not None:
+                release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class ComponentPools(object):
+    """
+    按组件分别复用的内存池, 组件尺寸变化时重建
+    Args:
+        count: 每个组件预分配的块数
+    """
+
+    def __init__(self, count=4):
+        self.count = count
+        self._pools = {}
+
+    def copy(self, key, view, dtype=None):
+        dtype = np.dtype(dtype or view.dtype)
+        size = int(np.prod(view.shape)) * dtype.itemsize
+        pool = self._pools.get(key)
+        if pool is None or pool.size != size:
+            pool = self._pools[key] = BufferPool(size, self.count, grow=True)
+        array = pool.wrap(pool.acquire(), view.shape, dtype)
+        np.copyto(array, view, casting='unsafe')
+        return array
+
+
+def viewFrame(buffer):
+    """
+    不拷贝, 组件视图在 Buffer 归还后失效
+    """
+    return SickFrame({componentName(component): componentView(component)
+                      for component in buffer.payload.components}, bufferInfo(buffer))
+
+
+def copyFrame(buffer, pools: ComponentPools, rangeScale=None):
+    """
+    把各组件拷贝到内存池, 调用后即可归还 Buffer
+    Args:
+        rangeScale: (scale, offset), 不为 None 时 Range 换算为 float32 距离 = 原始值 * scale + offset
+    """
+    frame = SickFrame(info=bufferInfo(buffer))
+    for component in buffer.payload.components:
+        name = componentName(component)
+        view = componentView(component)
+        if name == "Range" and rangeScale is not None:
+            image = pools.copy("Range:decoded", view, np.float32)
+            scale, offset = rangeScale
+            image *= scale
+            image += offset
+        else:
+            image = pools.copy(name, view)
+        image.info = frame.info
+        frame[name] = image
+    return frame
+
+
+class SickFrameLease(FrameLease):
+    """
+    租用一个 Buffer, with 块内直接访问组件视图, 退出时 queue() 归还
+    安全模式下退出时 SickFrame 仍被引用则各组件先替换为拷贝, 单独取出的组件视图不在跟踪范围内
+    Args:
+        fetch: fetch() 取得一个 Buffer, 超时抛出 GrabTimeoutError
+    """
+
+    def __init__(self, fetch, safe=False):
+        super().__init__(safe)
+        self.fetch = fetch
+        self.buffer = None
+
+    def _acquire_(self):
+        self.buffer = self.fetch()
+        return viewFrame(self.buffer)
+
+    def _wrap_(self, view):
+        return view
+
+    def _detach_(self, frame):
+        for name, image in list(frame.items()):
+            frame[name] = np.array(image)
+
+    def _free_(self):
+        buffer, self.buffer = self.buffer, None
+        if buffer is not None:
+            buffer.queue()
+
+
+class SickFrameStream(object):
+    """
+    连续取流的迭代器, Buffer 的归还时机是确定的:
+        view 模式在下一次 next() 开始时, 或 close() / 退出 with 时归还上一个 Buffer
+        copy / decoded 模式拷贝完成后立即归还
+    Args:
+        fetch: fetch() 取得一个 Buffer, 超时抛出 GrabTimeoutError
+        mode: view / copy / decoded
+        pools: ComponentPools, copy / decoded 模式使用
+        running: running() 为 False 时结束迭代, 如相机停止取流
+        rangeScale: rangeScale() 返回 Range 的 (scale, offset), decoded 模式使用
+    """
+
+    def __init__(self, fetch, mode=FRAME_COPY, pools=None, running=None, rangeScale=None):
+        if mode not in FRAME_MODES:
+            raise ValueError(f"不支持的取帧方式 {mode}")
+        self.fetch = fetch
+        self.mode = mode
+        self.pools = pools if pools is not None else ComponentPools()
+        self.running = running
+        self.rangeScale = rangeScale
+        self.closed = False
+        self._buffer = None
+
+    def _requeue_(self):
+        buffer, self._buffer = self._buffer, None
+        if buffer is not None:
+            buffer.queue()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self._requeue_()
+        while not self.closed and (self.running is None or self.running()):
+            try:
+                buffer = self.fetch()
+            except GrabTimeoutError:
+                continue
+            if self.mode == FRAME_VIEW:
+                self._buffer = buffer
+                return viewFrame(buffer)
+            try:
+                rangeScale = self.rangeScale() if self.mode == FRAME_DECODED and self.rangeScale else None
+                return copyFrame(buffer, self.pools, rangeScale)
+            finally:
+                buffer.queue()
+        raise StopIteration
+
+    def close(self):
+        self.closed = True
+        self._requeue_()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -9,15 +9,21 @@ import harvesters
 import csv
 from  pathlib import Path
 
+from genicam.genapi import EInterfaceType, is_available, is_readable, is_writable
+from genicam.gentl import TimeoutException
 from harvesters.core import Component2DImage
 from harvesters.util.pfnc import Coord3D_C16
 
 from .python.lib import apply_param, set_components
-from .python.lib.utils import init_harvester, DEVICE_ACCESS_STATUS_READWRITE, setup_camera_object, FETCH_TIMEOUT
+from .python.lib.utils import DEVICE_ACCESS_STATUS_READWRITE, setup_camera_object, FETCH_TIMEOUT
 
-from BKVisionCamera.base.property import CameraSdkInterface, CameraInfo
-
-harvester = init_harvester()
+from BKVisionCamera.base.property import CameraSdkInterface, CameraInfo, GrabTimeoutError
+from BKVisionCamera.base.property.acquisition import GRAB_STRATEGY_FIFO
+from BKVisionCamera.base.property.discovery import discoveryCache
+from .harvester_pool import harvesterService
+from .sick_config import enabledComponents, nodeValues, saveCsvConfig, loadCsvConfig
+from .sick_frame import FRAME_VIEW, FRAME_COPY, FRAME_DECODED, ComponentPools, SickFrameLease, SickFrameStream, \
+    copyFrame
 
 
 def select_devices(device_list, config):
@@ -59,24 +65,27 @@ class SickSdk(CameraSdkInterface):
     def __init__(self, property_=None, camera_info: CameraInfo = None):
         super().__init__(property_, camera_info)
         self.camera = None
+        self.probeNode = None  # isConnected() 读取的节点
+        self.transportSettings = {}
+        self.configReport = None
+        self.componentPools = ComponentPools(property_.bufferPoolSize if property_ is not None else 4)
 
     def init(self):
         pass
 
     def release(self):
         print("release")
-        self.camera['ia'].stop()
-        self.camera['ia'].destroy()
+        self.isGrabbing = False
+        harvesterService.release(self.camera_info.sn)
 
     @staticmethod
     def createCamera(cameraInfo):
-        device_idx = 0
-        device = harvester.device_info_list[device_idx]
-        ia = harvester.create(device_idx)
-        ia.num_buffers = 10
-        ia.stop()
+        """
+        从共享的 Harvester 按序列号创建 ImageAcquirer
+        """
+        ia = harvesterService.create(cameraInfo.sn)
         return {
-            'name': f"{device.display_name}_{device.serial_number}",
+            'name': f"{cameraInfo.device_id}_{cameraInfo.sn}",
             'ia': ia,
             'nm': ia.remote_device.node_map,
             'writer': None,  # init later after params config
@@ -85,8 +94,15 @@ class SickSdk(CameraSdkInterface):
         }
 
     @staticmethod
-    def getDeviceList() -> List[CameraInfo]:
-        return [SickSdk._getCameraInfo_(device) for device in harvester.device_info_list]
+    def getDeviceList(refresh=False) -> List[CameraInfo]:
+        return [SickSdk._getCameraInfo_(device) for device in harvesterService.devices(refresh)]
+
+    @classmethod
+    def discover(cls, property_=None, refresh=False) -> List[CameraInfo]:
+        """
+        refresh 时同时让共享的 Harvester 重新枚举
+        """
+        return discoveryCache.get(cls.__name__, lambda: cls.getDeviceList(refresh), refresh)
 
     @staticmethod
     def _getCameraInfo_(camera_):
@@ -101,68 +117,159 @@ class SickSdk(CameraSdkInterface):
         camera_info.sn=camera_.serial_number
         return camera_info
 
+    # 写入快照的节点类型, 命令和寄存器节点不保存
+    SNAPSHOT_INTERFACES = (EInterfaceType.intfIInteger, EInterfaceType.intfIFloat, EInterfaceType.intfIBoolean,
+                           EInterfaceType.intfIEnumeration, EInterfaceType.intfIString)
+
+    @classmethod
+    def _exportable_(cls, node):
+        return node.node.principal_interface_type in cls.SNAPSHOT_INTERFACES and is_readable(node) \
+            and is_writable(node)
+
     def saveConfig(self, config):
-        if self.property.configFile:
-            pass
+        """
+        把启用的组件和所有可读写节点的当前值保存为 csv 快照, 格式与 loadConfig 相同
+        """
+        nm = self.camera['nm']
+        rows = [("ComponentList", " ".join(enabledComponents(nm, is_available)))]
+        rows += nodeValues(nm, self._exportable_)
+        saveCsvConfig(config, rows)
 
     def loadConfig(self, config):
+        """
+        按 csv 配置文件(每行 节点名,值)写入参数, 只写入与相机当前值不同的节点, 结果保存在 configReport
+        ComponentList 行的值为空格分隔的组件名, 如 Range Intensity
+        """
+        self.configReport = loadCsvConfig(config, self.camera['nm'], apply_param, set_components, is_available)
+        return self.configReport
+
+    def getFeature(self, name):
+        return getattr(self.camera['nm'], name).value
+
+    def setFeature(self, name, value=None):
+        apply_param(self.camera['nm'], name, value)
+
+    def applyAcquisition(self):
+        """
+        按 acquisition 配置设置 harvesters 缓存数和 GenTL 流的缓存处理模式, 必须在 ia.start() 之前调用
+        """
+        acquisition = self.acquisition
+        ia = self.camera['ia']
+        if acquisition.bufferCount:
+            ia.num_buffers = acquisition.bufferCount
+        # GenTL 只有 OldestFirst 和 NewestOnly 两种常用模式, latest 与 upcoming 都按 NewestOnly 处理
+        mode = "OldestFirst" if acquisition.strategy == GRAB_STRATEGY_FIFO else "NewestOnly"
+        try:
+            ia.data_streams[0].node_map.StreamBufferHandlingMode.value = mode
+        except Exception as e:
+            print(f"设置 StreamBufferHandlingMode 失败 ({e})")
+
+    def applyTransport(self):
+        """
+        按 transport 配置设置 GigE 包长和包间延时, 必须在 ia.start() 之前调用
+        auto 包长由 GenTL Producer 在打开设备时协商, 重发和超时由 Producer 管理
+        """
+        transport = self.transport
+        nm = self.camera['nm']
+        if not transport.autoPacketSize and transport.packetSize is not None:
+            apply_param(nm, "GevSCPSPacketSize", transport.packetSize)
+        if transport.packetDelay is not None:
+            apply_param(nm, "GevSCPD", transport.packetDelay)
+        self.transportSettings = {
+            "packetSize": nm.GevSCPSPacketSize.value,
+            "packetDelay": nm.GevSCPD.value,
+        }
+        return self.transportSettings
 
-        # 设置参数AcquisitionFrameRate为5
-        # 设置参数ExposureTime为1
-        # 设置参数GevSCPD为0
-        # 设置参数ChunkModeActive为True
-        apply_param(self.camera['nm'], "AcquisitionFrameRate", 5)
-        apply_param(self.camera['nm'], "ExposureTime", 1)
-        apply_param(self.camera['nm'], "GevSCPD", 0)
-        apply_param(self.camera['nm'], "ChunkModeActive", True)
-        set_components(self.camera['nm'], [ 'Intensity' ])
-        return
-        configFile = config
-        if Path(configFile).exists():
-            csv_reader = csv.reader(open(configFile, 'r', encoding='utf-8'))
-            for row in csv_reader:
-                if len(row) < 2:
-                    continue
-                name, val = row
-                if "#" in name:
-                    continue
-                try:
-                    apply_param(self.camera['nm'], name, val)
-                except Exception as e:
-                    print(f"Failed to set {name} to {val} ({e})")
-            # if 'ComponentList' in config['gev_config']:
-            #     set_components(self.camera['nm'], config['gev_config']['ComponentList'])
     def open(self):
         self.camera = self.createCamera(self.camera_info)
+        self.applySnapshot()
+        self.applyCameraConfig()
+        self.applyTransport()
+        self.applyAcquisition()
         # self.loadConfig(self.property.configFile)
         # self.setExposureTime(1)
+        self.probeNode = self._findProbeNode_()
         self.camera['ia'].start()
+        self.isGrabbing = True
+
+    def _findProbeNode_(self):
+        # 选一个不被 GenApi 缓存的节点, 读取时会访问设备
+        for name in ("DeviceTemperature", "DeviceLinkSpeed", "DeviceSerialNumber"):
+            try:
+                getattr(self.camera['nm'], name).value
+                return name
+            except Exception:
+                continue
+        return None
+
+    def isConnected(self):
+        """
+        读取一个设备节点判断是否仍然连接, SICK GenTL 没有断线回调
+        """
+        if self.camera is None or self.probeNode is None:
+            return True
+        try:
+            getattr(self.camera['nm'], self.probeNode).value
+            return True
+        except Exception:
+            return False
+
+    def _fetch_(self, timeout=FETCH_TIMEOUT):
+        try:
+            return self.camera['ia'].fetch(timeout=timeout)
+        except TimeoutException:
+            raise GrabTimeoutError("采集图像超时")
+
+    def _rangeScale_(self):
+        """
+        当前帧 Range 的 Scan3d 换算系数 (scale, offset), 相机未开启 chunk 数据时返回 None
+        """
+        nm = self.camera['nm']
+        try:
+            nm.ChunkScan3dCoordinateSelector.value = 'CoordinateC'
+            return nm.ChunkScan3dCoordinateScale.value, nm.ChunkScan3dCoordinateOffset.value
+        except Exception:
+            return None
+
+    def getFrame(self, timeout=FETCH_TIMEOUT, mode=FRAME_COPY):
+        """
+        取一帧, 各组件拷贝到内存池后立即归还 Buffer
+        Args:
+            timeout: 等待的秒数
+            mode: copy 原始数据 / decoded Range 换算为距离
+        Returns:
+            SickFrame {组件名: PooledArray}
+        """
+        if mode == FRAME_VIEW:
+            raise Exception("view 模式请使用 leaseFrame 或 frames")
+        buffer = self._fetch_(timeout)
+        try:
+            rangeScale = self._rangeScale_() if mode == FRAME_DECODED else None
+            return copyFrame(buffer, self.componentPools, rangeScale)
+        finally:
+            buffer.queue()
+
+    def leaseFrame(self, timeout=FETCH_TIMEOUT, safe=False) -> SickFrameLease:
+        """
+        租用一个 Buffer, 不做内存拷贝
+        用法:
+            with sdk.leaseFrame() as frame:
+                frame.range ...
+        Args:
+            safe: 安全模式, 退出 with 块时 frame 仍被引用则各组件替换为拷贝后归还 Buffer
+        """
+        return SickFrameLease(lambda: self._fetch_(timeout), safe)
+
+    def frames(self, timeout=FETCH_TIMEOUT, mode=FRAME_COPY) -> SickFrameStream:
+        """
+        连续取流的迭代器, 停止取流后结束
+        Args:
+            timeout: 单帧等待的秒数, 超时后继续等待下一帧
+            mode: view 组件视图, 下一帧时失效 / copy 拷贝到内存池 / decoded 拷贝并换算 Range
+        """
+        return SickFrameStream(lambda: self._fetch_(timeout), mode, self.componentPools,
+                               lambda: self.isGrabbing, self._rangeScale_)
 
-    def getFrame(self):
-        with self.camera['ia'].fetch(timeout=FETCH_TIMEOUT) as buffer:
-            buffer: harvesters.core.Buffer
-            dataList = []
-            # for index, component in enumerate(buffer.payload.components):
-            #     data = component.data
-            #     data = data.reshape((data.shape[0] // 2560), 2560)
-            #     dataList.append(data)
-            # return dataList
-            yield buffer
-            # for index, component in enumerate(buffer.payload.components):
-            #     print(component.data_format)
-            #     print(len(buffer.payload.components))
-            #     data = component.data
-            #     print(component)
-            #     print(data)
-            #     Coord3D_C16
-            #     Component2DImage
-            #     data = data.reshape((data.shape[0] // 2560), 2560)
-            #     dataList.append(component)
-            # yield dataList
-                # cv2.namedWindow("frame" + str(index), cv2.WINDOW_NORMAL)
-                # cv2.imshow("frame" + str(index), data)
-            # if cv2.waitKey(1) & 0xFF == ord('q'):
-            #     return
-            # camera['frameCount'] += 1
     def setExposureTime(self, exposureTime):
         apply_param(self.camera['nm'], "ExposureTime", exposureTime)
\ No newline at end of file
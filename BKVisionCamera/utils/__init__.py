@@ -0,0 +1 @@
+from .buffer_pool import *
@@ -0,0 +1,90 @@
+import threading
+import weakref
+from collections import deque
+from ctypes import c_ubyte
+
+import numpy as np
+
+
+class PooledArray(np.ndarray):
+    """
+    池化内存上的 NumPy 视图, release() 或被回收时内存归还到 BufferPool
+    release() 之后, 之前切出的视图不再有效
+    """
+
+    def __array_finalize__(self, obj):
+        # 切片等派生视图不负责归还内存
+        self._releaser = None
+        # SDK 返回的帧信息, 如帧号 时间戳
+        self.info = getattr(obj, "info", None)
+
+    def release(self):
+        if self._releaser is not None:
+            self._releaser()
+            self._releaser = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class BufferPool(object):
+    """
+    预分配的定长 ctypes 内存池, 取流时复用, 避免每帧重新分配
+    Args:
+        size: 每块内存的字节数, 一般为相机的 PayloadSize
+        count: 预分配的块数
+        grow: 用完时是否追加分配, 取流内存池不追加, 用完时由调用方丢帧或等待, 交给调用方的输出内存可以追加
+    """
+
+    def __init__(self, size, count=4, grow=False):
+        self.size = int(size)
+        self.grow = grow
+        self.allocated = 0
+        # 用完且没有等到空闲内存的次数
+        self.exhausted = 0
+        self._free = deque()
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        for _ in range(count):
+            self._free.append(self._alloc())
+
+    def _alloc(self):
+        self.allocated += 1
+        return (c_ubyte * self.size)()
+
+    @property
+    def available(self):
+        return len(self._free)
+
+    def acquire(self, timeout=0):
+        """
+        取出一块内存
+        Args:
+            timeout: 用完时等待归还的秒数, 0 不等待, None 一直等待, grow 为 True 时不等待直接追加
+        Returns:
+            内存块, 用完且超时返回 None
+        """
+        with self._lock:
+            if not self._free and self.grow:
+                return self._alloc()
+            if not self._released.wait_for(lambda: self._free, timeout):
+                self.exhausted += 1
+                return None
+            return self._free.popleft()
+
+    def release(self, buffer):
+        with self._lock:
+            self._free.append(buffer)
+            self._released.notify()
+
+    def wrap(self, buffer, shape, dtype=np.uint8, offset=0):
+        """
+        将内存块包装为 PooledArray, 数组释放时内存归还到池中
+        """
+        count = int(np.prod(shape))
+        array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape(shape).view(PooledArray)
+        array._releaser = weakref.finalize(array, self.release, buffer)
+        return array
@@ -0,0 +1,139 @@
+"""
+相机参数快照, 即 MV_CC_FeatureSave / IMV_SaveDeviceCfg 生成的 GenApi 持久化文件
+每行为 "节点名<Tab>值", # 开头为注释; 名称以 Selector 结尾的节点决定其后节点作用的对象, 如 TriggerSelector
+
+加载快照时先把相机当前参数保存为临时快照, 两者比较后只写入有变化的节点,
+通常只有几个节点需要写入, 比 SDK 逐个写入全部节点快得多
+"""
+import os
+import tempfile
+import time
+
+
+def isSelector(name):
+    return name.endswith("Selector")
+
+
+def toBool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "on")
+    return bool(value)
+
+
+def parseValue(text):
+    """
+    把文本值转为 int / float / bool, 其他保持字符串, 用于 SICK 的 csv 配置
+    """
+    if text in ("True", "False"):
+        return text == "True"
+    for type_ in (int, float):
+        try:
+            return type_(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parseFeatureFile(path):
+    """
+    读取快照文件
+    Returns:
+        [(节点名, 值字符串)], 保持文件中的顺序
+    """
+    features = []
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split(None, 1)
+            features.append((parts[0], parts[1] if len(parts) > 1 else ""))
+    return features
+
+
+def featureMap(features):
+    """
+    {(生效的 Selector, 节点名): 值}
+    """
+    res = {}
+    context = {}
+    for name, value in features:
+        if isSelector(name):
+            context[name] = value
+            continue
+        res[(tuple(context.items()), name)] = value
+    return res
+
+
+def diffFeatures(target, live):
+    """
+    比较目标快照和相机当前快照
+    Args:
+        target: 目标快照 [(节点名, 值)]
+        live: 相机当前快照 [(节点名, 值)]
+    Returns:
+        需要按顺序写入的 [(节点名, 值)], 写入节点前先写入它依赖的 Selector
+    """
+    liveMap = featureMap(live)
+    writes = []
+    context = {}
+    selected = {}
+    for name, value in target:
+        if isSelector(name):
+            context[name] = value
+            continue
+        if liveMap.get((tuple(context.items()), name)) == value:
+            continue
+        for selector, selectorValue in context.items():
+            if selected.get(selector) != selectorValue:
+                writes.append((selector, selectorValue))
+                selected[selector] = selectorValue
+        writes.append((name, value))
+    # Selector 本身也是参数, 最后恢复为快照中的取值
+    for selector, selectorValue in context.items():
+        if selector in selected and selected[selector] != selectorValue:
+            writes.append((selector, selectorValue))
+    return writes
+
+
+def loadFeatureFile(path, saveLive, setFeature, loadAll):
+    """
+    只写入快照中与相机当前值不同的节点, 无法比较时退回 SDK 整体加载
+    Args:
+        path: 快照文件
+        saveLive: saveLive(path) 保存相机当前参数
+        setFeature: setFeature(name, value) 按节点类型写入一个节点
+        loadAll: loadAll(path) SDK 整体加载快照
+    Returns:
+        mode: diff 比较后写入 / full SDK 整体加载
+        features written: 快照中的节点数和实际写入数
+        failed: 写入失败的节点
+        elapsed: 耗时 s
+    """
+    start = time.perf_counter()
+    target = parseFeatureFile(path)
+    live = None
+    if target:
+        fd, livePath = tempfile.mkstemp(suffix=".ini")
+        os.close(fd)
+        try:
+            saveLive(livePath)
+            live = parseFeatureFile(livePath)
+        except Exception as e:
+            print(f"保存相机当前参数失败, 整体加载快照 ({e})")
+        finally:
+            os.remove(livePath)
+    if not live:
+        loadAll(path)
+        return {"mode": "full", "features": len(target), "written": len(target), "failed": [],
+                "elapsed": time.perf_counter() - start}
+    failed = []
+    writes = diffFeatures(target, live)
+    for name, value in writes:
+        try:
+            setFeature(name, value)
+        except Exception as e:
+            print(f"写入 {name}={value} 失败 ({e})")
+            failed.append(name)
+    return {"mode": "diff", "features": len(target), "written": len(writes) - len(failed), "failed": failed,
+            "elapsed": time.perf_counter() - start}
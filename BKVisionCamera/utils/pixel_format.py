@@ -0,0 +1,256 @@
+import time
+
+import cv2
+import numpy as np
+
+from .buffer_pool import BufferPool
+
+# GenICam PFNC 像素格式编号, 海康 PixelType_Gvsp_* 与大华 gvspPixel* 取值相同
+MONO8 = 0x01080001
+MONO10 = 0x01100003
+MONO10_PACKED = 0x010C0004
+MONO12 = 0x01100005
+MONO12_PACKED = 0x010C0006
+MONO16 = 0x01100007
+BAYER_GR8 = 0x01080008
+BAYER_RG8 = 0x01080009
+BAYER_GB8 = 0x0108000A
+BAYER_BG8 = 0x0108000B
+BAYER_GR10 = 0x0110000C
+BAYER_RG10 = 0x0110000D
+BAYER_GB10 = 0x0110000E
+BAYER_BG10 = 0x0110000F
+BAYER_GR12 = 0x01100010
+BAYER_RG12 = 0x01100011
+BAYER_GB12 = 0x01100012
+BAYER_BG12 = 0x01100013
+BAYER_GR10_PACKED = 0x010C0026
+BAYER_RG10_PACKED = 0x010C0027
+BAYER_GB10_PACKED = 0x010C0028
+BAYER_BG10_PACKED = 0x010C0029
+BAYER_GR12_PACKED = 0x010C002A
+BAYER_RG12_PACKED = 0x010C002B
+BAYER_GB12_PACKED = 0x010C002C
+BAYER_BG12_PACKED = 0x010C002D
+RGB8 = 0x02180014
+BGR8 = 0x02180015
+
+
+class PixelFormat(object):
+    """
+    像素格式描述
+    Args:
+        name: 格式名
+        channels: 输出通道数
+        dtype: 输出数据类型
+        decoder: decoder(data, width, height, out, scratch) 将原始数据写入 out, None 表示原始数据可直接按输出形状查看
+        rawBits: 每像素原始数据位数
+    """
+
+    def __init__(self, name, channels, dtype, decoder=None, rawBits=8):
+        self.name = name
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.decoder = decoder
+        self.rawBits = rawBits
+
+    def shape(self, width, height):
+        if self.channels == 1:
+            return height, width
+        return height, width, self.channels
+
+    def rawSize(self, width, height):
+        return width * height * self.rawBits // 8
+
+    def __repr__(self):
+        return f"PixelFormat({self.name})"
+
+
+PIXEL_FORMATS = {}
+
+
+def registerPixelFormat(pixelType, name, channels=1, dtype=np.uint8, decoder=None, rawBits=8):
+    PIXEL_FORMATS[pixelType] = PixelFormat(name, channels, dtype, decoder, rawBits)
+    return PIXEL_FORMATS[pixelType]
+
+
+def getPixelFormat(pixelType) -> PixelFormat:
+    pixelFormat = PIXEL_FORMATS.get(pixelType)
+    if pixelFormat is None:
+        raise Exception(f"不支持的像素格式 {pixelType:#010x}")
+    return pixelFormat
+
+
+def unpack10(data, out):
+    """
+    GigE Vision Mono10Packed, 每2个像素占3字节
+    byte0 = p0[9:2], byte1 = p1[1:0] << 4 | p0[1:0], byte2 = p1[9:2]
+    """
+    src = data[:out.size * 3 // 2].reshape(-1, 3)
+    dst = out.reshape(-1, 2)
+    np.left_shift(src[:, 0], 2, out=dst[:, 0], dtype=np.uint16)
+    dst[:, 0] |= src[:, 1] & 0x03
+    np.left_shift(src[:, 2], 2, out=dst[:, 1], dtype=np.uint16)
+    dst[:, 1] |= (src[:, 1] >> 4) & 0x03
+    return out
+
+
+def unpack12(data, out):
+    """
+    GigE Vision Mono12Packed, 每2个像素占3字节
+    byte0 = p0[11:4], byte1 = p1[3:0] << 4 | p0[3:0], byte2 = p1[11:4]
+    """
+    src = data[:out.size * 3 // 2].reshape(-1, 3)
+    dst = out.reshape(-1, 2)
+    np.left_shift(src[:, 0], 4, out=dst[:, 0], dtype=np.uint16)
+    dst[:, 0] |= src[:, 1] & 0x0F
+    np.left_shift(src[:, 2], 4, out=dst[:, 1], dtype=np.uint16)
+    dst[:, 1] |= src[:, 1] >> 4
+    return out
+
+
+def _unpackDecoder_(unpack):
+    def decoder(data, width, height, out, scratch):
+        return unpack(data, out)
+
+    return decoder
+
+
+def _bayerDecoder_(code, unpack=None, dtype=np.uint8):
+    # OpenCV 的 Bayer 命名按第二行第二列起算, 与 PFNC 命名错开一位
+    def decoder(data, width, height, out, scratch):
+        if unpack is not None:
+            mosaic = unpack(data, scratch((height, width), np.uint16))
+        else:
+            mosaic = data.view('<u2' if dtype == np.uint16 else dtype)[:width * height].reshape(height, width)
+        cv2.cvtColor(mosaic, code, dst=out)
+        return out
+
+    return decoder
+
+
+registerPixelFormat(MONO8, "Mono8")
+# 16位原始数据按小端读取, 无需转换
+registerPixelFormat(MONO10, "Mono10", dtype='<u2', rawBits=16)
+registerPixelFormat(MONO12, "Mono12", dtype='<u2', rawBits=16)
+registerPixelFormat(MONO16, "Mono16", dtype='<u2', rawBits=16)
+registerPixelFormat(MONO10_PACKED, "Mono10Packed", dtype=np.uint16, decoder=_unpackDecoder_(unpack10), rawBits=12)
+registerPixelFormat(MONO12_PACKED, "Mono12Packed", dtype=np.uint16, decoder=_unpackDecoder_(unpack12), rawBits=12)
+registerPixelFormat(RGB8, "RGB8", channels=3, rawBits=24)
+registerPixelFormat(BGR8, "BGR8", channels=3, rawBits=24)
+
+for _pattern, _code, _types in (
+        ("GR", cv2.COLOR_BayerGB2BGR, (BAYER_GR8, BAYER_GR10, BAYER_GR12, BAYER_GR10_PACKED, BAYER_GR12_PACKED)),
+        ("RG", cv2.COLOR_BayerBG2BGR, (BAYER_RG8, BAYER_RG10, BAYER_RG12, BAYER_RG10_PACKED, BAYER_RG12_PACKED)),
+        ("GB", cv2.COLOR_BayerGR2BGR, (BAYER_GB8, BAYER_GB10, BAYER_GB12, BAYER_GB10_PACKED, BAYER_GB12_PACKED)),
+        ("BG", cv2.COLOR_BayerRG2BGR, (BAYER_BG8, BAYER_BG10, BAYER_BG12, BAYER_BG10_PACKED, BAYER_BG12_PACKED)),
+):
+    registerPixelFormat(_types[0], f"Bayer{_pattern}8", 3, np.uint8, _bayerDecoder_(_code))
+    registerPixelFormat(_types[1], f"Bayer{_pattern}10", 3, np.uint16, _bayerDecoder_(_code, dtype=np.uint16), 16)
+    registerPixelFormat(_types[2], f"Bayer{_pattern}12", 3, np.uint16, _bayerDecoder_(_code, dtype=np.uint16), 16)
+    registerPixelFormat(_types[3], f"Bayer{_pattern}10Packed", 3, np.uint16, _bayerDecoder_(_code, unpack10), 12)
+    registerPixelFormat(_types[4], f"Bayer{_pattern}12Packed", 3, np.uint16, _bayerDecoder_(_code, unpack12), 12)
+
+
+def rawView(pointer, pixelType, width, height):
+    """
+    SDK 缓存上按像素格式查看的图像, 不拷贝, 供租用缓存使用
+    Args:
+        pointer: 指向原始数据的 POINTER(c_ubyte)
+    Returns:
+        dtype 和形状与 PixelDecoder.decode 的输出相同, Packed 和 Bayer 等需要解码的格式抛出异常
+    """
+    pixelFormat = getPixelFormat(pixelType)
+    if pixelFormat.decoder is not None:
+        raise Exception(f"像素格式 {pixelFormat.name} 需要解码, 不能直接查看SDK缓存, 请使用 getFrame")
+    data = np.ctypeslib.as_array(pointer, (pixelFormat.rawSize(width, height),))
+    return data.view(pixelFormat.dtype).reshape(pixelFormat.shape(width, height))
+
+
+class PixelDecoder(object):
+    """
+    按像素格式解码相机原始数据, 输出内存来自 BufferPool 复用
+    Args:
+        count: 每种输出尺寸预分配的块数
+    """
+
+    def __init__(self, count=4):
+        self.count = count
+        self._pools = {}
+        self._scratch = {}
+
+    def _scratch_(self, shape, dtype):
+        # 中间结果只在本次解码内使用, 同尺寸复用一块内存
+        key = (shape, np.dtype(dtype))
+        array = self._scratch.get(key)
+        if array is None:
+            array = self._scratch[key] = np.empty(shape, dtype)
+        return array
+
+    def allocOutput(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        size = int(np.prod(shape)) * dtype.itemsize
+        pool = self._pools.get(size)
+        if pool is None:
+            # 输出交给调用方, 持有的帧数不受限制, 用完时追加
+            pool = self._pools[size] = BufferPool(size, self.count, grow=True)
+        return pool.wrap(pool.acquire(), shape, dtype)
+
+    def decode(self, pixelType, data, width, height):
+        """
+        Args:
+            pixelType: PFNC 像素格式, 即 MV_FRAME_OUT_INFO_EX.enPixelType
+            data: 一维 uint8 原始数据
+        Returns:
+            解码后的图像, 无需转换的格式直接返回原始数据上的视图
+        """
+        pixelFormat = getPixelFormat(pixelType)
+        if pixelFormat.decoder is None:
+            count = width * height * pixelFormat.channels
+            return data.view(pixelFormat.dtype)[:count].reshape(pixelFormat.shape(width, height))
+        out = self.allocOutput(pixelFormat.shape(width, height), pixelFormat.dtype)
+        return pixelFormat.decoder(data, width, height, out, self._scratch_)
+
+    def decodeFrame(self, raw):
+        """
+        Args:
+            raw: 取流内存上的一维 uint8 PooledArray, raw.info 为 FrameInfo
+        Returns:
+            无需转换的格式返回原始内存上的视图, 由视图负责归还内存, 否则返回解码后的新图像, 原始内存立即归还
+        """
+        info = raw.info
+        frame = self.decode(info.pixelType, raw, info.width, info.height)
+        if getPixelFormat(info.pixelType).decoder is None:
+            frame._releaser, raw._releaser = raw._releaser, None
+            return frame
+        frame.info = info
+        raw.release()
+        return frame
+
+
+def benchmark(pixelType, width, height, repeat=20, converters=None):
+    """
+    对同一帧随机数据比较各解码路径的耗时
+    Args:
+        converters: {名称: converter(data, width, height)}, 如 SDK 转换, 默认只测试 numpy 路径
+    Returns:
+        {名称: 每帧毫秒数}
+    """
+    pixelFormat = getPixelFormat(pixelType)
+    data = np.random.randint(0, 256, pixelFormat.rawSize(width, height), dtype=np.uint8)
+    decoder = PixelDecoder()
+    paths = {"numpy": lambda data_, width_, height_: decoder.decode(pixelType, data_, width_, height_)}
+    if converters:
+        paths.update(converters)
+    res = {}
+    for name, converter in paths.items():
+        converter(data, width, height)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            converter(data, width, height)
+        res[name] = (time.perf_counter() - start) * 1000 / repeat
+    return res
+
+
+def fastestPath(results):
+    return min(results, key=results.get)
@@ -1,4 +1,3 @@
-import harvesters
 import numpy as np
 from tqdm import tqdm
 import cv2
@@ -17,13 +16,10 @@ with capter as cap:
         # cv2.namedWindow("frame", cv2.WINDOW_NORMAL)
         # cv2.imshow("frame", frame)
         # cv2.waitKey(1)
-        buffer = cap.getFrame().__next__()
-        buffer: harvesters.core.Buffer
-        component = buffer.payload.components[0]
-        width = component.width
-        height = component.height
-        print(component.data.sum())
-        data = component.data.reshape(1024, 2560)
+        frame = cap.getFrame()  # SickFrame {组件名: 图像}, Buffer 已归还给相机
+        data = frame.range if frame.range is not None else next(iter(frame.values()))
+        height, width = data.shape[:2]
+        print(data.sum())
         data_normalized = data.astype(np.float32) / np.max(data)
         canvas = app.Canvas(keys='interactive', size=(800, 600), title='3D Image Visualization')
 
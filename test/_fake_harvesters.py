@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+测试用的 harvesters / genicam 替身, 只实现 SICK 相关代码用到的属性
+"""
+
+
+class Node:
+    """
+    GenApi 节点, node.node.name 为节点名, 与 genicam 的节点包装相同
+    """
+
+    def __init__(self, value, name=None):
+        self.value = value
+        self.name = name
+
+    @property
+    def node(self):
+        return self
+
+
+class Entry:
+    """
+    枚举节点的取值
+    """
+
+    def __init__(self, symbolic, available=True):
+        self.symbolic = symbolic
+        self.available = available
+
+
+def isAvailable(entry):
+    return entry.available
+
+
+class _ComponentEnable:
+    def __init__(self, nodeMap):
+        self._nodeMap = nodeMap
+
+    @property
+    def value(self):
+        return self._nodeMap.components[self._nodeMap.ComponentSelector.value]
+
+    @value.setter
+    def value(self, value):
+        self._nodeMap.components[self._nodeMap.ComponentSelector.value] = value
+
+
+class NodeMap:
+    """
+    相机 NodeMap, 每个关键字参数为一个节点
+    ChunkScan3dCoordinateScale 随 ChunkScan3dCoordinateSelector 变化, 设置了 ComponentSelector 时
+    ComponentEnable 随 ComponentSelector 变化
+    Args:
+        components: {组件名: 是否启用}, 不为 None 时创建 ComponentSelector 和 ComponentEnable
+    """
+
+    def __init__(self, components=None, **values):
+        self.coordinateScales = {"CoordinateC": 0.25}
+        for name, value in values.items():
+            setattr(self, name, Node(value, name))
+        self.components = components
+        if components is not None:
+            self.ComponentSelector = Node(next(iter(components)), "ComponentSelector")
+            self.ComponentSelector.entries = [Entry(name) for name in components]
+            self.ComponentEnable = _ComponentEnable(self)
+
+    @property
+    def ChunkScan3dCoordinateScale(self):
+        return Node(self.coordinateScales.get(self.ChunkScan3dCoordinateSelector.value, 1.0))
+
+    @property
+    def nodes(self):
+        return [value for value in vars(self).values() if isinstance(value, Node)]
+
+
+class Component:
+    def __init__(self, data_format, data, width, height, delivered_image_height=None):
+        self.data_format = data_format
+        self.data = data
+        self.width = width
+        self.height = height
+        self.delivered_image_height = height if delivered_image_height is None else delivered_image_height
+
+
+class Payload:
+    def __init__(self, components):
+        self.components = components
+
+
+class Module:
+    def __init__(self, frame_id):
+        self.frame_id = frame_id
+
+
+class Buffer:
+    """
+    harvesters Buffer, queue() 归还时减少 pool.outstanding
+    """
+
+    def __init__(self, frameId, components, pool=None):
+        self.module = Module(frameId)
+        self.timestamp_ns = frameId * 1000
+        self.payload = Payload(components)
+        self.pool = pool
+        self.queued = False
+
+    def queue(self):
+        assert not self.queued, "Buffer 重复归还"
+        self.queued = True
+        if self.pool is not None:
+            self.pool.outstanding -= 1
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from BKVisionCamera.base.property.acquisition import AcquisitionConfig, GRAB_STRATEGY_FIFO, GRAB_STRATEGY_LATEST
+
+
+class TestAcquisitionConfig:
+    def test_default(self):
+        acquisition = AcquisitionConfig()
+        assert acquisition.bufferCount is None
+        assert acquisition.strategy == GRAB_STRATEGY_FIFO
+        assert acquisition.outputQueueSize == 1
+
+    def test_yaml_block(self):
+        acquisition = AcquisitionConfig({"bufferCount": 6, "strategy": "latest", "outputQueueSize": 2})
+        assert acquisition.bufferCount == 6
+        assert acquisition.strategy == GRAB_STRATEGY_LATEST
+        assert acquisition.outputQueueSize == 2
+
+    @pytest.mark.parametrize("config", [
+        {"strategy": "newest"},
+        {"outputQueueSize": 0},
+        {"bufferCount": 2, "outputQueueSize": 4},
+    ])
+    def test_invalid(self, config):
+        with pytest.raises(ValueError):
+            AcquisitionConfig(config)
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_acquisition.py"])
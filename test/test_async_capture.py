@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+
+import pytest
+
+from BKVisionCamera.base.property.camera_sdk import CameraSdkInterface, GrabTimeoutError
+from BKVisionCamera.base.property.capture import CaptureModel
+
+
+class _Property:
+    name = "fake"
+    ringSize = 4
+    dropPolicy = "block"
+
+
+class _FakeSdk(CameraSdkInterface):
+    def __init__(self):
+        super().__init__(camera_info=object())
+        self.count = 0
+        self.isGrabbing = True
+
+    def getFrame(self):
+        self.count += 1
+        if self.count % 2 == 0:
+            raise GrabTimeoutError("采集图像超时")
+        if self.count >= 9:
+            self.isGrabbing = False
+        return self.count
+
+    init = release = saveConfig = loadConfig = lambda *args: None
+    createCamera = getDeviceList = staticmethod(lambda *args: [])
+
+
+class _FakeCapture(CaptureModel):
+    opened = False
+
+    def load(self):
+        return _FakeSdk()
+
+    def init(self):
+        ...
+
+    def open(self):
+        self.opened = True
+
+    def release(self):
+        self.opened = False
+        self.stopGrabThread()
+
+    def grab(self, timeout=None):
+        return self.sdk.getFrame()
+
+    def __enter__(self):
+        self.init()
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+async def _collect(frames, count=None):
+    res = []
+    async for frame in frames:
+        res.append(frame)
+        if len(res) == count:
+            break
+    return res
+
+
+class _SlowSdk(_FakeSdk):
+    """
+    getFrame 耗时 20ms, 记录 release() 之后是否仍在取流
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.released = False
+        self.usedAfterRelease = False
+
+    def getFrame(self):
+        self.active += 1
+        try:
+            time.sleep(0.02)
+            self.usedAfterRelease |= self.released
+            self.count += 1
+            return self.count
+        finally:
+            self.active -= 1
+
+
+class _SlowCapture(_FakeCapture):
+    def load(self):
+        return _SlowSdk()
+
+    def release(self):
+        super().release()
+        assert self.sdk.active == 0
+        self.sdk.released = True
+
+
+class TestAsyncCapture:
+    def test_async_frames(self):
+        cap = _FakeCapture(_Property())
+        assert asyncio.run(_collect(cap.frames())) == [1, 3, 5, 7, 9]
+
+    def test_async_frames_thread(self):
+        cap = _FakeCapture(_Property())
+        cap.startGrabThread()
+        assert asyncio.run(_collect(cap.frames(timeout=1), 5)) == [1, 3, 5, 7, 9]
+        cap.release()
+
+    def test_break_then_release(self):
+        async def run():
+            cap = _SlowCapture(_Property())
+            async for frame in cap.frames(timeout=0.1):
+                break
+            # 生成器还未关闭, release() 也要等取流线程退出
+            cap.release()
+            await asyncio.sleep(0.05)
+            return cap
+
+        cap = asyncio.run(run())
+        assert not cap.sdk.usedAfterRelease
+        assert not cap.asyncGrabThreads
+
+    def test_aclose_joins_thread(self):
+        async def run():
+            cap = _SlowCapture(_Property())
+            frames = cap.frames(timeout=0.1).__aiter__()
+            await frames.__anext__()
+            thread = next(iter(cap.asyncGrabThreads))
+            await frames.aclose()
+            return cap, thread
+
+        cap, thread = asyncio.run(run())
+        assert not thread.is_alive()
+        assert not cap.asyncGrabThreads and cap.sdk.active == 0
+
+    def test_async_with(self):
+        async def run():
+            async with _FakeCapture(_Property()) as cap:
+                assert cap.opened
+                return cap
+
+        assert not asyncio.run(run()).opened
+
+    def test_open_concurrently(self):
+        async def run():
+            caps = [_FakeCapture(_Property()) for _ in range(3)]
+            await asyncio.gather(*[cap.openAsync() for cap in caps])
+            return caps
+
+        assert all(cap.opened for cap in asyncio.run(run()))
+
+    def test_sync_frames_unchanged(self):
+        frames = _FakeCapture(_Property()).frames()
+        assert next(frames) == 1
+        assert list(frames) == [3, 5, 7, 9]
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_async_capture.py"])
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import gc
+import threading
+
+import numpy as np
+import pytest
+
+from BKVisionCamera.utils.buffer_pool import BufferPool, PooledArray
+
+
+class TestBufferPool:
+    def test_wrap_and_release(self):
+        pool = BufferPool(16, 2)
+        buffer = pool.acquire()
+        frame = pool.wrap(buffer, (4, 4))
+        assert isinstance(frame, PooledArray)
+        assert frame.shape == (4, 4)
+        assert pool.available == 1
+        frame.release()
+        assert pool.available == 2
+        # 重复释放无副作用
+        frame.release()
+        assert pool.available == 2
+
+    def test_release_on_gc(self):
+        pool = BufferPool(16, 1)
+        frame = pool.wrap(pool.acquire(), (2, 8))
+        view = frame[0]
+        del frame
+        gc.collect()
+        # 派生视图仍在使用, 内存不能归还
+        assert pool.available == 0
+        del view
+        gc.collect()
+        assert pool.available == 1
+
+    def test_exhausted(self):
+        pool = BufferPool(8, 2)
+        frames = [pool.wrap(pool.acquire(), (8,)) for _ in range(2)]
+        # 不追加分配, 用完时返回 None 并计数
+        assert pool.acquire() is None
+        assert pool.allocated == 2 and pool.exhausted == 1
+        frames[0].release()
+        assert pool.acquire() is not None
+
+    def test_wait_for_release(self):
+        pool = BufferPool(8, 1)
+        frame = pool.wrap(pool.acquire(), (8,))
+        threading.Timer(0.05, frame.release).start()
+        assert pool.acquire(timeout=5) is not None
+        assert pool.exhausted == 0
+        assert pool.acquire(timeout=0.01) is None
+        assert pool.exhausted == 1
+
+    def test_grow_when_exhausted(self):
+        pool = BufferPool(8, 1, grow=True)
+        frames = [pool.wrap(pool.acquire(), (8,)) for _ in range(3)]
+        assert pool.allocated == 3
+        for frame in frames:
+            frame.release()
+        assert pool.available == 3
+
+    def test_view_shares_memory(self):
+        pool = BufferPool(4, 1)
+        buffer = pool.acquire()
+        buffer[2] = 7
+        frame = pool.wrap(buffer, (4,), dtype=np.uint8)
+        assert frame[2] == 7
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_buffer_pool.py"])
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from BKVisionCamera.base.property.camera_config import planCameraConfig, commitCameraConfig, readbackMatches, \
+    slowestNodes
+
+
+class FakeNodeMap:
+    def __init__(self, nodes, maxFrameRate=None):
+        self.nodes = dict(nodes)
+        self.maxFrameRate = maxFrameRate
+        self.writes = []
+
+    def hasFeature(self, name):
+        return name in self.nodes
+
+    def getFeature(self, name):
+        return self.nodes[name]
+
+    def setFeature(self, name, value=None):
+        if name == "ExposureTime" and self.nodes.get("ExposureAuto") != "Off":
+            raise Exception("设置ExposureTime失败")
+        self.writes.append(name)
+        if name == "AcquisitionFrameRate" and self.maxFrameRate is not None:
+            value = min(value, self.maxFrameRate)
+        self.nodes[name] = value
+
+
+class TestCameraConfig:
+    def test_plan_order(self):
+        steps, skipped = planCameraConfig({
+            "triggerMode": 1,
+            "frameRate": 30,
+            "triggerSource": "Line0",
+            "exposureTime": 1000,
+            "triggerSoftware": 0,
+        })
+        assert [node for node, _, _ in steps] == [
+            "ExposureAuto", "AcquisitionFrameRateEnable", "ExposureTime", "AcquisitionFrameRate",
+            "TriggerSource", "TriggerMode",
+        ]
+        # 依赖的开关节点没有键名
+        assert steps[0] == ("ExposureAuto", "Off", None)
+        assert "triggerSoftware" in skipped
+
+    def test_plan_explicit_wins(self):
+        steps, skipped = planCameraConfig({"ExposureAuto": "Continuous", "exposureTime": 1000, "gain": None,
+                                           "foo": 1}, overrides={"exposureTime": "ExposureTimeAbs"})
+        assert steps == [("ExposureAuto", "Continuous", "ExposureAuto"),
+                         ("ExposureTimeAbs", 1000, "exposureTime")]
+        assert skipped == {"foo": "未知的配置项"}
+
+    def test_commit_verify(self):
+        camera = FakeNodeMap({"ExposureAuto": "Continuous", "ExposureTime": 5000.0, "AcquisitionFrameRate": 10.0,
+                              "AcquisitionFrameRateEnable": False}, maxFrameRate=25.0)
+        report = commitCameraConfig({"exposureTime": 1000, "frameRate": 30, "gamma": 1},
+                                    camera.setFeature, camera.getFeature, camera.hasFeature)
+        assert camera.writes == ["ExposureAuto", "AcquisitionFrameRateEnable", "ExposureTime",
+                                 "AcquisitionFrameRate"]
+        assert report["failed"] == []
+        # 帧率被曝光限制, 读回不一致
+        assert report["mismatched"] == ["AcquisitionFrameRate"]
+        assert report["skipped"] == {"gamma": "相机没有节点 Gamma"}
+        exposure = [result for result in report["nodes"] if result["node"] == "ExposureTime"][0]
+        assert exposure["verified"] is True and exposure["key"] == "exposureTime"
+        assert len(slowestNodes(report, 2)) == 2
+
+    def test_commit_failure_continues(self):
+        camera = FakeNodeMap({"ExposureTime": 5000.0, "Gain": 0.0})
+        report = commitCameraConfig({"exposureTime": 1000, "gain": 5}, camera.setFeature, camera.getFeature,
+                                    camera.hasFeature)
+        assert report["failed"] == ["ExposureTime"]
+        assert camera.nodes["Gain"] == 5
+
+    def test_readback_matches(self):
+        assert readbackMatches(1000, 1000.4)
+        assert readbackMatches(30, 25.0) is False
+        assert readbackMatches(1, True)
+        assert readbackMatches("On", "On")
+        # 海康枚举按符号写入, 读回整数, 无法比较
+        assert readbackMatches("On", 1) is None
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_camera_config.py"])
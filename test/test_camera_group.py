@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from BKVisionCamera.base.camera_group import CameraGroup
+from BKVisionCamera.base.property.camera_sdk import GrabTimeoutError
+from BKVisionCamera.base.property.capture import CaptureModel
+from BKVisionCamera.base.property.frame_info import FrameInfo
+from BKVisionCamera.utils.buffer_pool import PooledArray
+
+
+class _Property:
+    name = "fake"
+    multiThread = False
+
+
+class _FakeSdk:
+    camera_info = None
+
+    def __init__(self, delay=0, skip=0):
+        self.delay = delay
+        self.skip = skip
+        self.frameNum = 0
+        self.pending = []
+        self.triggerSource = None
+
+    def setTriggerSource(self, source):
+        self.triggerSource = source
+
+    def triggerSoftware(self):
+        self.frameNum += 1 + self.skip
+        self.pending.append(self.frameNum)
+
+    def getFrame(self, timeout=1000):
+        if not self.pending:
+            raise GrabTimeoutError("采集图像超时")
+        if timeout > 0 and self.delay:
+            # 模拟迟到, 本次超时, 图像留在缓存中
+            self.delay -= 1
+            raise GrabTimeoutError("采集图像超时")
+        frame = np.zeros((2, 2), np.uint8).view(PooledArray)
+        frameNum = self.pending.pop(0)
+        frame.info = FrameInfo(frameNum, hostTimestamp=1000 + frameNum)
+        return frame
+
+
+class _FakeCapture(CaptureModel):
+    def __init__(self, sdk):
+        self._sdk = sdk
+        super().__init__(_Property())
+
+    def load(self):
+        return self._sdk
+
+    def open(self):
+        ...
+
+    def release(self):
+        ...
+
+    def grab(self, timeout=None):
+        # 与海康 大华相同, 超时单位换算为 ms, 超时返回 None
+        try:
+            return self.sdk.getFrame(1000 if timeout is None else int(timeout * 1000))
+        except GrabTimeoutError:
+            return None
+
+
+class TestCameraGroup:
+    def test_grab(self):
+        sdks = [_FakeSdk() for _ in range(4)]
+        with CameraGroup([_FakeCapture(sdk) for sdk in sdks], timeout=0.1) as group:
+            assert all(sdk.triggerSource == "Software" for sdk in sdks)
+            for i in range(3):
+                frameSet = group.grab()
+                assert frameSet.complete
+                assert frameSet.frameNums == [i + 1] * 4
+                assert frameSet.index == i
+
+    def test_late(self):
+        sdks = [_FakeSdk(), _FakeSdk(delay=1)]
+        with CameraGroup([_FakeCapture(sdk) for sdk in sdks], timeout=0.1) as group:
+            frameSet = group.grab()
+            assert frameSet.late == [1]
+            assert frameSet[1] is None
+            # 迟到的帧被丢弃, 下一组不错位也不误报丢帧
+            frameSet = group.grab()
+            assert frameSet.complete
+            assert frameSet.frameNums == [2, 2]
+
+    def test_dropped(self):
+        sdks = [_FakeSdk(), _FakeSdk(skip=1)]
+        with CameraGroup([_FakeCapture(sdk) for sdk in sdks], timeout=0.1) as group:
+            assert group.grab().complete
+            assert group.grab().dropped == [1]
+
+    def test_stats_through_capture(self):
+        sdks = [_FakeSdk(), _FakeSdk(delay=1)]
+        members = [_FakeCapture(sdk) for sdk in sdks]
+        with CameraGroup(members, timeout=0.1) as group:
+            group.grab()
+            group.grab()
+        # 迟到的一帧在下一组 flush 时取回, 每台相机都计入 2 帧, flush 没有取到图像不计超时
+        assert [member.stats.frames for member in members] == [2, 2]
+        assert [member.stats.timeouts for member in members] == [0, 1]
+
+    def test_error_propagates(self):
+        sdk = _FakeSdk()
+        sdk.getFrame = lambda timeout=1000: (_ for _ in ()).throw(Exception("断线"))
+        with CameraGroup([_FakeCapture(sdk)], timeout=0.1) as group:
+            with pytest.raises(Exception, match="断线"):
+                group.grab()
+
+    def test_skew(self):
+        group = CameraGroup([], maxSkew=5)
+        frames = []
+        for t in (1000, 1002, 1020):
+            frame = np.zeros(1).view(PooledArray)
+            frame.info = FrameInfo(1, hostTimestamp=t)
+            frames.append(frame)
+        group._lastFrameNums = [None] * 3
+        frameSet = group.check(frames)
+        assert frameSet.late == [2]
+        assert frameSet.skew == 20
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_camera_group.py"])
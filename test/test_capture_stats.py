@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from BKVisionCamera.base.property.capture_stats import CaptureStats
+from BKVisionCamera.base.property.frame_info import FrameInfo
+
+
+class _Frame:
+    def __init__(self, frameNum, lostPacket=0, age=0.0):
+        self.info = FrameInfo(frameNum, lostPacket=lostPacket, recvTime=time.perf_counter() - age)
+
+
+class TestCaptureStats:
+    def test_gaps(self):
+        stats = CaptureStats()
+        for frameNum in (1, 2, 5, 6, 9):
+            stats.record(_Frame(frameNum))
+        stats.record(None)
+        res = stats.snapshot()
+        assert res["frames"] == 5
+        assert res["timeouts"] == 1
+        assert res["gaps"] == 2
+        assert res["missing"] == 4
+
+    def test_latency(self):
+        stats = CaptureStats(samples=100)
+        for i in range(100):
+            stats.record(_Frame(i, age=i / 1000))
+        latency = stats.snapshot()["latency"]
+        assert 49 <= latency["p50"] < 60
+        assert latency["p99"] <= latency["max"]
+        assert latency["max"] >= 99
+
+    def test_fps_window(self):
+        stats = CaptureStats(window=0.05)
+        for i in range(10):
+            stats.record(_Frame(i))
+        assert stats.snapshot()["fps"] > 0
+        time.sleep(0.06)
+        assert stats.snapshot()["fps"] == 0
+
+    def test_lost_packets_and_reset(self):
+        stats = CaptureStats()
+        stats.record(_Frame(1, lostPacket=3))
+        stats.record(object())
+        assert stats.snapshot()["lostPackets"] == 3
+        assert stats.snapshot()["frames"] == 2
+        stats.reset()
+        assert stats.snapshot()["frames"] == 0
+        assert stats.snapshot()["latency"] == {}
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_capture_stats.py"])
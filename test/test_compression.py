@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from BKVisionCamera.d3cancamera.SICK.compression import encode, decode, parseCodec, benchmark, BENCHMARK_CODECS, \
+    DEFAULT_COMPRESSION
+from BKVisionCamera.d3cancamera.SICK.recording import Writer, Reader, AsyncWriter, writeFrames
+
+
+def _depth(frameId=0, shape=(48, 64)):
+    # 平滑的深度图, 相邻像素差值很小
+    rng = np.random.default_rng(frameId)
+    return (np.cumsum(rng.integers(-3, 4, shape), axis=1) + 5000).astype(np.uint16)
+
+
+def _frame(frameId):
+    depth = _depth(frameId)
+    return {"frame_id": frameId, "numComponents": 2, "maps": [
+        {"data_format": "Coord3D_C16", "width": 64, "height": 48, "delivered_image_height": 48, "data": depth},
+        {"data_format": "Mono8", "width": 64, "height": 48, "delivered_image_height": 48,
+         "data": np.full((48, 64), frameId, dtype=np.uint8)},
+    ]}
+
+
+class TestCompression:
+    @pytest.mark.parametrize("spec", BENCHMARK_CODECS + ["none", "lzma", "delta:zlib", "bitshuffle:none"])
+    def test_round_trip(self, spec):
+        for array in [_depth(), _depth().astype(np.int16) - 5000, np.array([65535, 0, 65535], dtype=np.uint16),
+                      np.arange(13, dtype=np.uint8), _depth().astype(np.uint32)]:
+            encoded = encode(array, spec)
+            decoded = decode(encoded.payload, encoded.dtype, encoded.shape, spec)
+            assert decoded.dtype == array.dtype and decoded.shape == array.shape
+            np.testing.assert_array_equal(decoded, array)
+
+    @pytest.mark.parametrize("spec", BENCHMARK_CODECS + ["none", "lzma", "bz2"])
+    def test_empty(self, spec):
+        array = np.zeros((0, 4), dtype=np.uint16)
+        encoded = encode(array, spec)
+        decoded = decode(encoded.payload, encoded.dtype, encoded.shape, spec)
+        assert decoded.dtype == array.dtype and decoded.shape == (0, 4)
+
+    def test_depth_ratio(self):
+        depth = _depth()
+        plain = len(encode(depth, "zlib:1").payload)
+        assert len(encode(depth, "delta+shuffle:zlib:1").payload) < plain
+        assert len(encode(depth, "delta+bitshuffle:zlib:1").payload) < plain
+
+    def test_parse(self):
+        assert parseCodec("delta+shuffle:zlib:1") == (("delta", "shuffle"), "zlib", 1)
+        assert parseCodec("lzma") == ((), "lzma", None)
+        for spec in ["delta+shuffle", "shuffle:zstd", "rle:zlib", "shuffle+delta:zlib"]:
+            with pytest.raises(ValueError):
+                parseCodec(spec)
+
+    def test_benchmark(self):
+        res = benchmark([_frame(i) for i in range(2)], codecs=["zlib:1", "delta+shuffle:zlib:1"])
+        assert set(res) == {"Coord3D_C16", "Mono8"}
+        item = res["Coord3D_C16"]["delta+shuffle:zlib:1"]
+        assert item["ratio"] > 1 and item["encodeMBps"] > 0 and item["decodeMBps"] > 0
+
+
+class TestCompressedRecording:
+    def test_writer(self, tmp_path):
+        path = str(tmp_path / "a.rec")
+        with Writer("test", filename=path, compression=DEFAULT_COMPRESSION) as writer:
+            for frameId in range(3):
+                writer.storeFrame(_frame(frameId))
+        assert writer.rawBytes > writer.bytesWritten
+        with Reader(path) as reader:
+            assert reader.compression == DEFAULT_COMPRESSION
+            frame = reader[2]
+            np.testing.assert_array_equal(frame["maps"][0]["data"], _depth(2))
+            # 未压缩的组件仍然是 memmap 视图
+            assert isinstance(frame["maps"][1]["data"], np.memmap)
+            assert int(frame["maps"][1]["data"][0, 0]) == 2
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    @pytest.mark.parametrize("spec", ["none", "zlib", "lzma", "bz2", "delta+shuffle:bz2:9", "bitshuffle:lzma:0"])
+    def test_compressors_round_trip(self, tmp_path, spec, mmap):
+        path = str(tmp_path / "a.rec")
+        frames = [_frame(frameId) for frameId in range(2)]
+        frames[1]["maps"].append({"data_format": "Mono16", "width": 4, "height": 0, "delivered_image_height": 0,
+                                  "data": np.zeros((0, 4), dtype=np.uint16)})
+        writeFrames(frames, path, compression=spec)
+        with Reader(path, mmap=mmap) as reader:
+            for frameId, frame in enumerate(reader):
+                for expected, item in zip(frames[frameId]["maps"], frame["maps"]):
+                    assert item["data"].dtype == expected["data"].dtype
+                    np.testing.assert_array_equal(item["data"], expected["data"])
+
+    @pytest.mark.parametrize("compression", ["delta+shuffle:lzma:0", DEFAULT_COMPRESSION])
+    def test_async_writer(self, tmp_path, compression):
+        path = str(tmp_path / "a.rec")
+        # DEFAULT_COMPRESSION 不压缩 Mono8, 未压缩的组件要等写盘后才归还内存池
+        with AsyncWriter(Writer("test", filename=path, compression=compression), queueSize=2,
+                         workers=4) as writer:
+            for frameId in range(8):
+                assert writer.storeFrame(_frame(frameId))
+        stats = writer.getStats()
+        assert stats["written"] == 8 and stats["rawBytes"] > stats["bytesWritten"]
+        with Reader(path, mmap=False) as reader:
+            # 并行压缩后仍按入队顺序写入
+            assert [f["frame_id"] for f in reader] == list(range(8))
+            np.testing.assert_array_equal(reader[5]["maps"][0]["data"], _depth(5))
+            np.testing.assert_array_equal(reader[5]["maps"][1]["data"], np.full((48, 64), 5, dtype=np.uint8))
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_compression.py"])
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from BKVisionCamera.base.property.camera_info import CameraInfo
+from BKVisionCamera.base.property.camera_sdk import CameraSdkInterface
+from BKVisionCamera.base.property.discovery import DiscoveryCache, discoveryCache, discoverAll, deviceKey
+
+
+def cameraInfo(ip, mac="", sn=""):
+    info = CameraInfo(None)
+    info.ip = ip
+    info.mac = mac
+    info.sn = sn
+    return info
+
+
+class FakeSdk(CameraSdkInterface):
+    devices = []
+    enumCount = 0
+
+    @staticmethod
+    def getDeviceList():
+        FakeSdk.enumCount += 1
+        return list(FakeSdk.devices)
+
+    @staticmethod
+    def createCamera(cameraInfo):
+        pass
+
+    def init(self):
+        pass
+
+    def saveConfig(self, config):
+        pass
+
+    def loadConfig(self, config):
+        pass
+
+    def release(self):
+        pass
+
+    def getFrame(self):
+        pass
+
+
+class Property:
+    selectType = "ip"
+
+    def __init__(self, ip):
+        self.ip = ip
+
+
+class TestDiscoveryCache:
+    def test_ttl(self):
+        cache = DiscoveryCache(ttl=0.05)
+        calls = []
+        enumerate_ = lambda: calls.append(1) or [len(calls)]
+        assert cache.get("sdk", enumerate_) == [1]
+        assert cache.get("sdk", enumerate_) == [1]
+        time.sleep(0.06)
+        assert cache.get("sdk", enumerate_) == [2]
+        assert cache.get("sdk", enumerate_, refresh=True) == [3]
+        cache.invalidate("sdk")
+        assert cache.get("sdk", enumerate_) == [4]
+
+    def test_concurrent_enumerate_once(self):
+        cache = DiscoveryCache()
+        calls = []
+
+        def enumerate_():
+            calls.append(1)
+            time.sleep(0.05)
+            return ["cam"]
+
+        threads = [threading.Thread(target=cache.get, args=("sdk", enumerate_)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+
+
+class TestSdkDiscover:
+    def setup_method(self):
+        discoveryCache.invalidate()
+        FakeSdk.devices = [cameraInfo("192.168.1.10"), cameraInfo("192.168.1.11")]
+        FakeSdk.enumCount = 0
+
+    def test_shared_between_instances(self):
+        first = FakeSdk(Property("192.168.1.10"))
+        second = FakeSdk(Property("192.168.1.11"))
+        assert first.camera_info.ip == "192.168.1.10"
+        assert second.camera_info.ip == "192.168.1.11"
+        assert FakeSdk.enumCount == 1
+
+    def test_refresh_when_missing(self):
+        FakeSdk(Property("192.168.1.10"))
+        FakeSdk.devices.append(cameraInfo("192.168.1.12"))
+        assert FakeSdk(Property("192.168.1.12")).camera_info.ip == "192.168.1.12"
+        assert FakeSdk.enumCount == 2
+
+    def test_not_found(self):
+        with pytest.raises(ValueError):
+            FakeSdk(Property("192.168.1.99"))
+
+
+class TestDiscoverAll:
+    def test_device_key(self):
+        assert deviceKey(cameraInfo("192.168.1.10", mac="00-1c-aa:bb")) == "001CAABB"
+        assert deviceKey(cameraInfo("192.168.1.10", mac="00:00:00:00", sn="SN1")) == "SN1"
+        assert deviceKey(cameraInfo("192.168.1.10")) == "192.168.1.10"
+
+    def test_parallel(self):
+        def slow(info):
+            def enumerate_():
+                time.sleep(0.2)
+                return [info]
+            return enumerate_
+
+        start = time.perf_counter()
+        devices, errors = discoverAll({"hikvision": slow(cameraInfo("192.168.1.10", sn="A")),
+                                       "dahua": slow(cameraInfo("192.168.1.11", sn="B"))})
+        assert time.perf_counter() - start < 0.35
+        assert errors == {}
+        assert devices["A"].driver == "hikvision"
+        assert devices["B"].driver == "dahua"
+
+    def test_deadline_and_errors(self):
+        def hang():
+            time.sleep(1)
+            return [cameraInfo("192.168.1.12")]
+
+        def broken():
+            raise Exception("SDK 未安装")
+
+        devices, errors = discoverAll({"hikvision": lambda: [cameraInfo("192.168.1.10", sn="A")],
+                                       "dahua": lambda: [cameraInfo("192.168.1.10", sn="A")],
+                                       "sick": hang, "other": broken}, timeout=0.2)
+        assert list(devices) == ["A"]
+        assert devices["A"].driver == "hikvision"
+        assert errors == {"sick": "枚举超时", "other": "SDK 未安装"}
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_discovery.py"])
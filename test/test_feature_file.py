@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from BKVisionCamera.utils.feature_file import parseFeatureFile, diffFeatures, loadFeatureFile, parseValue, toBool
+
+TARGET = """# {05D8C294-F295-4dfb-9D01-096BD04049F4}
+# GenApi persistence file (version 3.0.0)
+Width\t3072
+ExposureTime\t5000.0000
+TriggerSelector\tFrameBurstStart
+TriggerMode\tOn
+TriggerSource\tLine0
+TriggerSelector\tAcquisitionStart
+TriggerMode\tOff
+DeviceUserID\t
+"""
+
+LIVE = TARGET.replace("ExposureTime\t5000.0000", "ExposureTime\t1000.0000") \
+    .replace("TriggerMode\tOn", "TriggerMode\tOff")
+
+
+class TestFeatureFile:
+    def test_parse(self, tmp_path):
+        path = tmp_path / "target.ini"
+        path.write_text(TARGET, encoding="utf-8")
+        features = parseFeatureFile(path)
+        assert features[0] == ("Width", "3072")
+        assert features[-1] == ("DeviceUserID", "")
+        assert len(features) == 8
+
+    def test_diff_with_selector(self, tmp_path):
+        (tmp_path / "target.ini").write_text(TARGET, encoding="utf-8")
+        (tmp_path / "live.ini").write_text(LIVE, encoding="utf-8")
+        writes = diffFeatures(parseFeatureFile(tmp_path / "target.ini"), parseFeatureFile(tmp_path / "live.ini"))
+        assert writes == [
+            ("ExposureTime", "5000.0000"),
+            ("TriggerSelector", "FrameBurstStart"),
+            ("TriggerMode", "On"),
+            # 最后恢复快照中的 Selector
+            ("TriggerSelector", "AcquisitionStart"),
+        ]
+
+    def test_load_diff(self, tmp_path):
+        path = tmp_path / "target.ini"
+        path.write_text(TARGET, encoding="utf-8")
+        written = []
+
+        def saveLive(livePath):
+            with open(livePath, "w", encoding="utf-8") as f:
+                f.write(TARGET)
+
+        report = loadFeatureFile(path, saveLive, lambda name, value: written.append(name), None)
+        assert report["mode"] == "diff"
+        assert report["written"] == 0
+        assert written == []
+
+    def test_load_full_fallback(self, tmp_path):
+        path = tmp_path / "target.ini"
+        path.write_text(TARGET, encoding="utf-8")
+        loaded = []
+
+        def saveLive(livePath):
+            raise Exception("保存失败")
+
+        report = loadFeatureFile(path, saveLive, None, loaded.append)
+        assert report["mode"] == "full"
+        assert loaded == [path]
+
+    @pytest.mark.parametrize("text, value", [("5", 5), ("1.5", 1.5), ("True", True), ("Range", "Range")])
+    def test_parse_value(self, text, value):
+        assert parseValue(text) == value
+
+    def test_to_bool(self):
+        assert toBool("1") and toBool("True") and not toBool("0") and not toBool("False")
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_feature_file.py"])
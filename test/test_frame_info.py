@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from BKVisionCamera.base.property.frame_info import FrameInfo
+from BKVisionCamera.utils.buffer_pool import BufferPool
+
+
+class TestFrameInfo:
+    def test_slots(self):
+        info = FrameInfo(3, devTimestamp=1 << 40, hostTimestamp=1000)
+        assert not hasattr(info, "__dict__")
+        with pytest.raises(AttributeError):
+            info.other = 1
+        assert info.devTimestamp == 1 << 40
+        assert info.lostPacket == 0
+
+    def test_follow_views(self):
+        pool = BufferPool(16, 1)
+        frame = pool.wrap(pool.acquire(), (4, 4))
+        frame.info = FrameInfo(7)
+        assert frame[1:].info is frame.info
+        assert np.asarray(frame).shape == (4, 4)
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_frame_info.py"])
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from BKVisionCamera.base.property.frame_lease import FrameLease, LeasedFrame
+
+
+class _FakeLease(FrameLease):
+    def __init__(self, safe=False):
+        super().__init__(safe)
+        self.buffer = np.arange(12, dtype=np.uint8)
+        self.freed = 0
+
+    def _acquire_(self):
+        return self.buffer.reshape(3, 4)
+
+    def _free_(self):
+        self.freed += 1
+
+
+class TestFrameLease:
+    def test_free_on_exit(self):
+        lease = _FakeLease()
+        with lease as frame:
+            assert frame.shape == (3, 4)
+            assert lease.frame is frame
+        assert lease.freed == 1
+        assert lease.released
+
+    def test_copy(self):
+        lease = _FakeLease()
+        with lease:
+            copy = lease.copy()
+        assert copy.base is None
+        assert copy[2, 3] == 11
+
+    def test_safe_not_escaped(self):
+        lease = _FakeLease(safe=True)
+        with lease:
+            assert int(lease.frame.sum()) == 66
+        assert lease.freed == 1
+        assert not lease.copied
+
+    def test_safe_escaped(self):
+        lease = _FakeLease(safe=True)
+        with lease as frame:
+            assert isinstance(frame, LeasedFrame)
+            assert np.shares_memory(frame.array, lease.buffer)
+            assert int((frame + 1)[2, 3]) == 12
+        # 退出时立即归还缓存, frame 改为指向拷贝
+        assert lease.freed == 1 and lease.released and lease.copied
+        assert not np.shares_memory(frame.array, lease.buffer)
+        lease.buffer[:] = 0
+        assert frame.shape == (3, 4) and int(frame[2, 3]) == 11
+        assert int(np.asarray(frame).sum()) == 66
+
+    def test_safe_free_on_error(self):
+        lease = _FakeLease(safe=True)
+        with pytest.raises(ValueError):
+            with lease as frame:
+                raise ValueError()
+        assert lease.freed == 1
+        assert int(frame[0, 1]) == 1
+
+    def test_acquire_twice(self):
+        lease = _FakeLease()
+        with lease:
+            with pytest.raises(Exception):
+                lease.acquire()
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_frame_lease.py"])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from BKVisionCamera.base.property.frame_ring import FrameRing, GrabThread
+
+
+class _Property:
+    name = "fake"
+
+
+class _FakeCapture:
+    property = _Property()
+
+    def __init__(self):
+        self.count = 0
+
+    def grab(self):
+        self.count += 1
+        return self.count
+
+
+class TestFrameRing:
+    def test_drop_oldest(self):
+        ring = FrameRing(3, "oldest")
+        for i in range(5):
+            assert ring.put(i)
+        assert ring.dropped == 2
+        assert [ring.get(0) for _ in range(3)] == [2, 3, 4]
+        assert ring.get(0) is None
+
+    def test_drop_newest(self):
+        ring = FrameRing(2, "newest")
+        assert ring.put(0)
+        assert ring.put(1)
+        assert not ring.put(2)
+        assert ring.dropped == 1
+        assert ring.get(0) == 0
+
+    def test_block_timeout(self):
+        ring = FrameRing(1, "block")
+        assert ring.put(0)
+        assert not ring.put(1, timeout=0.01)
+        threading.Timer(0.05, ring.get).start()
+        assert ring.put(2, timeout=1)
+        assert ring.get(0) == 2
+
+    def test_latest(self):
+        ring = FrameRing(4)
+        for i in range(4):
+            ring.put(i)
+        assert ring.latest(0) == 3
+        assert ring.dropped == 3
+        assert len(ring) == 0
+
+    @pytest.mark.parametrize("policy, expected", [("oldest", 0), ("newest", None)])
+    def test_discard(self, policy, expected):
+        ring = FrameRing(4, policy)
+        ring.put(0)
+        ring.put(1)
+        assert ring.discard() == expected
+        assert ring.dropped == 1
+
+    def test_invalid_policy(self):
+        with pytest.raises(ValueError):
+            FrameRing(4, "random")
+
+    def test_grab_thread(self):
+        ring = FrameRing(4, "block")
+        thread = GrabThread(_FakeCapture(), ring)
+        thread.start()
+        frames = [ring.get(1) for _ in range(10)]
+        thread.stop(1)
+        assert frames == list(range(1, 11))
+        assert not thread.is_alive()
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_frame_ring.py"])
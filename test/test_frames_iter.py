@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from BKVisionCamera.base.property.camera_sdk import CameraSdkInterface, GrabTimeoutError
+from BKVisionCamera.base.property.capture import CaptureModel
+
+
+class _Property:
+    name = "fake"
+    ringSize = 4
+    dropPolicy = "block"
+
+
+class _FakeSdk(CameraSdkInterface):
+    def __init__(self):
+        super().__init__(camera_info=object())
+        self.count = 0
+        self.isGrabbing = True
+
+    def getFrame(self):
+        self.count += 1
+        if self.count % 2 == 0:
+            raise GrabTimeoutError("采集图像超时")
+        if self.count >= 9:
+            self.isGrabbing = False
+        return self.count
+
+    init = release = saveConfig = loadConfig = lambda *args: None
+    createCamera = getDeviceList = staticmethod(lambda *args: [])
+
+
+class _FakeCapture(CaptureModel):
+    def load(self):
+        return _FakeSdk()
+
+    def open(self):
+        ...
+
+    def release(self):
+        self.stopGrabThread()
+
+    def grab(self, timeout=None):
+        return self.sdk.getFrame()
+
+
+class TestFrames:
+    def test_sdk_frames_skip_timeout(self):
+        assert list(_FakeSdk()) == [1, 3, 5, 7, 9]
+
+    def test_capture_frames(self):
+        assert list(_FakeCapture(_Property())) == [1, 3, 5, 7, 9]
+
+    def test_capture_frames_thread(self):
+        cap = _FakeCapture(_Property())
+        cap.startGrabThread()
+        frames = cap.frames(timeout=1)
+        assert [next(frames) for _ in range(5)] == [1, 3, 5, 7, 9]
+        cap.release()
+        assert list(frames) == []
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_frames_iter.py"])
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from BKVisionCamera.d3cancamera.SICK.harvester_pool import HarvesterService
+
+
+class _Device:
+    def __init__(self, serial):
+        self.serial_number = serial
+        self.display_name = "Visionary"
+
+
+class _Acquirer:
+    def __init__(self, serial):
+        self.serial = serial
+        self.num_buffers = 0
+        self.destroyed = False
+
+    def stop(self):
+        pass
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class _Harvester:
+    created = 0
+
+    def __init__(self, serials):
+        _Harvester.created += 1
+        self.serials = serials
+        self.device_info_list = []
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+        self.device_info_list = [_Device(serial) for serial in self.serials]
+
+    def create(self, search_key):
+        return _Acquirer(search_key['serial_number'])
+
+    def reset(self):
+        self.device_info_list = []
+
+
+class TestHarvesterPool:
+    def setup_method(self):
+        _Harvester.created = 0
+        self.serials = ["1001", "1002", "1003"]
+        self.service = HarvesterService(lambda: _Harvester(self.serials), ttl=60)
+
+    def test_lazy(self):
+        assert _Harvester.created == 0
+        self.service.devices()
+        assert _Harvester.created == 1
+
+    def test_open_many_one_discovery(self):
+        acquirers = [self.service.create(serial) for serial in self.serials]
+        assert [ia.serial for ia in acquirers] == self.serials
+        assert acquirers[0].num_buffers == 10
+        assert _Harvester.created == 1
+        assert self.service.updates == 1
+
+    def test_concurrent_create(self):
+        threads = [threading.Thread(target=self.service.create, args=(serial,)) for serial in self.serials]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert _Harvester.created == 1
+        assert self.service.updates == 1
+
+    def test_refresh_when_missing(self):
+        self.service.devices()
+        self.serials.append("1004")
+        assert self.service.create("1004").serial == "1004"
+        assert self.service.updates == 2
+        with pytest.raises(Exception):
+            self.service.create("9999")
+
+    def test_ttl(self):
+        self.service.ttl = 0
+        self.service.devices()
+        self.service.devices()
+        assert self.service.updates == 2
+        # 有相机打开时不再按 ttl 重新枚举
+        self.service.create("1001")
+        updates = self.service.updates
+        self.service.devices()
+        assert self.service.updates == updates
+
+    def test_release_and_reset(self):
+        ia = self.service.create("1001")
+        with pytest.raises(Exception):
+            self.service.create("1001")
+        self.service.release("1001")
+        assert ia.destroyed
+        self.service.create("1001")
+        self.service.reset()
+        self.service.devices()
+        assert _Harvester.created == 2
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_harvester_pool.py"])
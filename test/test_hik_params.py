@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from BKVisionCamera.areascancamera.hikvision.hik_params import HikParams
+from BKVisionCamera.areascancamera.hikvision.MvImport.CameraParams_header import IFT_IInteger, IFT_IFloat, \
+    IFT_ICommand
+
+
+class _FakeCam:
+    types = {"Width": IFT_IInteger, "ExposureTime": IFT_IFloat, "TriggerSoftware": IFT_ICommand}
+
+    def __init__(self):
+        self.values = {"Width": 640, "ExposureTime": 1000.0}
+        self.calls = []
+
+    def MV_XML_GetNodeInterfaceType(self, name, enType):
+        self.calls.append(("type", name))
+        if name not in self.types:
+            return 1
+        enType.value = self.types[name]
+        return 0
+
+    def MV_CC_GetIntValue(self, name, stParam):
+        self.calls.append(("get", name))
+        stParam.nCurValue = self.values[name]
+        return 0
+
+    def MV_CC_GetFloatValue(self, name, stParam):
+        self.calls.append(("get", name))
+        stParam.fCurValue = self.values[name]
+        return 0
+
+    def MV_CC_SetIntValue(self, name, value):
+        self.values[name] = value
+        return 0
+
+    def MV_CC_SetFloatValue(self, name, value):
+        self.values[name] = value
+        return 0
+
+    def MV_CC_SetCommandValue(self, name):
+        self.calls.append(("command", name))
+        return 0
+
+    def MV_CC_InvalidateNodes(self):
+        return 0
+
+
+class TestHikParams:
+    def test_typed_get(self):
+        params = HikParams(_FakeCam())
+        assert params.get("Width") == 640
+        assert isinstance(params.get("ExposureTime"), float)
+
+    def test_cache(self):
+        cam = _FakeCam()
+        params = HikParams(cam)
+        for _ in range(3):
+            assert params.get("Width") == 640
+            params.get("ExposureTime")
+        assert cam.calls.count(("type", "Width")) == 1
+        assert cam.calls.count(("get", "Width")) == 1
+        assert cam.calls.count(("get", "ExposureTime")) == 3
+        assert params.latency["ExposureTime"].count == 3
+
+    def test_invalidate_on_write(self):
+        cam = _FakeCam()
+        params = HikParams(cam)
+        params.get("Width")
+        params.set("Width", 320)
+        assert params.get("Width") == 320
+        cam.values["Width"] = 160
+        assert params.get("Width") == 320
+        params.invalidate()
+        assert params.get("Width") == 160
+
+    def test_command(self):
+        cam = _FakeCam()
+        HikParams(cam).set("TriggerSoftware")
+        assert ("command", "TriggerSoftware") in cam.calls
+
+    def test_unknown_node(self):
+        with pytest.raises(Exception):
+            HikParams(_FakeCam()).get("Unknown")
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_hik_params.py"])
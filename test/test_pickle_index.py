@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pytest
+
+from _fake_harvesters import NodeMap, Component, Buffer
+from BKVisionCamera.d3cancamera.SICK.python.lib import pickle_harvester
+from BKVisionCamera.d3cancamera.SICK.python.lib.pickle_harvester import Writer, Reader, index_filename
+
+
+def _NodeMap():
+    return NodeMap(AcquisitionFrameRate=30.0, ExposureTime=1000.0, ExposureAuto="Off", ExposureAutoFrameRateMin=5.0,
+                   FieldOfView="Wide", MultiSlopeMode="Off", Scan3dDataFilterEnable=True, Scan3dDataFilterSelector="",
+                   Scan3dDepthValidationFilterLevel=-9, ChunkScan3dFocalLength=2.5, ChunkScan3dAspectRatio=1.0,
+                   ChunkScan3dPrincipalPointU=1.0, ChunkScan3dPrincipalPointV=1.0, ChunkScan3dCoordinateSelector="",
+                   ChunkScan3dCoordinateOffset=0.0)
+
+
+def _Buffer(frameId):
+    return Buffer(frameId, [Component("Coord3D_C16", np.full(6, frameId, dtype=np.uint16), 3, 2)])
+
+
+def _record(count=5):
+    writer = Writer("test")
+    for frameId in range(count):
+        writer.store(_Buffer(frameId), _NodeMap())
+    writer.close()
+    return writer.filename
+
+
+class TestPickleIndex:
+    @pytest.fixture(autouse=True)
+    def _cwd(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+
+    def test_writer_index(self, monkeypatch):
+        filename = _record()
+        assert os.path.exists(index_filename(filename))
+        # 有索引时不再解码整个文件
+        monkeypatch.setattr(Reader, "_build_index", lambda self: pytest.fail("index rebuilt"))
+        with Reader(filename) as reader:
+            assert len(reader) == 5
+            assert reader[3]["frame_id"] == 3
+            assert reader[-1]["frame_id"] == 4
+            assert [f["frame_id"] for f in reader[1:4]] == [1, 2, 3]
+            assert [f["frame_id"] for f in reader.get_frames(2, 2)] == [2, 3]
+            assert int(reader[0]["maps"][0]["data"][0]) == 0
+            with pytest.raises(IndexError):
+                reader[5]
+
+    def test_build_index_on_first_pass(self):
+        filename = _record()
+        os.remove(index_filename(filename))
+        with Reader(filename) as reader:
+            assert len(reader) == 5
+            assert reader[4]["frame_id"] == 4
+        assert os.path.exists(index_filename(filename))
+
+    def test_stale_index(self):
+        filename = _record(3)
+        pickle_harvester.save_index(filename, [0], 1)
+        with Reader(filename) as reader:
+            assert len(reader) == 3
+
+    def test_truncated_recording(self):
+        filename = _record()
+        os.remove(index_filename(filename))
+        # 模拟最后一帧写到一半时中断
+        with open(filename, "r+b") as f:
+            f.truncate(os.path.getsize(filename) - 20)
+        with Reader(filename) as reader:
+            assert len(reader) == 4
+            assert reader[-1]["frame_id"] == 3
+            assert [f["frame_id"] for f in reader] == [0, 1, 2, 3]
+        # 重新生成的索引对应截断后的文件, 再次打开时直接使用
+        assert len(pickle_harvester.load_index(filename)) == 4
+
+    def test_iterate_after_seek(self):
+        filename = _record()
+        with Reader(filename) as reader:
+            assert reader[4]["frame_id"] == 4
+            assert [f["frame_id"] for f in reader] == [0, 1, 2, 3, 4]
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_pickle_index.py"])
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import ctypes
+
+import numpy as np
+import pytest
+
+from BKVisionCamera.base.property.frame_info import FrameInfo
+from BKVisionCamera.utils.buffer_pool import BufferPool
+from BKVisionCamera.utils.pixel_format import PixelDecoder, unpack10, unpack12, getPixelFormat, benchmark, \
+    fastestPath, rawView, MONO8, MONO12, MONO10_PACKED, MONO12_PACKED, BAYER_RG8, BAYER_RG12_PACKED, RGB8
+
+
+def _pack10(pixels):
+    p = pixels.reshape(-1, 2)
+    res = np.empty((p.shape[0], 3), np.uint8)
+    res[:, 0] = p[:, 0] >> 2
+    res[:, 1] = (p[:, 0] & 0x03) | ((p[:, 1] & 0x03) << 4)
+    res[:, 2] = p[:, 1] >> 2
+    return res.ravel()
+
+
+def _pack12(pixels):
+    p = pixels.reshape(-1, 2)
+    res = np.empty((p.shape[0], 3), np.uint8)
+    res[:, 0] = p[:, 0] >> 4
+    res[:, 1] = (p[:, 0] & 0x0F) | ((p[:, 1] & 0x0F) << 4)
+    res[:, 2] = p[:, 1] >> 4
+    return res.ravel()
+
+
+class TestPixelFormat:
+    def test_unpack10(self):
+        pixels = np.random.randint(0, 1 << 10, 64, dtype=np.uint16)
+        out = unpack10(_pack10(pixels), np.empty(64, np.uint16))
+        assert np.array_equal(out, pixels)
+
+    def test_unpack12(self):
+        pixels = np.random.randint(0, 1 << 12, 64, dtype=np.uint16)
+        out = unpack12(_pack12(pixels), np.empty(64, np.uint16))
+        assert np.array_equal(out, pixels)
+
+    def test_mono8_view(self):
+        data = np.arange(32, dtype=np.uint8)
+        frame = PixelDecoder().decode(MONO8, data, 8, 4)
+        assert frame.shape == (4, 8)
+        assert np.shares_memory(frame, data)
+
+    def test_mono12_view(self):
+        pixels = np.arange(32, dtype='<u2') * 100
+        frame = PixelDecoder().decode(MONO12, pixels.view(np.uint8), 8, 4)
+        assert frame.dtype == np.uint16
+        assert np.array_equal(frame.ravel(), pixels)
+
+    @pytest.mark.parametrize("pixelType, dtype, shape", [
+        (MONO8, np.uint8, (4, 8)), (MONO12, np.uint16, (4, 8)), (RGB8, np.uint8, (4, 8, 3))])
+    def test_raw_view(self, pixelType, dtype, shape):
+        buffer = (ctypes.c_ubyte * 256)(*range(256))
+        frame = rawView(ctypes.cast(buffer, ctypes.POINTER(ctypes.c_ubyte)), pixelType, 8, 4)
+        assert frame.dtype == dtype and frame.shape == shape
+        assert np.shares_memory(frame, np.ctypeslib.as_array(buffer))
+
+    @pytest.mark.parametrize("pixelType", [MONO10_PACKED, BAYER_RG8])
+    def test_raw_view_needs_decode(self, pixelType):
+        buffer = (ctypes.c_ubyte * 256)()
+        with pytest.raises(Exception):
+            rawView(ctypes.cast(buffer, ctypes.POINTER(ctypes.c_ubyte)), pixelType, 8, 4)
+
+    def test_packed_decode(self):
+        pixels = np.random.randint(0, 1 << 12, 32, dtype=np.uint16)
+        frame = PixelDecoder().decode(MONO12_PACKED, _pack12(pixels), 8, 4)
+        assert frame.shape == (4, 8)
+        assert np.array_equal(frame.ravel(), pixels)
+
+    def test_bayer(self):
+        decoder = PixelDecoder()
+        # RGGB 全红图像
+        mosaic = np.zeros((8, 8), np.uint8)
+        mosaic[0::2, 0::2] = 200
+        frame = decoder.decode(BAYER_RG8, mosaic.ravel(), 8, 8)
+        assert frame.shape == (8, 8, 3)
+        assert frame[4, 4, 2] == 200
+        assert frame[4, 4, 0] == 0
+        packed = decoder.decode(BAYER_RG12_PACKED, _pack12(mosaic.astype(np.uint16).ravel() << 4), 8, 8)
+        assert packed.dtype == np.uint16
+        assert packed[4, 4, 2] == 200 << 4
+
+    def test_output_reuse(self):
+        decoder = PixelDecoder(count=1)
+        data = np.zeros(48, np.uint8)
+        frame = decoder.decode(MONO10_PACKED, data, 8, 4)
+        frame.release()
+        decoder.decode(MONO10_PACKED, data, 8, 4)
+        assert len(decoder._pools) == 1
+        assert next(iter(decoder._pools.values())).allocated == 1
+
+    def test_decode_frame(self):
+        pool = BufferPool(64, 2)
+        decoder = PixelDecoder()
+        raw = pool.wrap(pool.acquire(), (32,))
+        raw.info = FrameInfo(pixelType=MONO8, width=8, height=4)
+        frame = decoder.decodeFrame(raw)
+        assert frame.shape == (4, 8)
+        assert frame.info is raw.info
+        del raw
+        # 视图负责归还原始内存
+        assert pool.available == 1
+        frame.release()
+        assert pool.available == 2
+        raw = pool.wrap(pool.acquire(), (48,))
+        raw.info = FrameInfo(pixelType=MONO12_PACKED, width=8, height=4)
+        frame = decoder.decodeFrame(raw)
+        assert frame.dtype == np.uint16
+        assert pool.available == 2
+
+    def test_unknown(self):
+        with pytest.raises(Exception):
+            getPixelFormat(0x12345678)
+
+    def test_benchmark(self):
+        res = benchmark(BAYER_RG8, 64, 32, repeat=2, converters={"copy": lambda data, w, h: data.copy()})
+        assert set(res) == {"numpy", "copy"}
+        assert fastestPath(res) in res
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_pixel_format.py"])
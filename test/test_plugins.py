@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import subprocess
+import sys
+
+import pytest
+
+from BKVisionCamera.base import SingCameraAll
+
+PLUGIN = '''
+from BKVisionCamera.base import register
+from BKVisionCamera.base.property.capture import CaptureModel
+
+
+@register()
+class FakeCamera(CaptureModel):
+    names = ["fakecam"]
+
+    def load(self):
+        pass
+
+    def open(self):
+        pass
+
+    def release(self):
+        pass
+
+    def grab(self):
+        pass
+'''
+
+
+class TestPlugins:
+    def test_import_is_lazy(self):
+        code = "import sys, BKVisionCamera; " \
+               "print([name for name in sys.modules if name.endswith(('hik_sdk', 'imv_sdk', 'sick_sdk', 'harvesters'))])"
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        assert output.strip().splitlines()[-1] == "[]"
+
+    def test_resolve_on_first_use(self, tmp_path, monkeypatch):
+        (tmp_path / "fake_camera_plugin.py").write_text(PLUGIN, encoding="utf-8")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        models = SingCameraAll()
+        models.registerPlugin(["fakecam"], "fake_camera_plugin")
+        assert "fake_camera_plugin" not in sys.modules
+        assert models.resolve("FakeCam").__name__ == "FakeCamera"
+        assert "fake_camera_plugin" in sys.modules
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            SingCameraAll().resolve("no-such-camera")
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_plugins.py"])
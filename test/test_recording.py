@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from _fake_harvesters import NodeMap, Component, Buffer
+from BKVisionCamera.d3cancamera.SICK.recording import Writer, Reader, AsyncWriter, captureFrame, writeFrames, ALIGN, \
+    DROP
+
+
+def _NodeMap():
+    # 没有 FieldOfView 节点和 AspectRatio chunk
+    return NodeMap(ExposureTime=np.float32(1000.0), ExposureAuto="Off", Scan3dDataFilterSelector="",
+                   Scan3dDepthValidationFilterLevel=-9, ChunkScan3dCoordinateSelector="", ChunkScan3dFocalLength=2.5)
+
+
+def _Buffer(frameId):
+    return Buffer(frameId, [
+        Component("Coord3D_C16", np.arange(15, dtype=np.uint16) + frameId, 5, 3),
+        Component("Mono8", np.full(15, frameId, dtype=np.uint8), 5, 3),
+    ])
+
+
+def _record(path, count=5):
+    with Writer("test", filename=path) as writer:
+        for frameId in range(count):
+            writer.store(_Buffer(frameId), _NodeMap())
+    return path
+
+
+class TestRecording:
+    def test_capture_frame(self):
+        frame = captureFrame(_Buffer(3), _NodeMap())
+        assert frame["ExposureTime"] == 1000.0
+        # 节点不存在时记为 N/A, chunk 不存在时不记录
+        assert frame["FieldOfView"] == "N/A"
+        assert "AspectRatio" not in frame
+        assert frame["DepthValidationFilterLevel"] == -9
+        assert frame["CoordinateScaleC"] == 0.25
+        assert frame["numComponents"] == 2
+
+    def test_round_trip(self, tmp_path):
+        path = _record(str(tmp_path / "a.rec"))
+        with Reader(path) as reader:
+            assert len(reader) == 5
+            assert not reader.recovered
+            frame = reader[3]
+            assert frame["frame_id"] == 3 and frame["timestamp_ns"] == 3000
+            assert frame["ExposureAuto"] == "Off"
+            assert [m["data_format"] for m in frame["maps"]] == ["Coord3D_C16", "Mono8"]
+            data = frame["maps"][0]["data"]
+            assert data.dtype == np.uint16
+            np.testing.assert_array_equal(data, np.arange(15, dtype=np.uint16) + 3)
+            assert frame["maps"][1]["width"] == 5
+            assert reader[-1]["frame_id"] == 4
+            assert [f["frame_id"] for f in reader[1:4]] == [1, 2, 3]
+            assert [f["frame_id"] for f in reader] == [0, 1, 2, 3, 4]
+            assert [f["frame_id"] for f in reader.get_frames(2, 2)] == [2, 3]
+            assert reader.get_next_frame()["frame_id"] == 0
+            with pytest.raises(IndexError):
+                reader[5]
+
+    def test_aligned_payload(self, tmp_path):
+        path = _record(str(tmp_path / "a.rec"))
+        with Reader(path) as reader:
+            for frame in reader:
+                for m in frame["maps"]:
+                    assert isinstance(m["data"], np.memmap)
+                    assert m["data"].offset % ALIGN == 0
+
+    def test_no_mmap(self, tmp_path):
+        path = _record(str(tmp_path / "a.rec"))
+        with Reader(path, mmap=False) as reader:
+            assert int(reader[2]["maps"][1]["data"][0]) == 2
+
+    def test_recover_without_index(self, tmp_path):
+        path = str(tmp_path / "a.rec")
+        writer = Writer("test", filename=path)
+        for frameId in range(4):
+            writer.store(_Buffer(frameId), _NodeMap())
+        writer.file.flush()
+        size = os.path.getsize(path)
+        writer.file.close()
+        writer.file = None
+        # 模拟最后一帧写到一半时中断
+        with open(path, "r+b") as f:
+            f.truncate(size - ALIGN + 4)
+        with Reader(path) as reader:
+            assert reader.recovered
+            assert len(reader) == 3
+            assert reader[2]["frame_id"] == 2
+
+    def test_write_frames(self, tmp_path):
+        frames = [{"frame_id": i, "numComponents": 1,
+                   "maps": [{"data_format": "Mono16", "width": 2, "height": 2, "delivered_image_height": 2,
+                             "data": np.full(4, i, dtype=np.uint16)}]} for i in range(3)]
+        path = str(tmp_path / "b.rec")
+        assert writeFrames(frames, path, nodes=[], buffer=["frame_id"], maps=["data"]) == 3
+        with Reader(path) as reader:
+            assert reader.nodes_wl == [] and reader.buffer_wl == ["frame_id"]
+            assert int(reader[2]["maps"][0]["data"][3]) == 2
+
+
+class _SlowWriter(Writer):
+    """
+    写盘阻塞到 gate 打开, 模拟磁盘慢
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = threading.Event()
+
+    def storeFrame(self, frame):
+        self.gate.wait(5)
+        super().storeFrame(frame)
+
+
+class TestAsyncWriter:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "a.rec")
+        with AsyncWriter(Writer("test", filename=path), queueSize=2) as writer:
+            for frameId in range(10):
+                buffer = _Buffer(frameId)
+                assert writer.store(buffer, _NodeMap())
+                # 入队后 Buffer 即可复用, 不影响已入队的帧
+                buffer.payload.components[1].data[:] = 255
+        stats = writer.getStats()
+        assert stats["written"] == 10 and stats["dropped"] == 0 and stats["queueDepth"] == 0
+        assert stats["bytesWritten"] == os.path.getsize(path)
+        with Reader(path) as reader:
+            assert len(reader) == 10
+            assert int(reader[7]["maps"][1]["data"][0]) == 7
+
+    def test_drop_when_full(self, tmp_path):
+        writer = AsyncWriter(_SlowWriter("test", filename=str(tmp_path / "a.rec")), queueSize=2, policy=DROP)
+        results = [writer.store(_Buffer(frameId), _NodeMap()) for frameId in range(6)]
+        assert results.count(False) == writer.dropped > 0
+        assert writer.maxQueueDepth <= 2
+        writer.writer.gate.set()
+        writer.close()
+        with Reader(writer.filename) as reader:
+            assert len(reader) == results.count(True)
+
+    def test_block_when_full(self, tmp_path):
+        writer = AsyncWriter(_SlowWriter("test", filename=str(tmp_path / "a.rec")), queueSize=1)
+        threading.Timer(0.2, writer.writer.gate.set).start()
+        for frameId in range(4):
+            assert writer.store(_Buffer(frameId), _NodeMap())
+        writer.close()
+        stats = writer.getStats()
+        assert stats["written"] == 4 and stats["dropped"] == 0
+        assert stats["blockedTime"] > 0
+
+    def test_invalid_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            AsyncWriter(Writer("test", filename=str(tmp_path / "a.rec")), policy="latest")
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_recording.py"])
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from _fake_harvesters import NodeMap, isAvailable
+from BKVisionCamera.d3cancamera.SICK.sick_config import enabledComponents, nodeValues, saveCsvConfig, \
+    loadCsvConfig, formatValue
+from BKVisionCamera.utils.feature_file import parseValue
+
+
+def _NodeMap():
+    return NodeMap(components={"Range": True, "Intensity": True, "Confidence": False},
+                   ExposureTime=np.float32(1000.0), FrameRate=30, MultiSlopeMode="Off", DataFilterEnable=True,
+                   Scan3dDataFilterSelector="ValidationFilter", DeviceSerialNumber="22110085")
+
+
+def _exportable(node):
+    return node.node.name != "DeviceSerialNumber"
+
+
+def _setFeature(writes):
+    def setFeature(nodeMap, name, value):
+        writes.append(name)
+        getattr(nodeMap, name).value = value
+
+    return setFeature
+
+
+def _setComponents(writes):
+    def setComponents(nodeMap, names):
+        writes.append("ComponentList")
+        nodeMap.components.update({name: name in names for name in nodeMap.components})
+
+    return setComponents
+
+
+def _save(nodeMap, path):
+    rows = [("ComponentList", " ".join(enabledComponents(nodeMap, isAvailable)))]
+    saveCsvConfig(path, rows + nodeValues(nodeMap, _exportable))
+
+
+def _load(nodeMap, path, writes):
+    return loadCsvConfig(path, nodeMap, _setFeature(writes), _setComponents(writes), isAvailable)
+
+
+class TestSickConfig:
+    def test_enabled_components(self):
+        nodeMap = _NodeMap()
+        nodeMap.ComponentSelector.value = "Confidence"
+        assert enabledComponents(nodeMap, isAvailable) == ["Range", "Intensity"]
+        # 读取后恢复 ComponentSelector
+        assert nodeMap.ComponentSelector.value == "Confidence"
+
+    def test_node_values(self):
+        rows = nodeValues(_NodeMap(), _exportable)
+        names = [name for name, _ in rows]
+        assert names[0] == "Scan3dDataFilterSelector"
+        assert "DeviceSerialNumber" not in names and "ComponentSelector" not in names
+        assert dict(rows)["ExposureTime"] == "1000.0"
+
+    @pytest.mark.parametrize("value", [np.float32(1.5), 7, True, "Off"])
+    def test_format_value(self, value):
+        assert parseValue(formatValue(value)) == value
+
+    def test_unchanged_snapshot_writes_nothing(self, tmp_path):
+        path = tmp_path / "sick.csv"
+        nodeMap = _NodeMap()
+        _save(nodeMap, path)
+        writes = []
+        report = _load(_NodeMap(), path, writes)
+        assert writes == []
+        assert report["written"] == 0 and report["failed"] == []
+        assert report["features"] == 1 + len(nodeValues(nodeMap, _exportable))
+
+    def test_only_changed_nodes(self, tmp_path):
+        path = tmp_path / "sick.csv"
+        _save(_NodeMap(), path)
+        live = _NodeMap()
+        live.FrameRate.value = 10
+        live.components["Confidence"] = True
+        writes = []
+        report = _load(live, path, writes)
+        assert writes == ["ComponentList", "FrameRate"]
+        assert report["written"] == 2
+        assert live.FrameRate.value == 30
+        assert enabledComponents(live, isAvailable) == ["Range", "Intensity"]
+
+    def test_missing_file(self, tmp_path):
+        report = _load(_NodeMap(), tmp_path / "missing.csv", [])
+        assert report["features"] == 0
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_sick_config.py"])
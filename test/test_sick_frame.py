@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from _fake_harvesters import Component, Buffer
+from BKVisionCamera.base.property import GrabTimeoutError
+from BKVisionCamera.d3cancamera.SICK.sick_camera import SickCamera
+from BKVisionCamera.d3cancamera.SICK.sick_frame import SickFrameStream, SickFrameLease, ComponentPools, copyFrame, \
+    FRAME_VIEW, FRAME_COPY, FRAME_DECODED
+
+
+def _Buffer(frameId, pool):
+    rng = np.full(6, frameId, dtype=np.uint16)
+    return Buffer(frameId, [Component("Coord3D_C16", rng, 3, 2),
+                            Component("Mono16", rng * 2, 3, 2),
+                            Component("Confidence16", rng * 0, 3, 2)], pool)
+
+
+class _Acquirer:
+    """
+    模拟 harvesters ImageAcquirer, 只有 num_buffers 个 Buffer, 未归还时取不到新帧
+    """
+
+    def __init__(self, num_buffers=2, timeouts=()):
+        self.num_buffers = num_buffers
+        self.outstanding = 0
+        self.frameId = 0
+        self.timeouts = list(timeouts)
+
+    def fetch(self):
+        if self.timeouts and self.timeouts.pop(0):
+            raise GrabTimeoutError("采集图像超时")
+        if self.outstanding >= self.num_buffers:
+            raise Exception("没有可用的 Buffer")
+        self.outstanding += 1
+        self.frameId += 1
+        return _Buffer(self.frameId, self)
+
+
+class _Property:
+    name = "sick"
+    multiThread = False
+
+
+class _TimeoutSdk:
+    camera_info = None
+
+    def __init__(self):
+        self.timeouts = []
+
+    def getFrame(self, timeout=5.0):
+        self.timeouts.append(timeout)
+        raise GrabTimeoutError("采集图像超时")
+
+
+class _FakeSickCamera(SickCamera):
+    def load(self):
+        return _TimeoutSdk()
+
+
+class TestSickFrame:
+    def test_view_requeue_on_next(self):
+        ia = _Acquirer(num_buffers=1)
+        stream = SickFrameStream(ia.fetch, FRAME_VIEW)
+        for frameId in range(1, 5):
+            frame = next(stream)
+            # 视图模式下 Buffer 保留到下一次取帧
+            assert ia.outstanding == 1
+            assert frame.info.frameNum == frameId
+            assert frame.range.shape == (2, 3)
+            assert int(frame.intensity[0, 0]) == frameId * 2
+        stream.close()
+        assert ia.outstanding == 0
+        with pytest.raises(StopIteration):
+            next(stream)
+
+    def test_copy_requeue_immediately(self):
+        ia = _Acquirer(num_buffers=1, timeouts=[True, False])
+        pools = ComponentPools(count=2)
+        with SickFrameStream(ia.fetch, FRAME_COPY, pools) as stream:
+            first = next(stream)
+            assert ia.outstanding == 0
+            second = next(stream)
+        assert int(first.range[0, 0]) == 1 and int(second.range[0, 0]) == 2
+        assert set(first) == {"Range", "Intensity", "Confidence"}
+        first.release()
+        second.release()
+        assert pools._pools["Range"].available == 2
+
+    def test_decoded_range(self):
+        ia = _Acquirer()
+        buffer = ia.fetch()
+        frame = copyFrame(buffer, ComponentPools(), rangeScale=(0.25, 10.0))
+        assert frame.range.dtype == np.float32
+        assert float(frame.range[0, 0]) == pytest.approx(10.25)
+        assert frame.intensity.dtype == np.uint16
+
+    def test_decoded_stream_without_scale(self):
+        ia = _Acquirer()
+        stream = SickFrameStream(ia.fetch, FRAME_DECODED, rangeScale=lambda: None)
+        assert next(stream).range.dtype == np.uint16
+
+    def test_running_stops(self):
+        ia = _Acquirer()
+        running = iter([True, True, False])
+        stream = SickFrameStream(ia.fetch, FRAME_COPY, running=lambda: next(running))
+        assert len(list(stream)) == 2
+
+    def test_lease(self):
+        ia = _Acquirer(num_buffers=1)
+        with SickFrameLease(ia.fetch) as frame:
+            assert ia.outstanding == 1
+            copied = frame.copy()
+        assert ia.outstanding == 0
+        assert int(copied.range[1, 2]) == 1
+
+    def test_safe_lease(self):
+        ia = _Acquirer(num_buffers=1)
+        with SickFrameLease(ia.fetch, safe=True) as frame:
+            view = frame.range
+        assert ia.outstanding == 0
+        assert not np.shares_memory(frame.range, view)
+        np.testing.assert_array_equal(frame.range, view)
+
+    def test_camera_timeout_returns_none(self):
+        cap = _FakeSickCamera(_Property())
+        assert cap.getFrame() is None
+        # 超时单位为秒, 不做换算
+        assert cap.getFrame(0.5) is None
+        assert cap.sdk.timeouts == [5.0, 0.5]
+        assert cap.stats.timeouts == 2
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            SickFrameStream(lambda: None, "raw")
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_sick_frame.py"])
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+import pytest
+
+from BKVisionCamera.base.property import GrabTimeoutError
+from BKVisionCamera.base.property.frame_ring import FrameRing, GrabThread
+from BKVisionCamera.base.property.supervisor import ReconnectConfig, ConnectionSupervisor
+
+
+class _Property:
+    name = "fake"
+
+
+class _FakeSdk:
+    def __init__(self):
+        self.connected = True
+
+    def isConnected(self):
+        return self.connected
+
+
+class _FakeCapture:
+    property = _Property()
+
+    def __init__(self, failures=0):
+        self.sdk = _FakeSdk()
+        self.failures = failures
+        self.reopens = 0
+        self.count = 0
+        self.grabThread = None
+        self.reopening = threading.Event()
+        self.grabbedWhileReopening = False
+
+    def grab(self):
+        if self.reopening.is_set():
+            self.grabbedWhileReopening = True
+        if not self.sdk.connected:
+            raise Exception("设备已断开")
+        self.count += 1
+        time.sleep(0.001)
+        return self.count
+
+    def reopen(self):
+        self.reopening.set()
+        time.sleep(0.02)
+        self.reopens += 1
+        self.reopening.clear()
+        if self.reopens <= self.failures:
+            raise Exception("相机未上线")
+        self.sdk.connected = True
+
+
+class _NoCallbackSdk:
+    """
+    没有断线回调, isConnected() 总是 True, 只能通过取流失败发现断线
+    """
+
+    def __init__(self):
+        self.connected = True
+        self.timeout = False
+
+    def isConnected(self):
+        return True
+
+
+class _NoCallbackCapture(_FakeCapture):
+    def __init__(self):
+        super().__init__()
+        self.sdk = _NoCallbackSdk()
+
+    def grab(self):
+        if self.sdk.timeout:
+            time.sleep(0.001)
+            raise GrabTimeoutError("采集图像超时")
+        return super().grab()
+
+
+def start(capture, config):
+    ring = FrameRing(4, "oldest")
+    supervisor = ConnectionSupervisor(capture, ReconnectConfig(config))
+    capture.supervisor = supervisor
+    capture.grabThread = GrabThread(capture, ring)
+    capture.grabThread.start()
+    supervisor.start()
+    return ring, supervisor
+
+
+def waitFor(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class TestReconnectConfig:
+    def test_default(self):
+        config = ReconnectConfig()
+        assert config.enable is False
+        assert config.minBackoff <= config.maxBackoff
+
+    @pytest.mark.parametrize("config", [
+        {"checkInterval": 0},
+        {"minBackoff": 0},
+        {"minBackoff": 5, "maxBackoff": 1},
+        {"maxGrabErrors": -1},
+    ])
+    def test_invalid(self, config):
+        with pytest.raises(ValueError):
+            ReconnectConfig(config)
+
+
+class TestConnectionSupervisor:
+    def test_callback_reconnect(self):
+        capture = _FakeCapture()
+        ring, supervisor = start(capture, {"enable": True, "checkInterval": 10})
+        assert ring.get(1) is not None
+        capture.sdk.connected = False
+        supervisor.notifyDisconnect()
+        assert waitFor(lambda: capture.reopens == 1 and supervisor.connected)
+        ring.clear()
+        assert ring.get(1) is not None
+        snapshot = supervisor.snapshot()
+        supervisor.stop(1)
+        capture.grabThread.stop(1)
+        assert snapshot["disconnects"] == 1
+        assert snapshot["lastDowntime"] > 0
+        assert not capture.grabbedWhileReopening
+
+    def test_poll_and_backoff(self):
+        capture = _FakeCapture(failures=2)
+        ring, supervisor = start(capture, {"enable": True, "checkInterval": 0.01,
+                                           "minBackoff": 0.01, "maxBackoff": 0.02})
+        capture.sdk.connected = False
+        assert waitFor(lambda: supervisor.connected and capture.reopens == 3)
+        snapshot = supervisor.snapshot()
+        supervisor.stop(1)
+        capture.grabThread.stop(1)
+        assert snapshot["attempts"] == 3
+        assert snapshot["lastError"] == "相机未上线"
+        assert snapshot["downtime"] >= snapshot["lastDowntime"] > 0.03
+
+    def test_grab_errors_without_callback(self):
+        capture = _NoCallbackCapture()
+        ring, supervisor = start(capture, {"enable": True, "checkInterval": 10, "maxGrabErrors": 3})
+        assert ring.get(1) is not None
+        capture.sdk.connected = False
+        assert waitFor(lambda: capture.reopens == 1 and supervisor.connected)
+        ring.clear()
+        assert ring.get(1) is not None
+        snapshot = supervisor.snapshot()
+        supervisor.stop(1)
+        capture.grabThread.stop(1)
+        assert snapshot["disconnects"] == 1
+        assert capture.grabThread.errorCount >= 3
+
+    def test_grab_timeouts(self):
+        capture = _NoCallbackCapture()
+        ring, supervisor = start(capture, {"enable": True, "checkInterval": 10, "maxGrabTimeouts": 5})
+        assert ring.get(1) is not None
+        capture.sdk.timeout = True
+        assert waitFor(lambda: capture.reopens >= 1)
+        capture.sdk.timeout = False
+        assert waitFor(lambda: supervisor.connected)
+        supervisor.stop(1)
+        capture.grabThread.stop(1)
+
+    def test_timeouts_ignored_by_default(self):
+        capture = _NoCallbackCapture()
+        capture.sdk.timeout = True
+        ring, supervisor = start(capture, {"enable": True, "checkInterval": 10})
+        time.sleep(0.1)
+        supervisor.stop(1)
+        capture.grabThread.stop(1)
+        assert capture.reopens == 0
+        assert capture.grabThread.consecutiveTimeouts > 5
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_supervisor.py"])
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from BKVisionCamera.base.property.transport import TransportConfig, PACKET_SIZE_AUTO
+
+
+class TestTransportConfig:
+    def test_no_block(self):
+        # 没有 transport 块时不修改相机设置
+        transport = TransportConfig()
+        assert transport.packetSize is None
+        assert not transport.autoPacketSize
+        assert transport.packetDelay is None
+        assert transport.resend is None
+        assert transport.packetTimeout is None
+
+    def test_default(self):
+        transport = TransportConfig({})
+        assert transport.packetSize == PACKET_SIZE_AUTO
+        assert transport.autoPacketSize
+        assert transport.packetDelay is None
+        assert transport.resend is True
+        assert transport.packetTimeout is None
+
+    def test_yaml_block(self):
+        transport = TransportConfig({"packetSize": 8164, "packetDelay": 2000, "resend": False,
+                                     "packetTimeout": 300, "maxLostPacket": 64})
+        assert not transport.autoPacketSize
+        assert transport.packetSize == 8164
+        assert transport.packetDelay == 2000
+        assert transport.resend is False
+        assert transport.packetTimeout == 300
+        assert transport.maxLostPacket == 64
+
+    def test_keep_packet_size(self):
+        transport = TransportConfig({"packetSize": None})
+        assert transport.packetSize is None
+        assert not transport.autoPacketSize
+
+    @pytest.mark.parametrize("config", [
+        {"packetSize": "max"},
+        {"packetSize": 500},
+        {"packetDelay": -1},
+        {"resendPercent": 120},
+        {"packetTimeout": 0},
+    ])
+    def test_invalid(self, config):
+        with pytest.raises(ValueError):
+            TransportConfig(config)
+
+
+if __name__ == '__main__':
+    pytest.main(["-s", "test_transport.py"])
@@ -2,19 +2,11 @@ import numpy as np
 import threading
 from vispy import app, gloo
 from vispy.util.transforms import perspective, translate, rotate
-from harvesters.core import Harvester
+from BKVisionCamera.d3cancamera.SICK.harvester_pool import harvesterService
 
-# 初始化Harvester
-h = Harvester()
-
-# 添加GenTL生产者（根据需要调整路径）
-h.add_cti_file('BKVisionCamera/d3cancamera/SICK/common/lib/cti/windows_x64/SICKGigEVisionTL.cti')
-
-# 更新设备列表
-h.update()
-
-# 连接到第一个可用的相机
-ia = h.create_image_acquirer(0)
+# 共享的 Harvester, 第一次枚举时加载 CTI, 连接到第一个可用的相机
+serial = harvesterService.devices()[0].serial_number
+ia = harvesterService.create(serial)
 
 # 设置全局变量
 depth_data = None
@@ -134,5 +126,4 @@ canvas.show()
 app.run()
 
 # 清理Harvester资源
-ia.destroy()
-h.reset()
\ No newline at end of file
+harvesterService.reset()
\ No newline at end of file